@@ -3,6 +3,9 @@ ASGI config for Config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Login uchun async yo'l: ``auth/login/async/`` (app_config.views.async_login_view)
+parol tekshiruvini cheklangan thread pool ga yuboradi va event loop ni bloklamaydi.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -82,7 +82,7 @@ SIMPLE_JWT = {
 
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
-    "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
+    "TOKEN_USER_CLASS": "app_config.authentication.RoleClaimsUser",
 
     "JTI_CLAIM": "jti",
 
@@ -91,12 +91,12 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 
     "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "app_config.serializers.RoleTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
-    "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
-    "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
-    "SLIDING_TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSlidingSerializer",
-    "TOKEN_OBTAIN_SERIALIZER": "my_app.serializers.MyTokenObtainPairSerializer",
+    "TOKEN_BLACKLIST_SERIALIZER": "app_config.serializers.RoleTokenBlacklistSerializer",
+    "SLIDING_TOKEN_OBTAIN_SERIALIZER": "app_config.serializers.RoleTokenObtainSlidingSerializer",
+    "SLIDING_TOKEN_REFRESH_SERIALIZER": "app_config.serializers.RoleTokenRefreshSlidingSerializer",
+    "TOKEN_OBTAIN_SERIALIZER": "app_config.serializers.MyTokenObtainPairSerializer",
 }
 
 
@@ -158,14 +158,70 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'app_config.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'app_config.pagination.OptionalCursorPagination',
     'PAGE_SIZE': 100
 }
 
+# Cursor rejimidagi ?with_count=true uchun keshlangan COUNT(*) muddati
+PAGINATION = {
+    'COUNT_CACHE_TTL': 60,  # soniya
+}
+
+# JWT autentifikatsiyasi uchun foydalanuvchi keshi (app_config.authentication).
+# Kesh har bir worker jarayonida alohida: boshqa workerda saqlangan User
+# o'zgarishi shu yerda ko'pi bilan TTL soniyadan keyin ko'rinadi.
+USER_CACHE = {
+    'MAX_SIZE': 1024,
+    'TTL': 15,  # soniya
+}
+
+# Qora ro'yxatdagi refresh tokenlar uchun bloom filtr (app_config.blacklist)
+TOKEN_BLACKLIST_FILTER = {
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.01,
+    'SYNC_INTERVAL': 5,  # soniya
+    'SYNC_OVERLAP': 60,  # soniya: kech commit bo'lgan qatorlar uchun qayta o'qish oynasi
+    'LRU_SIZE': 4096,
+}
+
+# Parolni tiklash OTP kodlari (app_config.otp)
+OTP_STORE = {
+    # BACKEND ko'rsatilmasa: umumiy kesh (Redis, Memcached) sozlangan bo'lsa
+    # CacheOTPStore, aks holda DatabaseOTPStore ishlatiladi
+    # 'BACKEND': 'app_config.otp.DatabaseOTPStore',
+    'TTL': 300,  # soniya
+    'MAX_ATTEMPTS': 5,
+    'CODE_LENGTH': 6,
+    'STATIC_CODE': '123456',  # SMS yuborish ulanmaguncha
+}
+
+# Login paytidagi parol tekshiruvi uchun cheklangan pool (app_config.hashing)
+PASSWORD_CHECK_POOL = {
+    'MAX_WORKERS': 4,
+    'MAX_QUEUE': 32,
+    'RETRY_AFTER': 2,  # soniya, 503 javobidagi Retry-After
+}
+
+# Talabalar statistikasi rollupi (app_config.statistics)
+STUDENT_STATS = {
+    # StudentFilterView rollupni faqat birinchi marta so'rov ichida quradi:
+    # keyin eskirgan bo'lsa fon threadida yangilanadi. False - faqat rollup_student_stats (cron).
+    'BACKGROUND_REFRESH': True,
+    'TODAY_REFRESH_INTERVAL': 60,  # soniya
+}
+
+# Davomat: "keldi" hisoblanadigan Status.name qiymatlari (app_config.counters)
+# va arxivlash chegarasi (app_config.archive)
+ATTENDANCE = {
+    'PRESENT_STATUSES': ['present', 'keldi'],
+    'HOT_MONTHS': 6,  # shundan eski davomat archive_attendance bilan arxivlanadi
+    'ARCHIVE_BATCH_SIZE': 1000,
+}
+
 
 STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'static/'
@@ -4,7 +4,7 @@ from .models import *
 admin.site.register([ User, Teacher, Student, Payment, Subject, TokenModel, Course,
     Departments, Worker, Group, Parent, Attendance, AttendanceLevel,
     Topics, GroupHomeWork, HomeWork, Day, Rooms, TableType, Table,
-    PaymentType, TeacherCourse, TeacherDepartments, Comment, MockData, Status
+    PaymentType, TeacherCourse, TeacherDepartments, Comment, MockData, Status, Invoice, ReconciliationItem
     ])
 
 
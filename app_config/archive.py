@@ -0,0 +1,89 @@
+from datetime import date as date_cls
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import ArchivedAttendance, Attendance
+
+
+ATTENDANCE_SETTINGS = getattr(settings, 'ATTENDANCE', {})
+HOT_MONTHS = ATTENDANCE_SETTINGS.get('HOT_MONTHS', 6)
+ARCHIVE_BATCH_SIZE = ATTENDANCE_SETTINGS.get('ARCHIVE_BATCH_SIZE', 1000)
+
+ARCHIVE_FIELDS = ('id', 'level_id', 'student_id', 'status_id', 'group_id', 'date', 'created', 'updated')
+
+
+def archive_cutoff(months=HOT_MONTHS, today=None):
+    """
+    Shu sanadan oldingi darslar arxivga ko'chiriladi: `months` oy oldingi oyning 1-kuni.
+    """
+    today = today or timezone.localdate()
+    index = today.year * 12 + today.month - 1 - months
+    return date_cls(index // 12, index % 12 + 1, 1)
+
+
+def archived_until():
+    """
+    Arxivdagi eng so'nggi dars kuni (arxiv bo'sh bo'lsa None).
+    Keshlanmaydi: archived_attendance_date_idx bo'yicha MAX - indeksning
+    bitta yozuvi o'qiladi, va arxivlash boshqa jarayonda bo'lsa ham
+    barcha workerlar darhol ko'radi.
+    """
+    return ArchivedAttendance.objects.aggregate(day=Max('date'))['day']
+
+
+def needs_archive(start=None):
+    """
+    [start, ...) oralig'i arxivdagi yozuvlarni ham qamraydimi.
+    """
+    until = archived_until()
+    return until is not None and (start is None or start <= until)
+
+
+def attendance_queryset(start=None, fields=None, **filters):
+    """
+    Attendance bo'yicha queryset; so'ralgan oraliq arxivga tushsa
+    ArchivedAttendance bilan UNION ALL qilinadi. Natijalar Attendance obyektlari,
+    `fields` berilsa - shu lookup'lar bo'yicha values_list tuple'lari.
+    UNION dan keyin faqat order_by, count, slicing va iterator ishlatish mumkin.
+    """
+    if start is not None:
+        filters['date__gte'] = start
+
+    def side(model):
+        queryset = model.objects.filter(**filters)
+        if fields:
+            return queryset.values_list(*fields)
+        return queryset.select_related('level', 'status', 'group')
+
+    queryset = side(Attendance)
+    if not needs_archive(start):
+        return queryset
+    return queryset.union(side(ArchivedAttendance), all=True)
+
+
+def archive_attendance(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    `cutoff` dan oldingi davomatni partiyalab arxiv jadvaliga ko'chiradi.
+    Har bir partiya alohida tranzaksiyada: nusxa olinadi, so'ng asl qatorlar o'chiriladi.
+    """
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Attendance.objects.select_for_update()
+                .filter(date__lt=cutoff)
+                .order_by('id')
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            ArchivedAttendance.objects.bulk_create(
+                [ArchivedAttendance(**row) for row in rows],
+                ignore_conflicts=True,
+            )
+            Attendance.objects.filter(id__in=[row['id'] for row in rows]).delete()
+        moved += len(rows)
+    return moved
@@ -0,0 +1,171 @@
+import calendar
+import hashlib
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .archive import archived_until, needs_archive
+from .counters import apply_counter_deltas, counter_key
+from .models import ArchivedAttendance, Attendance, AttendanceLevel, Status, Student
+
+
+def _missing(ids, existing):
+    return sorted(set(ids) - set(existing))
+
+
+def mark_group_attendance(group, items, date=None, level_id=None):
+    """
+    Butun guruh davomatini bitta tranzaksiyada yozadi.
+
+    Har bir FK turi bitta `IN` so'rov bilan tekshiriladi, yozuvlar bulk_create
+    orqali (student, group, date) bo'yicha upsert qilinadi, shuning uchun bir
+    xil so'rovni qayta yuborish dublikat yaratmaydi. AttendanceCounter ham
+    shu tranzaksiyada yangilanadi.
+    `items` - [{"student": id, "status": id, "level": id (ixtiyoriy)}, ...]
+    """
+    date = date or timezone.localdate()
+    rows = [
+        {
+            'student': item['student'],
+            'status': item['status'],
+            'level': item.get('level') or level_id,
+        }
+        for item in items
+    ]
+
+    errors = {}
+    if any(row['level'] is None for row in rows):
+        errors['level'] = "level majburiy (umumiy yoki har bir talaba uchun)"
+
+    if needs_archive(date):
+        errors['date'] = f"{archived_until()} gacha bo‘lgan davomat arxivlangan"
+
+    student_ids = [row['student'] for row in rows]
+    if len(set(student_ids)) != len(student_ids):
+        errors['items'] = "Bir talaba ro‘yxatda bir necha marta berilgan"
+    if errors:
+        raise ValidationError(errors)
+
+    existing_students = Student.objects.filter(id__in=student_ids, group_id=group.id).values_list('id', flat=True)
+    existing_statuses = Status.objects.filter(id__in={row['status'] for row in rows}).values_list('id', flat=True)
+    existing_levels = AttendanceLevel.objects.filter(id__in={row['level'] for row in rows}).values_list('id', flat=True)
+
+    missing = {
+        'student': _missing(student_ids, existing_students),
+        'status': _missing((row['status'] for row in rows), existing_statuses),
+        'level': _missing((row['level'] for row in rows), existing_levels),
+    }
+    if missing['student']:
+        errors['student'] = f"Guruhda bunday talabalar yo‘q: {missing['student']}"
+    if missing['status']:
+        errors['status'] = f"Status topilmadi: {missing['status']}"
+    if missing['level']:
+        errors['level'] = f"Daraja topilmadi: {missing['level']}"
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        previous = dict(
+            Attendance.objects.select_for_update()
+            .filter(group_id=group.id, date=date, student_id__in=student_ids)
+            .values_list('student_id', 'status_id')
+        )
+        Attendance.objects.bulk_create(
+            [
+                Attendance(
+                    group_id=group.id, date=date, student_id=row['student'],
+                    status_id=row['status'], level_id=row['level'],
+                )
+                for row in rows
+            ],
+            update_conflicts=True,
+            unique_fields=['student', 'group', 'date'],
+            update_fields=['status', 'level', 'updated'],
+        )
+        deltas = {}
+        for row in rows:
+            new_key = counter_key(row['student'], group.id, row['status'], date)
+            deltas[new_key] = deltas.get(new_key, 0) + 1
+            if row['student'] in previous:
+                old_key = counter_key(row['student'], group.id, previous[row['student']], date)
+                deltas[old_key] = deltas.get(old_key, 0) - 1
+        apply_counter_deltas(deltas)
+
+    return {
+        "group": group.id,
+        "date": date,
+        "created": len(rows) - len(previous),
+        "updated": len(previous),
+    }
+
+
+def month_range(month):
+    start = month.replace(day=1)
+    return start, start.replace(day=calendar.monthrange(start.year, start.month)[1])
+
+
+def month_attendance(group, start, end):
+    """
+    Oy davomati manbalari: joriy jadval va oy arxivga tushsa arxiv jadvali.
+    """
+    models = [Attendance, ArchivedAttendance] if needs_archive(start) else [Attendance]
+    return [model.objects.filter(group_id=group.id, date__range=(start, end)) for model in models]
+
+
+def attendance_matrix_etag(group, month):
+    """
+    Oy davomati va guruh tarkibi o'zgarmagan bo'lsa bir xil qoladigan ETag:
+    eng so'nggi `updated` va yozuvlar soni bo'yicha (aggregate so'rovlar).
+    """
+    start, end = month_range(month)
+    parts = [
+        queryset.aggregate(updated=Max('updated'), count=Count('id'))
+        for queryset in month_attendance(group, start, end)
+    ]
+    students = Student.objects.filter(group_id=group.id).aggregate(updated=Max('updated'), count=Count('id'))
+    raw = f"{group.id}:{start}:{parts}:{students['updated']}:{students['count']}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def attendance_matrix(group, month):
+    """
+    Oylik davomat jadvali ixcham ko'rinishda: talabalar va sanalar indekslari
+    hamda qatorma-qator (talaba x sana) status kodlari massivi.
+    0 - yozuv yo'q, qolgan kodlar `statuses` ro'yxatidagi tartib raqami.
+    """
+    start, end = month_range(month)
+    statuses = list(Status.objects.order_by('id').values('id', 'name', 'title'))
+    codes = {status['id']: code for code, status in enumerate(statuses, start=1)}
+
+    sources = [queryset.values_list('student_id', 'date', 'status_id') for queryset in month_attendance(group, start, end)]
+    rows = list(sources[0].union(*sources[1:], all=True) if len(sources) > 1 else sources[0])
+    students = list(
+        Student.objects.filter(group_id=group.id).order_by('user__full_name', 'id')
+        .values('id', 'user__full_name')
+    )
+    known = {student['id'] for student in students}
+    # Guruhdan chiqib ketgan, lekin shu oyda davomati bor talabalar
+    missing = {student_id for student_id, _, _ in rows} - known
+    if missing:
+        students += list(
+            Student.objects.filter(id__in=missing).order_by('id').values('id', 'user__full_name')
+        )
+
+    dates = sorted({day for _, day, _ in rows})
+    student_index = {student['id']: index for index, student in enumerate(students)}
+    date_index = {day: index for index, day in enumerate(dates)}
+    matrix = [0] * (len(students) * len(dates))
+    for student_id, day, status_id in rows:
+        matrix[student_index[student_id] * len(dates) + date_index[day]] = codes.get(status_id, 0)
+
+    return {
+        "group": group.id,
+        "month": start.strftime('%Y-%m'),
+        "statuses": [{"code": codes[status['id']], **status} for status in statuses],
+        "students": [{"id": student['id'], "full_name": student['user__full_name']} for student in students],
+        "dates": dates,
+        "shape": [len(students), len(dates)],
+        "codes": matrix,
+    }
@@ -0,0 +1,109 @@
+import copy
+
+from django.conf import settings
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import SessionAuthentication, TokenAuthentication
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .cache import TTLCache
+from .tokens import ROLE_VERSION_CLAIM, get_role_version
+
+
+USER_CACHE_SETTINGS = getattr(settings, 'USER_CACHE', {})
+
+user_cache = TTLCache(
+    max_size=USER_CACHE_SETTINGS.get('MAX_SIZE', 1024),
+    ttl=USER_CACHE_SETTINGS.get('TTL', 15),
+)
+
+
+def invalidate_cached_user(user_id):
+    user_cache.delete(str(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication bilan bir xil, lekin `user_id` bo'yicha topilgan
+    foydalanuvchini TTL keshda saqlaydi. User saqlanganda yoki o'chirilganda
+    kesh signallar orqali tozalanadi (app_config/signals.py).
+
+    Cheklov: kesh jarayon ichida. Signal faqat User ni saqlagan jarayondagi
+    yozuvni o'chiradi, QuerySet.update() esa signal yubormaydi. Boshqa
+    workerlarda o'zgarish (masalan, is_active=False) ko'pi bilan
+    USER_CACHE['TTL'] soniyadan keyin ko'rinadi, shuning uchun TTL qisqa
+    saqlanadi. User ni update() bilan o'zgartiradigan kod
+    invalidate_cached_user() ni o'zi chaqirishi kerak.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(str(user_id))
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(str(user_id), user)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        # Keshdagi obyekt so'rovlar orasida o'zgartirilmasligi uchun nusxa qaytaramiz
+        return copy.copy(user)
+
+
+class RoleClaimsUser(TokenUser):
+    """
+    Bazaga murojaat qilmasdan token claimlaridan qurilgan foydalanuvchi.
+    """
+
+    @cached_property
+    def is_admin(self):
+        return self.token.get('is_admin', False)
+
+    @cached_property
+    def is_teacher(self):
+        return self.token.get('is_teacher', False)
+
+    @cached_property
+    def is_student(self):
+        return self.token.get('is_student', False)
+
+    @cached_property
+    def role_version(self):
+        return self.token.get(ROLE_VERSION_CLAIM)
+
+
+class RoleClaimsAuthentication(JWTStatelessUserAuthentication):
+    """
+    Faqat imzolangan rol claimlari bilan ishlaydigan autentifikatsiya.
+    Rollar o'zgargan bo'lsa (role_version mos kelmasa) token rad etiladi
+    va mijoz tokenni yangilashi kerak.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_VERSION_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contains no role claims"))
+
+        user = super().get_user(validated_token)
+        current = get_role_version(user.id)
+        if current is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if current != validated_token[ROLE_VERSION_CLAIM]:
+            raise AuthenticationFailed(
+                _("User roles have changed, refresh the token."), code="roles_changed"
+            )
+        return user
+
+
+# Faqat rollarni tekshiradigan (User modelining boshqa maydonlari kerak
+# bo'lmagan) viewlar uchun: JWT bo'lsa User yuklanmaydi, request.user -
+# RoleClaimsUser. Token/Session autentifikatsiyasi avvalgidek ishlaydi.
+CLAIM_AUTHENTICATION_CLASSES = [RoleClaimsAuthentication, TokenAuthentication, SessionAuthentication]
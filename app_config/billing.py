@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Invoice, Payment, Student
+
+
+BILLING_BATCH_SIZE = 2000
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def billable_students(today=None):
+    """
+    Faol talabalar: guruhi tugamagan va guruh narxi belgilangan.
+    """
+    today = today or timezone.localdate()
+    return Student.objects.filter(
+        is_active=True,
+        group__price__isnull=False,
+        group__end_date__gte=today,
+    )
+
+
+def run_billing(month, batch_size=BILLING_BATCH_SIZE, today=None):
+    """
+    `month` uchun har bir faol talabaga guruh narxi bo'yicha hisob yozadi.
+
+    Talabalar bitta so'rov bilan (id, group_id, group.price) sifatida o'qiladi
+    va hisoblar partiyalab bulk_create qilinadi. (student, month) unique
+    constraint tufayli qayta ishga tushirish dublikat yaratmaydi: mavjud
+    hisobning guruhi va summasi joriy guruh narxiga yangilanadi (oy o'rtasida
+    guruh almashgan talaba ham bitta hisobga ega bo'ladi).
+    """
+    rows = (
+        billable_students(today)
+        .order_by('id')
+        .values_list('id', 'group_id', 'group__price')
+    )
+    with transaction.atomic():
+        existing = Invoice.objects.filter(month=month).count()
+        total = 0
+        amount = Decimal('0')
+        batch = []
+        for student_id, group_id, price in rows.iterator(chunk_size=batch_size):
+            batch.append(Invoice(student_id=student_id, group_id=group_id, month_id=month.id, amount=price))
+            total += 1
+            amount += price
+            if len(batch) >= batch_size:
+                _write_invoices(batch)
+                batch = []
+        if batch:
+            _write_invoices(batch)
+        created = Invoice.objects.filter(month=month).count() - existing
+
+    return {
+        "month": month.id,
+        "students": total,
+        "created": created,
+        "updated": total - created,
+        "amount": amount,
+    }
+
+
+def _write_invoices(batch):
+    Invoice.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['student', 'month'],
+        update_fields=['group', 'amount', 'updated_at'],
+    )
+
+
+def _student_total(queryset, field):
+    return Coalesce(
+        Subquery(queryset.values('student').annotate(total=Sum(field)).values('total')[:1]),
+        ZERO,
+    )
+
+
+def with_balance(students, month=None):
+    """
+    Talabalar querysetiga invoiced, paid va debt (hisob minus to'lov) qo'shadi:
+    ikkita korrelyatsiyalangan SUM subquery, talaba bo'yicha sikl yo'q.
+    """
+    invoices = Invoice.objects.filter(student=OuterRef('pk'))
+    payments = Payment.objects.filter(student=OuterRef('pk'))
+    if month is not None:
+        invoices = invoices.filter(month=month)
+        payments = payments.filter(month=month)
+    return (
+        students.annotate(invoiced=_student_total(invoices, 'amount'), paid=_student_total(payments, 'price'))
+        .annotate(debt=F('invoiced') - F('paid'))
+    )
+
+
+def debtors(month=None, group_id=None):
+    """
+    Hisob summasi minus to'lovlar (talaba bo'yicha). Faqat qarzi borlar,
+    eng katta qarz birinchi. Bitta so'rov: ikkita korrelyatsiyalangan SUM subquery.
+    """
+    students = Student.objects.filter(
+        id__in=(Invoice.objects.filter(month=month) if month is not None else Invoice.objects.all()).values('student_id')
+    )
+    if group_id is not None:
+        students = students.filter(group_id=group_id)
+    return (
+        with_balance(students, month)
+        .filter(debt__gt=0)
+        .values('id', 'user__full_name', 'user__phone', 'group_id', 'group__title', 'invoiced', 'paid', 'debt')
+        .order_by('-debt', 'id')
+    )
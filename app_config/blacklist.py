@@ -0,0 +1,192 @@
+import hashlib
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from .cache import TTLCache
+
+
+BLACKLIST_FILTER_SETTINGS = getattr(settings, 'TOKEN_BLACKLIST_FILTER', {})
+
+
+class BloomFilter:
+    """
+    Oddiy bloom filtri: "yo'q" javobi aniq, "bor" javobi esa ehtimoliy.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, value):
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    def estimated_error_rate(self):
+        return (1 - math.exp(-self.hash_count * self.count / self.size)) ** self.hash_count
+
+
+class BlacklistFilter:
+    """
+    Qora ro'yxatdagi JTI lar uchun jarayon ichidagi a'zolik filtri.
+
+    BlacklistedToken jadvalidan `id` bo'yicha inkremental to'ldiriladi
+    (har `SYNC_INTERVAL` soniyada bitta `id > chegara` so'rovi). Bloom "yo'q"
+    desa baza tekshirilmaydi; "bor" desa natija LRU keshdan yoki bitta
+    so'rov bilan aniqlanadi. Boshqa jarayonda qora ro'yxatga kiritilgan token
+    ko'pi bilan SYNC_INTERVAL soniya kechikib ko'rinadi.
+
+    id lar commit tartibida kelmasligi mumkin (kichik id li tranzaksiya
+    kechroq commit bo'ladi), shuning uchun so'nggi `SYNC_OVERLAP` soniyada
+    yuklangan id oralig'i har sync da qayta o'qiladi.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.01, sync_interval=5, lru_size=4096, sync_overlap=60):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.sync_overlap = sync_overlap
+        self._lock = threading.Lock()
+        self._confirmed = TTLCache(max_size=lru_size, ttl=24 * 60 * 60)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+            self._last_id = 0
+            self._windows = deque()  # (monotonic, sync oldidagi _last_id)
+            self._synced_at = None
+            self._confirmed.clear()
+            self.checks = 0
+            self.bloom_negatives = 0
+            self.false_positives = 0
+
+    def add(self, jti):
+        with self._lock:
+            self._add(jti)
+
+    def _add(self, jti):
+        self._bloom.add(jti)
+        self._confirmed.set(jti, True)
+
+    def sync(self, force=False):
+        now = time.monotonic()
+        if not force and self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        with self._lock:
+            if self._bloom.count >= self._bloom.capacity:
+                # Filtr to'lib qoldi: kattaroq filtrni bazadan qaytadan quramiz
+                self.capacity *= 2
+                self._bloom = BloomFilter(self.capacity, self.error_rate)
+                self._last_id = 0
+                self._windows.clear()
+            while self._windows and now - self._windows[0][0] > self.sync_overlap:
+                self._windows.popleft()
+            floor = self._windows[0][1] if self._windows else self._last_id
+            self._windows.append((now, self._last_id))
+            rows = (
+                BlacklistedToken.objects.filter(id__gt=floor)
+                .order_by('id')
+                .values_list('id', 'token__jti')
+            )
+            for row_id, jti in rows.iterator(chunk_size=2000):
+                if row_id > self._last_id or jti not in self._bloom:
+                    self._add(jti)  # yangi yoki kech commit bo'lgan qator
+                else:
+                    self._confirmed.set(jti, True)
+                self._last_id = max(self._last_id, row_id)
+            self._synced_at = now
+
+    def is_blacklisted(self, jti):
+        self.sync()
+        self.checks += 1
+        if jti not in self._bloom:
+            self.bloom_negatives += 1
+            return False
+
+        cached = self._confirmed.get(jti)
+        if cached is not None:
+            return cached
+
+        exists = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if not exists:
+            self.false_positives += 1
+        self._confirmed.set(jti, exists)
+        return exists
+
+    def stats(self):
+        probes = self.bloom_negatives + self.false_positives
+        return {
+            "entries": self._bloom.count,
+            "capacity": self._bloom.capacity,
+            "bits": self._bloom.size,
+            "hashes": self._bloom.hash_count,
+            "checks": self.checks,
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": round(self.false_positives / probes, 6) if probes else 0.0,
+            "estimated_false_positive_rate": round(self._bloom.estimated_error_rate(), 6),
+        }
+
+
+blacklist_filter = BlacklistFilter(
+    capacity=BLACKLIST_FILTER_SETTINGS.get('CAPACITY', 100000),
+    error_rate=BLACKLIST_FILTER_SETTINGS.get('ERROR_RATE', 0.01),
+    sync_interval=BLACKLIST_FILTER_SETTINGS.get('SYNC_INTERVAL', 5),
+    lru_size=BLACKLIST_FILTER_SETTINGS.get('LRU_SIZE', 4096),
+    sync_overlap=BLACKLIST_FILTER_SETTINGS.get('SYNC_OVERLAP', 60),
+)
+
+
+def token_table_stats():
+    now = timezone.now()
+    return {
+        "outstanding": OutstandingToken.objects.count(),
+        "outstanding_expired": OutstandingToken.objects.filter(expires_at__lt=now).count(),
+        "blacklisted": BlacklistedToken.objects.count(),
+    }
+
+
+def prune_expired_tokens(batch_size=1000, now=None):
+    """
+    Muddati o'tgan OutstandingToken va ularga bog'langan BlacklistedToken
+    yozuvlarini partiyalab o'chiradi. Cron/scheduler shu funksiyani
+    (yoki `prune_tokens` buyrug'ini) chaqirishi mumkin.
+    """
+    now = now or timezone.now()
+    deleted = {"outstanding": 0, "blacklisted": 0}
+    while True:
+        ids = list(
+            OutstandingToken.objects.filter(expires_at__lt=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        with transaction.atomic():
+            deleted["blacklisted"] += BlacklistedToken.objects.filter(token_id__in=ids).delete()[0]
+            deleted["outstanding"] += OutstandingToken.objects.filter(id__in=ids).delete()[0]
+
+    if deleted["blacklisted"]:
+        # Bloom filtridan element o'chirib bo'lmaydi, shuning uchun qaytadan quramiz
+        blacklist_filter.reset()
+    return deleted
@@ -0,0 +1,138 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+from .models import ArchivedAttendance, Attendance, AttendanceCounter
+
+
+ATTENDANCE_SETTINGS = getattr(settings, 'ATTENDANCE', {})
+# Status.name qiymatlari: "keldi" deb hisoblanadigan statuslar
+PRESENT_STATUSES = {name.lower() for name in ATTENDANCE_SETTINGS.get('PRESENT_STATUSES', ('present',))}
+
+
+def counter_key(student_id, group_id, status_id, date):
+    return (student_id, group_id, status_id, date.replace(day=1))
+
+
+def attendance_key(attendance):
+    return counter_key(attendance.student_id, attendance.group_id, attendance.status_id, attendance.date)
+
+
+def apply_counter_deltas(deltas):
+    """
+    {(student_id, group_id, status_id, month): +/-n} o'zgarishlarini qo'llaydi:
+    yo'q qatorlar bitta bulk_create bilan ochiladi, so'ng barchasi bitta
+    UPDATE ... SET count = count + CASE ... bilan yangilanadi.
+    Attendance yozuvi bilan bir tranzaksiyada chaqirilishi kerak.
+    """
+    deltas = {key: delta for key, delta in Counter(deltas).items() if delta}
+    if not deltas:
+        return
+
+    def key_q(key):
+        student_id, group_id, status_id, month = key
+        return Q(student_id=student_id, group_id=group_id, status_id=status_id, month=month)
+
+    with transaction.atomic():
+        AttendanceCounter.objects.bulk_create(
+            [
+                AttendanceCounter(student_id=student_id, group_id=group_id, status_id=status_id, month=month)
+                for student_id, group_id, status_id, month in deltas
+            ],
+            ignore_conflicts=True,
+        )
+        condition = Q()
+        for key in deltas:
+            condition |= key_q(key)
+        AttendanceCounter.objects.filter(condition).update(
+            count=F('count') + Case(
+                *(When(key_q(key), then=Value(delta)) for key, delta in deltas.items()),
+                default=Value(0),
+            )
+        )
+
+
+def rebuild_attendance_counters(batch_size=1000):
+    """
+    Hisoblagichlarni Attendance va ArchivedAttendance jadvallaridan boshidan qayta quradi.
+    """
+    totals = Counter()
+    for model in (Attendance, ArchivedAttendance):
+        rows = (
+            model.objects.annotate(month=TruncMonth('date'))
+            .values_list('student_id', 'group_id', 'status_id', 'month')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+        for student_id, group_id, status_id, month, count in rows.iterator():
+            totals[(student_id, group_id, status_id, month)] += count
+
+    with transaction.atomic():
+        AttendanceCounter.objects.all().delete()
+        AttendanceCounter.objects.bulk_create(
+            (
+                AttendanceCounter(student_id=student_id, group_id=group_id, status_id=status_id, month=month, count=count)
+                for (student_id, group_id, status_id, month), count in totals.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(totals)
+
+
+def attendance_summary(queryset, by_student=False):
+    """
+    AttendanceCounter querysetidan davomat ko'rsatkichlari: jami, status
+    bo'yicha soni, kelmaganlar soni va davomat foizi.
+    `by_student=True` bo'lsa natija talabalar kesimida ham qaytariladi.
+    """
+    fields = ['status_id', 'status__name', 'status__title']
+    if by_student:
+        fields.append('student_id')
+    rows = queryset.values(*fields).annotate(total=Sum('count')).order_by()
+
+    summaries = {}
+    overall = _empty_summary()
+    for row in rows:
+        if not row['total']:
+            continue
+        targets = [overall]
+        if by_student:
+            targets.append(summaries.setdefault(row['student_id'], _empty_summary()))
+        for summary in targets:
+            _add_row(summary, row)
+
+    result = _finish(overall)
+    if by_student:
+        result['students'] = [
+            {"student_id": student_id, **_finish(summary)}
+            for student_id, summary in sorted(summaries.items())
+        ]
+    return result
+
+
+def _empty_summary():
+    return {"total": 0, "present": 0, "by_status": {}}
+
+
+def _add_row(summary, row):
+    summary['total'] += row['total']
+    if (row['status__name'] or '').lower() in PRESENT_STATUSES:
+        summary['present'] += row['total']
+    status = summary['by_status'].setdefault(
+        row['status_id'], {"status_id": row['status_id'], "title": row['status__title'], "count": 0}
+    )
+    status['count'] += row['total']
+
+
+def _finish(summary):
+    total, present = summary['total'], summary['present']
+    return {
+        "total": total,
+        "present": present,
+        "absent": total - present,
+        "rate": round(present / total * 100, 2) if total else None,
+        "by_status": list(summary['by_status'].values()),
+    }
@@ -0,0 +1,107 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .archive import attendance_queryset
+from .models import Attendance, Payment, Student
+
+
+EXPORT_CHUNK_SIZE = 2000
+
+# kind -> (model, sana maydoni, ustunlar: (sarlavha, values() lookup))
+EXPORTS = {
+    'students': (Student, 'created', (
+        ('id', 'id'),
+        ('phone', 'user__phone'),
+        ('full_name', 'user__full_name'),
+        ('group_id', 'group_id'),
+        ('group', 'group__title'),
+        ('course', 'group__course__title'),
+        ('is_active', 'is_active'),
+        ('created', 'created'),
+    )),
+    'attendance': (Attendance, 'created', (
+        ('id', 'id'),
+        ('student_id', 'student_id'),
+        ('full_name', 'student__user__full_name'),
+        ('phone', 'student__user__phone'),
+        ('group_id', 'group_id'),
+        ('group', 'group__title'),
+        ('course', 'group__course__title'),
+        ('status', 'status__title'),
+        ('level', 'level__title'),
+        ('created', 'created'),
+    )),
+    'payments': (Payment, 'created_at', (
+        ('id', 'id'),
+        ('student_id', 'student_id'),
+        ('full_name', 'student__user__full_name'),
+        ('phone', 'student__user__phone'),
+        ('group_id', 'group_id'),
+        ('group', 'group__title'),
+        ('course', 'group__course__title'),
+        ('month', 'month__title'),
+        ('payment_type', 'payment_type__title'),
+        ('price', 'price'),
+        ('created_at', 'created_at'),
+    )),
+}
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    csv.writer uchun: yozilgan qatorni buferlamasdan qaytaradi.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(kind, start_date=None, end_date=None, group_id=None):
+    """
+    values() qatorlarini server tomonidagi kursor orqali chunk-chunk o'qiydi:
+    eksport hajmidan qat'i nazar xotira sarfi o'zgarmaydi.
+    """
+    model, date_field, columns = EXPORTS[kind]
+    filters = {}
+    if start_date:
+        filters[f"{date_field}__date__gte"] = start_date
+    if end_date:
+        filters[f"{date_field}__date__lte"] = end_date
+    if group_id:
+        filters['group_id'] = group_id
+    lookups = [lookup for _, lookup in columns]
+    if model is Attendance:
+        # Arxivlangan davomat ham eksportga kiradi (archive.attendance_queryset UNION)
+        queryset = attendance_queryset(fields=lookups, **filters)
+    else:
+        queryset = model.objects.filter(**filters).values_list(*lookups)
+    return queryset.order_by('id').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def iter_csv(kind, rows):
+    writer = csv.writer(Echo())
+    yield '\ufeff' + writer.writerow([header for header, _ in EXPORTS[kind][2]])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(kind, rows):
+    headers = [header for header, _ in EXPORTS[kind][2]]
+    for row in rows:
+        yield json.dumps(dict(zip(headers, row)), cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def streaming_export(kind, fmt='ndjson', **filters):
+    rows = export_rows(kind, **filters)
+    content = iter_csv(kind, rows) if fmt == 'csv' else iter_ndjson(kind, rows)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{kind}.{fmt}"'
+    return response
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+PASSWORD_POOL_SETTINGS = getattr(settings, 'PASSWORD_CHECK_POOL', {})
+
+
+class PasswordPoolOverloaded(APIException):
+    """
+    Navbat to'lgan: so'rov kutib turmasdan 503 va Retry-After bilan qaytariladi.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Server band, birozdan so'ng qayta urinib ko'ring"
+    default_code = 'service_unavailable'
+
+    def __init__(self, wait, detail=None):
+        super().__init__(detail)
+        self.wait = wait
+
+
+class PasswordCheckPool:
+    """
+    Parol xeshini tekshirishni cheklangan thread pool da bajaradi.
+    Bir vaqtda `max_workers` ta tekshiruv ishlaydi, yana `max_queue` tasi
+    navbatda turadi; undan ortig'i darhol PasswordPoolOverloaded bilan rad etiladi.
+    """
+
+    def __init__(self, max_workers=4, max_queue=32, retry_after=2):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='password-check')
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolOverloaded(wait=self.retry_after)
+
+        with self._lock:
+            self.in_flight += 1
+        enqueued_at = time.monotonic()
+
+        def run():
+            started_at = time.monotonic()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.monotonic()
+                self._record(started_at - enqueued_at, finished_at - started_at)
+                self._slots.release()
+
+        return self._executor.submit(run)
+
+    def _record(self, queue_wait, hash_time):
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "hash_ms_avg": round(self.hash_time_total / completed * 1000, 2),
+                "hash_ms_max": round(self.hash_time_max * 1000, 2),
+                "queue_wait_ms_avg": round(self.queue_wait_total / completed * 1000, 2),
+                "queue_wait_ms_max": round(self.queue_wait_max * 1000, 2),
+            }
+
+
+password_pool = PasswordCheckPool(
+    max_workers=PASSWORD_POOL_SETTINGS.get('MAX_WORKERS', 4),
+    max_queue=PASSWORD_POOL_SETTINGS.get('MAX_QUEUE', 32),
+    retry_after=PASSWORD_POOL_SETTINGS.get('RETRY_AFTER', 2),
+)
+
+
+def _check_password(user, password):
+    if user is None:
+        # Foydalanuvchi mavjud-mavjud emasligini javob vaqtidan bilib bo'lmasligi uchun
+        get_user_model()().set_password(password)
+        return False
+    return user.check_password(password)
+
+
+def _can_authenticate(user, valid):
+    return valid and getattr(user, 'is_active', True)
+
+
+def verify_credentials(phone, password):
+    """
+    Telefon va parolni tekshiradi; to'g'ri bo'lsa foydalanuvchini qaytaradi.
+    Pool to'lgan bo'lsa PasswordPoolOverloaded ko'taradi.
+    """
+    user = get_user_model().objects.filter(phone=phone).first()
+    valid = password_pool.submit(_check_password, user, password).result()
+    return user if _can_authenticate(user, valid) else None
+
+
+async def averify_credentials(phone, password):
+    """
+    verify_credentials ning async varianti (ASGI ostida event loop bloklanmaydi).
+    """
+    user = await get_user_model().objects.filter(phone=phone).afirst()
+    valid = await asyncio.wrap_future(password_pool.submit(_check_password, user, password))
+    return user if _can_authenticate(user, valid) else None
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Ko'p parolni parallel xeshlaydi (ommaviy import uchun). Login pool idan
+    alohida executor ishlatiladi, shuning uchun import loginlarni bloklamaydi.
+    Bo'sh parol uchun ishlatib bo'lmaydigan (unusable) parol qaytariladi.
+    """
+    workers = workers or PASSWORD_POOL_SETTINGS.get('MAX_WORKERS', 4)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash') as executor:
+        return list(executor.map(lambda raw: make_password(raw or None), passwords))
@@ -0,0 +1,104 @@
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Group, GroupHomeWork, HomeWork, Topics
+from .pagination import keyset_page
+
+
+INBOX_COLUMNS = (
+    'id', 'created', 'link', 'descriptions', 'student_id', 'student__user__full_name',
+    'groupHomeWork_id', 'groupHomeWork__topic__title',
+    'groupHomeWork__group_id', 'groupHomeWork__group__title',
+)
+
+
+def pending_homework(teacher_user_id=None, teacher_id=None, group_id=None):
+    """
+    O'qituvchi biriktirilgan (Group.teacher) guruhlardagi tekshirilmagan uy ishlari.
+    """
+    groups = Group.objects.all()
+    if teacher_id is not None:
+        groups = groups.filter(teacher__id=teacher_id)
+    if teacher_user_id is not None:
+        groups = groups.filter(teacher__user_id=teacher_user_id)
+    queryset = HomeWork.objects.filter(is_active=False, groupHomeWork__group__in=groups.values('id'))
+    if group_id is not None:
+        queryset = queryset.filter(groupHomeWork__group_id=group_id)
+    return queryset
+
+
+def homework_inbox(queryset, cursor=None, limit=20):
+    """
+    Keyset sahifa (created, id) va guruhlar bo'yicha kutilayotgan ishlar soni:
+    jami ikki so'rov (sahifa va bitta GROUP BY aggregate).
+    """
+    rows, next_cursor = keyset_page(queryset.values(*INBOX_COLUMNS), 'created', cursor, limit)
+    counts = (
+        queryset.values('groupHomeWork__group_id', 'groupHomeWork__group__title')
+        .annotate(pending=Count('id'))
+        .order_by('groupHomeWork__group__title')
+    )
+    return {
+        "groups": [
+            {"group_id": row['groupHomeWork__group_id'], "group": row['groupHomeWork__group__title'], "pending": row['pending']}
+            for row in counts
+        ],
+        "next": next_cursor,
+        "results": rows,
+    }
+
+
+def assign_homework(topic_ids, group_ids=None, course_id=None, descriptions=None):
+    """
+    Mavzularni guruhlarga ommaviy biriktiradi. Guruhlar ro'yxat bilan yoki
+    `course_id` ning faol (tugamagan) guruhlari sifatida beriladi.
+    Faqat Topics.course == Group.course bo'lgan juftliklar yaratiladi,
+    mavjudlari (group, topic) unique constraint tufayli o'tkazib yuboriladi.
+    """
+    topic_ids = set(topic_ids)
+    topics = dict(Topics.objects.filter(id__in=topic_ids).values_list('id', 'course_id'))
+    errors = {}
+    if topic_ids - set(topics):
+        errors['topics'] = f"Mavzu topilmadi: {sorted(topic_ids - set(topics))}"
+
+    if group_ids:
+        group_ids = set(group_ids)
+        groups = dict(Group.objects.filter(id__in=group_ids).values_list('id', 'course_id'))
+        if group_ids - set(groups):
+            errors['groups'] = f"Guruh topilmadi: {sorted(group_ids - set(groups))}"
+    else:
+        groups = dict(
+            Group.objects.filter(course_id=course_id, end_date__gte=timezone.localdate())
+            .values_list('id', 'course_id')
+        )
+    if errors:
+        raise ValidationError(errors)
+
+    pairs = {
+        (group_id, topic_id)
+        for topic_id, topic_course in topics.items()
+        for group_id, group_course in groups.items()
+        if topic_course == group_course
+    }
+    if not pairs:
+        raise ValidationError({"non_field_errors": "Kursi mos keladigan guruh va mavzu juftligi yo‘q"})
+
+    with transaction.atomic():
+        existing = set(
+            GroupHomeWork.objects.filter(group_id__in=groups, topic_id__in=topics)
+            .values_list('group_id', 'topic_id')
+        )
+        GroupHomeWork.objects.bulk_create(
+            [
+                GroupHomeWork(group_id=group_id, topic_id=topic_id, descriptions=descriptions)
+                for group_id, topic_id in sorted(pairs - existing)
+            ],
+            ignore_conflicts=True,
+        )
+    return {
+        "created": len(pairs - existing),
+        "existing": len(pairs & existing),
+        "skipped": len(topics) * len(groups) - len(pairs),
+    }
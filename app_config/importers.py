@@ -0,0 +1,243 @@
+import csv
+import io
+from itertools import islice
+from zipfile import BadZipFile
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .hashing import hash_passwords
+from .models import Course, Group, Student, User
+from .statistics import mark_groups_dirty
+
+
+STUDENT_IMPORT_COLUMNS = ('phone', 'full_name', 'password', 'group', 'course', 'descriptions')
+
+# Ustun -> model maydoni: uzunlik qatorma-qator tekshiriladi (Postgres DataError bermasligi uchun)
+STUDENT_IMPORT_LENGTHS = {
+    'full_name': User._meta.get_field('full_name').max_length,
+    'descriptions': Student._meta.get_field('descriptions').max_length,
+}
+
+
+class ImportFormatError(Exception):
+    pass
+
+
+def iter_csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    reader = csv.DictReader(text)
+    rows = enumerate(reader, start=2)
+    while True:
+        # Fayl qatorma-qator o'qiladi: kodlash xatosi istalgan qatorda chiqishi mumkin
+        try:
+            row_number, row = next(rows)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            raise ImportFormatError(f"CSV fayl UTF-8 kodlashda emas ({reader.line_num + 1}-qator atrofida)")
+        except csv.Error as e:
+            raise ImportFormatError(f"CSV fayl o'qib bo'lmadi ({reader.line_num}-qator): {e}")
+        yield row_number, row
+
+
+def iter_xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import uchun openpyxl o‘rnatilishi kerak")
+
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except (BadZipFile, InvalidFileException, KeyError) as e:
+        raise ImportFormatError(f"XLSX fayl buzilgan yoki XLSX emas: {e}")
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else '' for cell in next(rows, ())]
+        for row_number, values in enumerate(rows, start=2):
+            if not any(value is not None for value in values):
+                continue
+            yield row_number, {
+                key: '' if value is None else str(value) for key, value in zip(header, values)
+            }
+    except (BadZipFile, InvalidFileException) as e:
+        raise ImportFormatError(f"XLSX fayl buzilgan: {e}")
+    finally:
+        workbook.close()
+
+
+def iter_rows(fileobj, filename):
+    """
+    Faylni to'liq xotiraga yuklamasdan qatorma-qator o'qiydi: (qator_raqami, dict).
+    """
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return iter_csv_rows(fileobj)
+    if name.endswith('.xlsx'):
+        return iter_xlsx_rows(fileobj)
+    raise ImportFormatError("Faqat .csv yoki .xlsx fayllar qabul qilinadi")
+
+
+def parse_id(part):
+    """
+    Butun son ID. XLSX raqamli kataklari "3.0" ko'rinishida keladi, ular
+    qabul qilinadi; "1.9" kabi kasr qiymatlar ValueError beradi.
+    """
+    part = part.strip()
+    try:
+        return int(part)
+    except ValueError:
+        number = float(part)
+        if not number.is_integer():
+            raise
+        return int(number)
+
+
+def parse_ids(value):
+    value = (value or '').strip()
+    if not value:
+        return []
+    return [parse_id(part) for part in value.replace(';', ',').split(',') if part.strip()]
+
+
+class StudentImporter:
+    """
+    Talabalarni fayldan ommaviy import qilish.
+
+    Qatorlar `chunk_size` tadan qayta ishlanadi: har bir chunk uchun mavjud
+    telefonlar, guruh va kurslar bittadan set-based so'rov bilan tekshiriladi,
+    parollar parallel xeshlanadi va yozuvlar alohida tranzaksiyada bulk_create
+    qilinadi. Xato qatorlar hisobotga yoziladi, qolganlari import qilinadi.
+    """
+
+    def __init__(self, chunk_size=500, workers=None):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.seen_phones = set()
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.process_chunk(chunk)
+        return self.report()
+
+    def report(self):
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def add_error(self, row_number, errors):
+        self.errors.append({"row": row_number, "errors": errors})
+
+    def process_chunk(self, chunk):
+        parsed = []
+        for row_number, row in chunk:
+            data, errors = self.clean_row(row)
+            if errors:
+                self.add_error(row_number, errors)
+            else:
+                parsed.append((row_number, data))
+        if not parsed:
+            return
+
+        phones = [data['phone'] for _, data in parsed]
+        existing_phones = set(User.objects.filter(phone__in=phones).values_list('phone', flat=True))
+        group_ids = {data['group'] for _, data in parsed if data['group']}
+        existing_groups = set(Group.objects.filter(id__in=group_ids).values_list('id', flat=True))
+        course_ids = {course for _, data in parsed for course in data['course']}
+        existing_courses = set(Course.objects.filter(id__in=course_ids).values_list('id', flat=True))
+
+        valid = []
+        for row_number, data in parsed:
+            errors = {}
+            if data['phone'] in existing_phones:
+                errors['phone'] = "Bu telefon raqam bilan foydalanuvchi mavjud"
+            elif data['phone'] in self.seen_phones:
+                errors['phone'] = "Telefon raqam faylda takrorlangan"
+            if data['group'] and data['group'] not in existing_groups:
+                errors['group'] = f"Guruh topilmadi: {data['group']}"
+            missing_courses = [course for course in data['course'] if course not in existing_courses]
+            if missing_courses:
+                errors['course'] = f"Kurs topilmadi: {missing_courses}"
+            if errors:
+                self.add_error(row_number, errors)
+                continue
+            self.seen_phones.add(data['phone'])
+            valid.append((row_number, data))
+        if not valid:
+            return
+
+        passwords = hash_passwords([data['password'] for _, data in valid], workers=self.workers)
+        try:
+            self.write(valid, passwords)
+        except DatabaseError as exc:
+            for row_number, _ in valid:
+                self.add_error(row_number, {"non_field_errors": f"Chunk yozilmadi: {exc}"})
+
+    def clean_row(self, row):
+        data = {key: (row.get(key) or '').strip() for key in STUDENT_IMPORT_COLUMNS}
+        errors = {}
+        if not data['phone']:
+            errors['phone'] = "Telefon raqam majburiy"
+        else:
+            try:
+                User.phone_regex(data['phone'])
+            except DjangoValidationError as exc:
+                errors['phone'] = exc.messages[0]
+        for key, max_length in STUDENT_IMPORT_LENGTHS.items():
+            if len(data[key]) > max_length:
+                errors[key] = f"{max_length} belgidan oshmasligi kerak ({len(data[key])})"
+        try:
+            data['group'] = parse_ids(data['group'])[0] if data['group'] else None
+        except ValueError:
+            errors['group'] = "Guruh ID raqam bo‘lishi kerak"
+        try:
+            data['course'] = parse_ids(data['course'])
+        except ValueError:
+            errors['course'] = "Kurs ID lari raqam bo‘lishi kerak"
+        return data, errors
+
+    @transaction.atomic
+    def write(self, valid, passwords):
+        users = User.objects.bulk_create([
+            User(
+                phone=data['phone'],
+                full_name=data['full_name'] or None,
+                password=password,
+                is_student=True,
+            )
+            for (_, data), password in zip(valid, passwords)
+        ])
+        if any(user.pk is None for user in users):
+            ids = dict(User.objects.filter(phone__in=[user.phone for user in users]).values_list('phone', 'id'))
+            for user in users:
+                user.pk = ids[user.phone]
+
+        students = Student.objects.bulk_create([
+            Student(user=user, group_id=data['group'], descriptions=data['descriptions'] or None)
+            for user, (_, data) in zip(users, valid)
+        ])
+        if any(student.pk is None for student in students):
+            ids = dict(Student.objects.filter(user__in=users).values_list('user_id', 'id'))
+            for student in students:
+                student.pk = ids[student.user_id]
+
+        Through = Student.course.through
+        Through.objects.bulk_create([
+            Through(student_id=student.pk, course_id=course)
+            for student, (_, data) in zip(students, valid)
+            for course in data['course']
+        ])
+        self.created += len(students)
+        # bulk_create signallarni chaqirmaydi
+        mark_groups_dirty({data['group'] for _, data in valid}, timezone.localdate())
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app_config.archive import ARCHIVE_BATCH_SIZE, HOT_MONTHS, archive_attendance, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Joriy davrdan eski davomat yozuvlarini ArchivedAttendance jadvaliga partiyalab ko'chiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=HOT_MONTHS, help="Asosiy jadvalda qoladigan oylar soni")
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        cutoff = archive_cutoff(options['months'])
+        moved = archive_attendance(cutoff, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{cutoff} dan oldingi {moved} ta yozuv arxivlandi"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_config.importers import ImportFormatError, StudentImporter, iter_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Talabalarni CSV/XLSX fayldan ommaviy import qiladi. "
+        "Ustunlar: phone, full_name, password, group, course (ID lar ',' yoki ';' bilan), descriptions"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=None, help="Parol xeshlash uchun thread lar soni")
+
+    def handle(self, *args, **options):
+        importer = StudentImporter(chunk_size=options['chunk_size'], workers=options['workers'])
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                report = importer.run(iter_rows(fileobj, options['path']))
+        except ImportFormatError as exc:
+            raise CommandError(str(exc))
+
+        for error in report['errors']:
+            self.stderr.write(f"{error['row']}-qator: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Import tugadi: yaratildi={report['created']}, xato={report['failed']}"
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from app_config.blacklist import blacklist_filter, prune_expired_tokens, token_table_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Muddati o'tgan OutstandingToken va BlacklistedToken yozuvlarini partiyalab o'chiradi. "
+        "Cron orqali ishga tushirish uchun: `python manage.py prune_tokens`"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--stats', action='store_true', help="Faqat statistikani ko'rsatish")
+
+    def handle(self, *args, **options):
+        if not options['stats']:
+            deleted = prune_expired_tokens(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f"O'chirildi: outstanding={deleted['outstanding']}, blacklisted={deleted['blacklisted']}"
+            ))
+
+        tables = token_table_stats()
+        self.stdout.write(
+            f"Jadval hajmi: outstanding={tables['outstanding']} "
+            f"(muddati o'tgan={tables['outstanding_expired']}), blacklisted={tables['blacklisted']}"
+        )
+        blacklist_filter.sync(force=True)
+        fp_rate = blacklist_filter.stats()['estimated_false_positive_rate']
+        self.stdout.write(f"Bloom filtr false-positive darajasi (taxminiy): {fp_rate}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app_config.counters import rebuild_attendance_counters
+
+
+class Command(BaseCommand):
+    help = "AttendanceCounter jadvalini Attendance yozuvlaridan boshidan qayta quradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_attendance_counters(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} ta hisoblagich qayta qurildi"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app_config.revenue import rebuild_revenue_rollup
+
+
+class Command(BaseCommand):
+    help = "RevenueRollup jadvalini Payment yozuvlaridan boshidan qayta quradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_revenue_rollup(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{total} ta rollup qatori qayta qurildi"))
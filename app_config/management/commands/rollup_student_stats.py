@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app_config.statistics import ensure_student_stats
+
+
+class Command(BaseCommand):
+    help = "Kunlik talabalar statistikasini (StudentDailyStat) inkremental yangilaydi. Cron orqali kuniga bir marta ishga tushirish mumkin."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Jadvalni boshidan qayta hisoblash")
+
+    def handle(self, *args, **options):
+        if ensure_student_stats(rebuild=options['rebuild']):
+            self.stdout.write(self.style.SUCCESS("Talabalar statistikasi yangilandi"))
+        else:
+            self.stdout.write(self.style.WARNING("Boshqa jarayon statistikani yangilamoqda"))
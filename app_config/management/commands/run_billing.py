@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from app_config.billing import BILLING_BATCH_SIZE, run_billing
+from app_config.models import Month
+
+
+class Command(BaseCommand):
+    help = "Oy uchun barcha faol talabalarga guruh narxi bo'yicha hisob (Invoice) yozadi. Qayta ishga tushirish xavfsiz."
+
+    def add_arguments(self, parser):
+        parser.add_argument('month', type=int, help="Month ID")
+        parser.add_argument('--batch-size', type=int, default=BILLING_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        month = Month.objects.filter(id=options['month']).first()
+        if month is None:
+            raise CommandError(f"Month topilmadi: {options['month']}")
+        result = run_billing(month, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{month}: {result['created']} ta yangi, {result['updated']} ta yangilangan hisob, jami {result['amount']} UZS"
+        ))
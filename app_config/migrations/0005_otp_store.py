@@ -0,0 +1,50 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:00
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.crypto import salted_hmac
+
+
+def copy_pending_codes(apps, schema_editor):
+    """
+    User.otp_code dagi tugallanmagan kodlar OTPCode ga ko'chiriladi (xeshlangan).
+    """
+    User = apps.get_model('app_config', 'User')
+    OTPCode = apps.get_model('app_config', 'OTPCode')
+    expires_at = timezone.now() + timedelta(minutes=5)
+    OTPCode.objects.bulk_create([
+        OTPCode(
+            phone=phone,
+            code_hash=salted_hmac('app_config.otp', f"{phone}:{code}").hexdigest(),
+            expires_at=expires_at,
+        )
+        for phone, code in User.objects.exclude(otp_code__isnull=True).exclude(otp_code='').values_list('phone', 'otp_code')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0004_user_role_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OTPCode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone', models.CharField(max_length=17, unique=True)),
+                ('code_hash', models.CharField(max_length=128)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(copy_pending_codes, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='otp_code',
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0007_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('registered', models.PositiveIntegerField(default=0)),
+                ('studying', models.PositiveIntegerField(default=0)),
+                ('graduated', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['created'], name='student_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='studentdailystat',
+            name='course',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app_config.course'),
+        ),
+        migrations.AddField(
+            model_name='studentdailystat',
+            name='group',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app_config.group'),
+        ),
+        migrations.AddIndex(
+            model_name='studentdailystat',
+            index=models.Index(fields=['date'], name='student_daily_stat_date_idx'),
+        ),
+    ]
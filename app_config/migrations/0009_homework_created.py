@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:18
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0008_student_daily_stat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['student', 'created', 'id'], name='homework_student_created_idx'),
+        ),
+    ]
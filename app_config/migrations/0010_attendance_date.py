@@ -0,0 +1,67 @@
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+import django.utils.timezone
+
+
+DUPLICATE_REPORT_LIMIT = 50
+
+
+def populate_attendance_date(apps, schema_editor):
+    """
+    `date` ni `created` dan to'ldiradi. Bir dars kuni uchun bir nechta yozuv
+    bo'lsa migratsiya hech narsani o'chirmaydi: dublikatlar ro'yxati bilan
+    to'xtaydi (tranzaksiya qaytariladi). Ortiqcha yozuvlarni qo'lda tuzatib
+    `migrate` ni qayta ishga tushiring.
+    """
+    Attendance = apps.get_model('app_config', 'Attendance')
+    Attendance.objects.filter(date__isnull=True).update(date=TruncDate('created'))
+
+    duplicates = list(
+        Attendance.objects.values('student_id', 'group_id', 'date')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('date', 'student_id', 'group_id')
+    )
+    if duplicates:
+        lines = []
+        for row in duplicates[:DUPLICATE_REPORT_LIMIT]:
+            ids = Attendance.objects.filter(
+                student_id=row['student_id'], group_id=row['group_id'], date=row['date'],
+            ).order_by('id').values_list('id', flat=True)
+            lines.append(
+                f"  student={row['student_id']} group={row['group_id']} date={row['date']}: id={list(ids)}"
+            )
+        if len(duplicates) > DUPLICATE_REPORT_LIMIT:
+            lines.append(f"  ... yana {len(duplicates) - DUPLICATE_REPORT_LIMIT} ta")
+        raise RuntimeError(
+            f"Attendance: bir dars kuni uchun bir nechta yozuv ({len(duplicates)} ta holat). "
+            "attendance_unique_lesson constraint qo'shilmadi, hech narsa o'chirilmadi. "
+            "Har bir (student, group, date) uchun bitta yozuv qoldirib, migrate ni qayta ishga tushiring:\n"
+            + "\n".join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0009_homework_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='date',
+            field=models.DateField(null=True),
+        ),
+        migrations.RunPython(populate_attendance_date, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='attendance',
+            name='date',
+            field=models.DateField(default=django.utils.timezone.localdate),
+        ),
+        migrations.AddConstraint(
+            model_name='attendance',
+            constraint=models.UniqueConstraint(fields=('student', 'group', 'date'), name='attendance_unique_lesson'),
+        ),
+    ]
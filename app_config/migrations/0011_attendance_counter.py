@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def build_attendance_counters(apps, schema_editor):
+    Attendance = apps.get_model('app_config', 'Attendance')
+    AttendanceCounter = apps.get_model('app_config', 'AttendanceCounter')
+    rows = (
+        Attendance.objects.annotate(month=TruncMonth('date'))
+        .values('student_id', 'group_id', 'status_id', 'month')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    AttendanceCounter.objects.bulk_create(
+        (AttendanceCounter(**row) for row in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0010_attendance_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_counters', to='app_config.group')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_counters', to='app_config.status')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attendance_counters', to='app_config.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['group', 'month'], name='attendance_counter_group_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'group', 'status', 'month'), name='attendance_counter_unique')],
+            },
+        ),
+        migrations.RunPython(build_attendance_counters, migrations.RunPython.noop),
+    ]
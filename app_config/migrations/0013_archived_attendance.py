@@ -0,0 +1,32 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0012_attendance_history_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendance',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('date', models.DateField()),
+                ('created', models.DateTimeField()),
+                ('updated', models.DateTimeField()),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='archived_attendances', to='app_config.group')),
+                ('level', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='archived_attendances', to='app_config.attendancelevel')),
+                ('status', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendances', to='app_config.status')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='archived_attendances', to='app_config.student')),
+            ],
+            options={
+                'verbose_name': 'Archived attendance',
+                'verbose_name_plural': 'Archived attendances',
+                'indexes': [models.Index(fields=['date'], name='archived_attendance_date_idx'), models.Index(fields=['student', 'date', 'id'], name='archived_att_student_date_idx'), models.Index(fields=['group', 'date', 'id'], name='archived_att_group_date_idx')],
+            },
+        ),
+    ]
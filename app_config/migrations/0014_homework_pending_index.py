@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0013_archived_attendance'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['is_active', 'groupHomeWork', 'created', 'id'], name='homework_pending_idx'),
+        ),
+    ]
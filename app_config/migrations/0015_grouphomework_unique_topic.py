@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_group_homeworks(apps, schema_editor):
+    """
+    Bir guruh va mavzu uchun bir nechta topshiriq bo'lsa ular birlashtiriladi,
+    hech bir talaba topshirig'i yo'qolmaydi:
+    - eng birinchi (eng kichik id) qator qoladi;
+    - ortiqcha qatorlarga bog'langan HomeWork yozuvlari shu qatorga ko'chiriladi;
+    - is_active - birortasi faol bo'lsa faol; descriptions - bo'sh bo'lmagan
+      izohlar " | " bilan birlashtiriladi (500 belgigacha);
+    - shundan keyingina ortiqcha (endi bo'sh) qatorlar o'chiriladi.
+    """
+    GroupHomeWork = apps.get_model('app_config', 'GroupHomeWork')
+    HomeWork = apps.get_model('app_config', 'HomeWork')
+
+    duplicates = (
+        GroupHomeWork.objects.values('group_id', 'topic_id')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+    )
+    for row in duplicates.iterator():
+        copies = list(GroupHomeWork.objects.filter(group_id=row['group_id'], topic_id=row['topic_id']).order_by('id'))
+        keep, extra = copies[0], copies[1:]
+        notes = []
+        for copy in copies:
+            if copy.descriptions and copy.descriptions not in notes:
+                notes.append(copy.descriptions)
+        keep.is_active = any(copy.is_active for copy in copies)
+        keep.descriptions = ' | '.join(notes)[:500] or None
+        keep.save(update_fields=['is_active', 'descriptions'])
+
+        extra_ids = [copy.id for copy in extra]
+        HomeWork.objects.filter(groupHomeWork_id__in=extra_ids).update(groupHomeWork_id=keep.id)
+        GroupHomeWork.objects.filter(id__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0014_homework_pending_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_group_homeworks, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='grouphomework',
+            constraint=models.UniqueConstraint(fields=('group', 'topic'), name='grouphomework_unique_topic'),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:27
+
+import re
+from decimal import Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def normalize_group_prices(apps, schema_editor):
+    """
+    Matnli narxlarni ("500 000", "500,000 so'm", "1.2e6") raqamga keltiradi.
+    O'qib bo'lmaydiganlari (manfiy va juda kattalari ham) NULL qilinadi -
+    bunday guruhlar billingga tushmaydi - lekin asl matn yo'qolmasligi uchun
+    guruh izohiga "Eski narx: ..." sifatida qo'shiladi.
+    """
+    Group = apps.get_model('app_config', 'Group')
+    rows = Group.objects.exclude(price__isnull=True).values_list('id', 'price', 'descriptions')
+    for group_id, price, descriptions in rows:
+        cleaned = re.sub(r"[^0-9.eE+-]", "", str(price).replace(',', ''))
+        try:
+            value = Decimal(cleaned).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            value = None
+        if value is not None and (not value.is_finite() or value < 0 or value >= Decimal('1e10')):
+            value = None
+        if value is None:
+            note = f"Eski narx: {price}"
+            Group.objects.filter(id=group_id).update(
+                price=None,
+                descriptions=(f"{descriptions} | {note}" if descriptions else note)[:500],
+            )
+        else:
+            Group.objects.filter(id=group_id).update(price=str(value))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0015_grouphomework_unique_topic'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_group_prices, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='group',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='invoices', to='app_config.group')),
+                ('month', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to='app_config.month')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoices', to='app_config.student')),
+            ],
+            options={
+                'verbose_name': 'Invoice',
+                'verbose_name_plural': 'Invoices',
+                'indexes': [models.Index(fields=['month', 'student'], name='invoice_month_student_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'group', 'month'), name='invoice_unique_month')],
+            },
+        ),
+    ]
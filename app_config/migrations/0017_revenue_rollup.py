@@ -0,0 +1,56 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def build_revenue_rollup(apps, schema_editor):
+    Payment = apps.get_model('app_config', 'Payment')
+    RevenueRollup = apps.get_model('app_config', 'RevenueRollup')
+    rows = (
+        Payment.objects.values('month_id', 'group__course_id', 'group_id', 'payment_type_id')
+        .annotate(amount=Sum('price'), count=Count('id'))
+        .order_by()
+    )
+    RevenueRollup.objects.bulk_create(
+        (
+            RevenueRollup(
+                key=':'.join('' if part is None else str(part) for part in (
+                    row['month_id'], row['group__course_id'], row['group_id'], row['payment_type_id'],
+                )),
+                month_id=row['month_id'],
+                course_id=row['group__course_id'],
+                group_id=row['group_id'],
+                payment_type_id=row['payment_type_id'],
+                amount=row['amount'],
+                count=row['count'],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0016_group_price_invoice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.IntegerField(default=0)),
+                ('course', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_rollups', to='app_config.course')),
+                ('group', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_rollups', to='app_config.group')),
+                ('month', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_rollups', to='app_config.month')),
+                ('payment_type', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='revenue_rollups', to='app_config.paymenttype')),
+            ],
+        ),
+        migrations.RunPython(build_revenue_rollup, migrations.RunPython.noop),
+    ]
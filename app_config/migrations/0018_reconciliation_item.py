@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0017_revenue_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciliationItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('source', models.CharField(max_length=255)),
+                ('row_number', models.PositiveIntegerField()),
+                ('raw', models.JSONField(default=dict)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('name', models.CharField(blank=True, max_length=255, null=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('candidates', models.JSONField(default=list)),
+                ('status', models.CharField(choices=[('matched', 'Matched'), ('review', 'Review'), ('unmatched', 'Unmatched'), ('resolved', 'Resolved'), ('rejected', 'Rejected')], default='review', max_length=10)),
+                ('month', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reconciliation_items', to='app_config.month')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='app_config.payment')),
+                ('payment_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reconciliation_items', to='app_config.paymenttype')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reconciliation_status_idx')],
+            },
+        ),
+    ]
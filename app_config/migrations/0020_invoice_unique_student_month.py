@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:55
+
+from django.db import migrations, models
+
+
+def merge_duplicate_invoices(apps, schema_editor):
+    """
+    Bir talaba-oy uchun bir nechta hisob (guruh almashganda yozilgan) bo'lsa,
+    eng so'nggi yangilangani qoladi, qolganlari o'chiriladi.
+    """
+    Invoice = apps.get_model('app_config', 'Invoice')
+    duplicates = (
+        Invoice.objects.values('student_id', 'month_id')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+    )
+    for row in duplicates:
+        invoices = Invoice.objects.filter(student_id=row['student_id'], month_id=row['month_id'])
+        keep = invoices.order_by('-updated_at', '-id').values_list('id', flat=True)[0]
+        invoices.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0019_student_stats_state'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='invoice',
+            name='invoice_unique_month',
+        ),
+        migrations.RunPython(merge_duplicate_invoices, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('student', 'month'), name='invoice_unique_month'),
+        ),
+    ]
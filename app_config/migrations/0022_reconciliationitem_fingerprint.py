@@ -0,0 +1,52 @@
+# Generated by Django 5.1.7 on 2026-10-18 15:59
+
+import hashlib
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# app_config/reconciliation.py dagi ustun nomlari va iz (migratsiya vaqtidagi nusxa)
+DATE_COLUMNS = ('date', 'sana', 'paid_at', 'vaqt')
+REFERENCE_COLUMNS = ('reference', 'ref', 'transaction', 'tranzaksiya', 'receipt', 'chek')
+
+
+def fill_fingerprints(apps, schema_editor):
+    """
+    Mavjud qatorlarga iz yoziladi. Avval bir fayl ikki marta yuklangan bo'lsa,
+    takror qatorlar `occurrence` bilan ajraladi (yozilgan to'lovlar o'chirilmaydi).
+    """
+    ReconciliationItem = apps.get_model('app_config', 'ReconciliationItem')
+    seen = Counter()
+    for item in ReconciliationItem.objects.order_by('id').iterator():
+        fields = {(key or '').strip().lower(): str(value or '').strip() for key, value in (item.raw or {}).items()}
+
+        def pick(aliases):
+            return next((fields[alias] for alias in aliases if fields.get(alias)), '')
+
+        key = (item.source, pick(DATE_COLUMNS), str(item.amount), pick(REFERENCE_COLUMNS), item.phone or '', item.name or '')
+        parts = [*key, str(seen[key])]
+        seen[key] += 1
+        item.fingerprint = hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+        item.save(update_fields=['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0021_payment_protect_month_type'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reconciliationitem',
+            name='fingerprint',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reconciliationitem',
+            name='fingerprint',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:20
+
+import hashlib
+from collections import Counter
+
+from django.db import migrations, models
+
+
+# app_config/reconciliation.py dagi ustun nomlari va iz (migratsiya vaqtidagi nusxa)
+DATE_COLUMNS = ('date', 'sana', 'paid_at', 'vaqt')
+REFERENCE_COLUMNS = ('reference', 'ref', 'transaction', 'tranzaksiya', 'receipt', 'chek')
+
+
+def refill_fingerprints(apps, schema_editor):
+    """
+    Izlar fayl nomi o'rniga oy bo'yicha qayta hisoblanadi. Sana ham,
+    tranzaksiya raqami ham bo'lmagan qatorlar izsiz (NULL) qoladi.
+    """
+    ReconciliationItem = apps.get_model('app_config', 'ReconciliationItem')
+    ReconciliationItem.objects.update(fingerprint=None)
+    seen = Counter()
+    for item in ReconciliationItem.objects.order_by('id').iterator():
+        fields = {(key or '').strip().lower(): str(value or '').strip() for key, value in (item.raw or {}).items()}
+
+        def pick(aliases):
+            return next((fields[alias] for alias in aliases if fields.get(alias)), '')
+
+        date, reference = pick(DATE_COLUMNS), pick(REFERENCE_COLUMNS)
+        if not date and not reference:
+            continue
+        key = (str(item.month_id), date, str(item.amount), reference, item.phone or '', item.name or '')
+        parts = [*key, str(seen[key])]
+        seen[key] += 1
+        item.fingerprint = hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+        item.save(update_fields=['fingerprint'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0022_reconciliationitem_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reconciliationitem',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.RunPython(refill_fingerprints, migrations.RunPython.noop),
+    ]
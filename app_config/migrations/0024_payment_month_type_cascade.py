@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 16:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app_config', '0023_reconciliation_fingerprint_month'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='payment',
+            name='month',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='app_config.month'),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='payment_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment', to='app_config.paymenttype'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 from django.contrib.auth.base_user import BaseUserManager, AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.core.validators import RegexValidator
+from django.utils import timezone
 
 
 # user
@@ -32,23 +33,54 @@ class User(AbstractBaseUser, PermissionsMixin):
                                  message="Phone number must be entered in the format: '9989012345678'. Up to 14 digits allowed.")
     phone = models.CharField(validators=[phone_regex], max_length=17, unique=True)
     full_name = models.CharField(max_length=50, null=True, blank=True)
-    otp_code = models.CharField(max_length=6, blank=True, null=True) 
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_admin = models.BooleanField(default=False)
     is_student = models.BooleanField(default=False)
     is_teacher = models.BooleanField(default=False)
+    role_version = models.PositiveIntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     username = None
     USERNAME_FIELD = 'phone'
     REQUIRED_FIELDS = []
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_student', 'is_active'], name='user_student_active_idx'),
+            models.Index(fields=['is_teacher', 'is_active'], name='user_teacher_active_idx'),
+            models.Index(fields=['is_admin', 'is_active'], name='user_admin_active_idx'),
+            models.Index(fields=['is_active'], name='user_active_idx'),
+        ]
+
+    # Tokenga imzolanadigan rol bayroqlari (app_config/tokens.py)
+    ROLE_FIELDS = ('is_active', 'is_staff', 'is_admin', 'is_student', 'is_teacher')
+
     objects = UserManager()
 
     def __str__(self):
         return self.phone
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_roles = instance._role_state()
+        return instance
+
+    def _role_state(self):
+        return tuple(self.__dict__.get(field) for field in self.ROLE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        # Rollar o'zgarsa role_version oshiriladi va eski tokenlar yangilanishga majbur bo'ladi
+        loaded = getattr(self, '_loaded_roles', None)
+        if loaded is not None and loaded != self._role_state():
+            self.role_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'role_version'}
+        super().save(*args, **kwargs)
+        self._loaded_roles = self._role_state()
+
     def has_perm(self, perm, obj=None):
         return self.is_admin
 
@@ -56,6 +88,18 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.is_admin
 
 
+# OTP (DatabaseOTPStore uchun, app_config/otp.py)
+class OTPCode(models.Model):
+    phone = models.CharField(max_length=17, unique=True)
+    code_hash = models.CharField(max_length=128)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.phone
+
+
 # Token
 class TokenModel(models.Model):
     token = models.TextField()
@@ -121,6 +165,11 @@ class Student(models.Model):
     def __str__(self):
         return self.user.full_name if self.user.full_name else self.user.phone
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created'], name='student_created_idx'),
+        ]
+
 
 class BaseModel(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)  # Obyekt yaratilgan vaqt
@@ -153,6 +202,9 @@ class Parent(BaseModel):
     class Meta:
         verbose_name = 'Parent'
         verbose_name_plural = 'Parents'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='parent_created_id_idx'),
+        ]
         
 # Group
 class Group(models.Model):
@@ -163,7 +215,7 @@ class Group(models.Model):
     updated = models.DateField(auto_now=True)
     start_date = models.DateField()
     end_date = models.DateField()
-    price = models.CharField(max_length=15, blank=True, null=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)  # oylik to'lov, UZS
     descriptions = models.CharField(max_length=500, blank=True, null=True)
 
     def __str__(self):
@@ -184,6 +236,7 @@ class Attendance(models.Model):
     student = models.ForeignKey(Student, on_delete=models.RESTRICT, related_name='attendances')
     status = models.ForeignKey('Status',on_delete=models.CASCADE,related_name='attendance')
     group = models.ForeignKey(Group, on_delete=models.RESTRICT, related_name='attendances')
+    date = models.DateField(default=timezone.localdate)  # Dars kuni
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
 
@@ -193,6 +246,41 @@ class Attendance(models.Model):
     class Meta:
         verbose_name = "Attendance"
         verbose_name_plural = "Attendances"
+        indexes = [
+            models.Index(fields=['created', 'id'], name='attendance_created_id_idx'),
+            models.Index(fields=['student', 'date', 'id'], name='attendance_student_date_idx'),
+            models.Index(fields=['group', 'date', 'id'], name='attendance_group_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'group', 'date'], name='attendance_unique_lesson'),
+        ]
+
+class ArchivedAttendance(models.Model):
+    """
+    Joriy davrdan eski davomat yozuvlari (archive_attendance buyrug'i ko'chiradi).
+    Ustunlar Attendance bilan bir xil tartibda, shuning uchun ikkala jadval
+    UNION orqali bitta queryset sifatida o'qiladi. id asl yozuvniki saqlanadi.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    level = models.ForeignKey(AttendanceLevel, on_delete=models.RESTRICT, related_name='archived_attendances')
+    student = models.ForeignKey(Student, on_delete=models.RESTRICT, related_name='archived_attendances')
+    status = models.ForeignKey('Status', on_delete=models.CASCADE, related_name='archived_attendances')
+    group = models.ForeignKey(Group, on_delete=models.RESTRICT, related_name='archived_attendances')
+    date = models.DateField()
+    created = models.DateTimeField()
+    updated = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.student_id} - {self.group_id} - {self.date}"
+
+    class Meta:
+        verbose_name = "Archived attendance"
+        verbose_name_plural = "Archived attendances"
+        indexes = [
+            models.Index(fields=['date'], name='archived_attendance_date_idx'),
+            models.Index(fields=['student', 'date', 'id'], name='archived_att_student_date_idx'),
+            models.Index(fields=['group', 'date', 'id'], name='archived_att_group_date_idx'),
+        ]
 
 # Homework
 class Topics(models.Model):
@@ -214,6 +302,11 @@ class GroupHomeWork(models.Model):
     is_active = models.BooleanField(default=True)
     descriptions = models.CharField(max_length=500, blank=True, null=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group', 'topic'], name='grouphomework_unique_topic'),
+        ]
+
 
 class HomeWork(models.Model):
     groupHomeWork = models.ForeignKey(GroupHomeWork, on_delete=models.RESTRICT, related_name='homeworks')
@@ -221,6 +314,13 @@ class HomeWork(models.Model):
     link = models.URLField()
     is_active = models.BooleanField(default=False)
     descriptions = models.CharField(max_length=500, blank=True, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'created', 'id'], name='homework_student_created_idx'),
+            models.Index(fields=['is_active', 'groupHomeWork', 'created', 'id'], name='homework_pending_idx'),
+        ]
 
 
 # DAY, ROOMS, TABLE MODELS 
@@ -303,6 +403,89 @@ class Payment(BaseModel):
     class Meta:
         verbose_name = 'Payment'
         verbose_name_plural = 'Payments'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='payment_created_id_idx'),
+        ]
+
+class Invoice(BaseModel):
+    """
+    Talabaning oy uchun hisob-fakturasi (billing run tomonidan yaratiladi).
+    Talaba-oy uchun bitta hisob: oy o'rtasida guruh almashsa `group` yangilanadi.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='invoices')
+    group = models.ForeignKey(Group, on_delete=models.RESTRICT, related_name='invoices')
+    month = models.ForeignKey(Month, on_delete=models.CASCADE, related_name='invoices')
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.student_id} - {self.month_id}: {self.amount} UZS"
+
+    class Meta:
+        verbose_name = 'Invoice'
+        verbose_name_plural = 'Invoices'
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'month'], name='invoice_unique_month'),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'student'], name='invoice_month_student_idx'),
+        ]
+
+class RevenueRollup(models.Model):
+    """
+    To'lovlar yig'indisi (oy, kurs, guruh, to'lov turi) kesimida.
+    Har bir Payment o'zgarishida signal orqali inkremental yangilanadi (app_config/revenue.py);
+    signalsiz bulk_create yo'llari apply_revenue_deltas ni o'zi chaqiradi.
+    `key` - NULL qiymatli o'lchovlar ham unique bo'lishi uchun "month:course:group:type".
+    """
+    key = models.CharField(max_length=64, unique=True)
+    month = models.ForeignKey(Month, on_delete=models.SET_NULL, null=True, related_name='revenue_rollups')
+    course = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True, related_name='revenue_rollups')
+    group = models.ForeignKey(Group, on_delete=models.SET_NULL, null=True, related_name='revenue_rollups')
+    payment_type = models.ForeignKey(PaymentType, on_delete=models.SET_NULL, null=True, related_name='revenue_rollups')
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.amount}"
+
+class ReconciliationItem(BaseModel):
+    """
+    Bank/terminal ko'chirmasi qatori. Avtomatik tasdiqlanganlari `matched`,
+    noaniqlari `review`/`unmatched` holatida ko'rib chiqish navbatida turadi.
+    """
+    STATUS_MATCHED = 'matched'
+    STATUS_REVIEW = 'review'
+    STATUS_UNMATCHED = 'unmatched'
+    STATUS_RESOLVED = 'resolved'
+    STATUS_REJECTED = 'rejected'
+    STATUS_CHOICES = [
+        (STATUS_MATCHED, 'Matched'),
+        (STATUS_REVIEW, 'Review'),
+        (STATUS_UNMATCHED, 'Unmatched'),
+        (STATUS_RESOLVED, 'Resolved'),
+        (STATUS_REJECTED, 'Rejected'),
+    ]
+
+    source = models.CharField(max_length=255)  # fayl nomi
+    fingerprint = models.CharField(max_length=64, unique=True, null=True, blank=True)  # reconciliation.line_fingerprint
+    row_number = models.PositiveIntegerField()
+    raw = models.JSONField(default=dict)
+    phone = models.CharField(max_length=20, blank=True, null=True)
+    name = models.CharField(max_length=255, blank=True, null=True)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    month = models.ForeignKey(Month, on_delete=models.CASCADE, related_name='reconciliation_items')
+    payment_type = models.ForeignKey(PaymentType, on_delete=models.CASCADE, related_name='reconciliation_items')
+    candidates = models.JSONField(default=list)  # [{"student_id", "score"}, ...]
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_REVIEW)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+
+    def __str__(self):
+        return f"{self.source}:{self.row_number} - {self.amount} ({self.status})"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='reconciliation_status_idx'),
+        ]
 
 # === TEACHER RELATIONS ===
 class TeacherCourse(models.Model):
@@ -319,6 +502,77 @@ class StudentStatistic(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     created = models.DateTimeField(auto_now_add=True) 
 
+class StudentDailyStat(models.Model):
+    """
+    Kunlik talabalar statistikasi (kurs va guruh kesimida).
+    registered/graduated - shu kundagi oqim, studying - shu kundagi holat.
+    app_config/statistics.py tomonidan inkremental to'ldiriladi.
+    """
+    date = models.DateField()
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, related_name='daily_stats')
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, related_name='daily_stats')
+    registered = models.PositiveIntegerField(default=0)
+    studying = models.PositiveIntegerField(default=0)
+    graduated = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} - {self.group_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date'], name='student_daily_stat_date_idx'),
+        ]
+
+class StudentStatDirty(models.Model):
+    """
+    StudentDailyStat ni qayta hisoblash belgisi. group bo'sh bo'lsa barcha
+    guruhlar `from_date` dan, aks holda faqat shu guruh qatorlari qayta
+    hisoblanadi. Yozuvchilar faqat INSERT qiladi, shuning uchun rollup
+    qulfini kutmaydi; rollup o'qigan belgilarini o'chiradi.
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, null=True, related_name='+')
+    from_date = models.DateField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.group_id or '*'} - {self.from_date}"
+
+class RollupState(models.Model):
+    """
+    Hosila jadvallar va indekslar holati (app_config/state.py): har bir nom
+    uchun bitta qator. Barcha workerlar va jarayonlar uchun umumiy, shuning
+    uchun per-process LocMemCache o'rniga shu yerda saqlanadi.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    watermark = models.DateField(null=True, blank=True)
+    version = models.PositiveBigIntegerField(default=0)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.watermark} (v{self.version})"
+
+class AttendanceCounter(models.Model):
+    """
+    Davomat hisoblagichlari: (talaba, guruh, status, oy) bo'yicha yozuvlar soni.
+    Attendance yozilgan tranzaksiyaning o'zida app_config/counters.py orqali yangilanadi.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='attendance_counters')
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='attendance_counters')
+    status = models.ForeignKey(Status, on_delete=models.CASCADE, related_name='attendance_counters')
+    month = models.DateField()  # oyning birinchi kuni
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.student_id} - {self.group_id} - {self.month}: {self.count}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'group', 'status', 'month'], name='attendance_counter_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['group', 'month'], name='attendance_counter_group_idx'),
+        ]
+
 class Subject(models.Model):
     title = models.CharField(max_length=50, verbose_name="Nomi")  
     descriptions = models.CharField(max_length=500, null=True, blank=True, verbose_name="Tavsif")  
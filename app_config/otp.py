@@ -0,0 +1,144 @@
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, get_random_string, salted_hmac
+from django.utils.module_loading import import_string
+
+from .cache import shared_cache_configured
+
+
+class BaseOTPStore:
+    """
+    OTP kodlarni User jadvalidan tashqarida saqlash uchun asosiy klass.
+    Kodlar xeshlangan holda saqlanadi va doimiy vaqtda solishtiriladi.
+    """
+
+    def __init__(self, ttl=300, max_attempts=5, code_length=6, static_code=None):
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+        self.code_length = code_length
+        self.static_code = static_code
+
+    def generate_code(self):
+        if self.static_code:
+            return self.static_code
+        return get_random_string(self.code_length, allowed_chars='0123456789')
+
+    def make_hash(self, phone, code):
+        return salted_hmac('app_config.otp', f"{phone}:{code}").hexdigest()
+
+    def issue(self, phone):
+        """
+        Telefon raqami uchun yangi OTP yaratadi va uni qaytaradi.
+        """
+        code = self.generate_code()
+        self.save(phone, self.make_hash(phone, code))
+        return code
+
+    def verify(self, phone, code, consume=False):
+        """
+        OTP ni tekshiradi. Har bir urinish hisoblanadi; `max_attempts` dan
+        oshsa kod bekor qilinadi. `consume=True` bo'lsa to'g'ri kod o'chiriladi.
+        """
+        raise NotImplementedError
+
+    def save(self, phone, code_hash):
+        raise NotImplementedError
+
+    def discard(self, phone):
+        raise NotImplementedError
+
+
+class CacheOTPStore(BaseOTPStore):
+    """
+    Django kesh backendida saqlanadigan OTP. Faqat barcha workerlar uchun
+    umumiy kesh (Redis, Memcached, ...) sozlanganda standart tanlanadi:
+    LocMemCache da bir workerda berilgan kod boshqasida tekshirilmaydi.
+    """
+
+    def _key(self, phone):
+        return f"otp:{phone}"
+
+    def _attempts_key(self, phone):
+        return f"otp_attempts:{phone}"
+
+    def save(self, phone, code_hash):
+        cache.set(self._key(phone), code_hash, timeout=self.ttl)
+        cache.set(self._attempts_key(phone), 0, timeout=self.ttl)
+
+    def discard(self, phone):
+        cache.delete_many([self._key(phone), self._attempts_key(phone)])
+
+    def verify(self, phone, code, consume=False):
+        code_hash = cache.get(self._key(phone))
+        if code_hash is None:
+            return False
+
+        cache.add(self._attempts_key(phone), 0, timeout=self.ttl)
+        try:
+            attempts = cache.incr(self._attempts_key(phone))
+        except ValueError:
+            # hisoblagich add() va incr() orasida eskirdi: kod ham eskirgan deb hisoblanadi
+            self.discard(phone)
+            return False
+        if attempts > self.max_attempts:
+            self.discard(phone)
+            return False
+
+        valid = constant_time_compare(code_hash, self.make_hash(phone, code))
+        if valid and consume:
+            self.discard(phone)
+        return valid
+
+
+class DatabaseOTPStore(BaseOTPStore):
+    """
+    Alohida OTPCode jadvalidagi saqlash (umumiy kesh bo'lmaganda standart).
+    """
+
+    def save(self, phone, code_hash):
+        from .models import OTPCode
+
+        OTPCode.objects.update_or_create(
+            phone=phone,
+            defaults={
+                'code_hash': code_hash,
+                'attempts': 0,
+                'expires_at': timezone.now() + timedelta(seconds=self.ttl),
+            },
+        )
+
+    def discard(self, phone):
+        from .models import OTPCode
+
+        OTPCode.objects.filter(phone=phone).delete()
+
+    def verify(self, phone, code, consume=False):
+        from .models import OTPCode
+
+        otp = OTPCode.objects.filter(phone=phone, expires_at__gt=timezone.now()).first()
+        if otp is None:
+            return False
+
+        OTPCode.objects.filter(pk=otp.pk).update(attempts=F('attempts') + 1)
+        if otp.attempts + 1 > self.max_attempts:
+            self.discard(phone)
+            return False
+
+        valid = constant_time_compare(otp.code_hash, self.make_hash(phone, code))
+        if valid and consume:
+            self.discard(phone)
+        return valid
+
+
+@lru_cache(maxsize=None)
+def get_otp_store():
+    options = dict(getattr(settings, 'OTP_STORE', {}))
+    backend = options.pop('BACKEND', None)
+    if backend is None:
+        backend = 'app_config.otp.CacheOTPStore' if shared_cache_configured() else 'app_config.otp.DatabaseOTPStore'
+    return import_string(backend)(**{key.lower(): value for key, value in options.items()})
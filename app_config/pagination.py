@@ -0,0 +1,146 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+PAGINATION_SETTINGS = getattr(settings, 'PAGINATION', {})
+COUNT_CACHE_TTL = PAGINATION_SETTINGS.get('COUNT_CACHE_TTL', 60)
+
+
+def cached_count(queryset):
+    """
+    COUNT(*) natijasini so'rov matni bo'yicha keshlaydi (taxminiy jami son).
+    """
+    try:
+        sql = str(queryset.query)
+    except EmptyResultSet:
+        return 0
+    key = "count:" + hashlib.md5(sql.encode()).hexdigest()
+    return cache.get_or_set(key, queryset.count, COUNT_CACHE_TTL)
+
+
+def default_cursor_ordering(queryset):
+    field_names = {field.name for field in queryset.model._meta.concrete_fields}
+    for name in ('created', 'created_at'):
+        if name in field_names:
+            return ('-' + name, '-id')
+    return ('-id',)
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    (created, id) bo'yicha keyset pagination: OFFSET va COUNT(*) siz,
+    istalgan chuqurlikdagi sahifa birinchi sahifa bilan bir xil narxda.
+    `?with_count=true` berilsa keshlangan taxminiy jami son qo'shiladi.
+    """
+    page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        return tuple(ordering) if ordering else default_cursor_ordering(queryset)
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.request.query_params.get('with_count', '').lower() in ('true', '1'):
+            payload = {'count': cached_count(self.base_queryset), **payload}
+        return Response(payload)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """
+    Standart holatda PageNumberPagination. `?cursor=...` yoki
+    `?pagination=cursor` berilsa KeysetCursorPagination ga o'tadi
+    (UNION querysetlari bundan mustasno).
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = (
+            'cursor' in request.query_params
+            or request.query_params.get('pagination') == 'cursor'
+        )
+        if queryset.query.combinator:
+            # UNION querysetlarini filtrlab bo'lmaydi: sahifa rejimida qaytariladi
+            self.cursor_mode = False
+        if self.cursor_mode:
+            self.cursor_paginator = KeysetCursorPagination()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_mode:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.cursor_mode:
+            return self.cursor_paginator.get_html_context()
+        return super().get_html_context()
+
+
+def paginated_list(request, queryset, serializer_class, view=None):
+    """
+    ViewSet.list lar uchun: sahifa rejimida avvalgidek oddiy ro'yxat,
+    cursor rejimida next/previous havolalari bilan javob qaytaradi.
+    """
+    paginator = OptionalCursorPagination()
+    result_page = paginator.paginate_queryset(queryset, request, view=view)
+    serializer = serializer_class(result_page, many=True)
+    if paginator.cursor_mode:
+        return paginator.get_paginated_response(serializer.data)
+    return Response(serializer.data)
+
+
+def encode_keyset_cursor(value, pk):
+    raw = f"{value.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_keyset_cursor(cursor):
+    try:
+        value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        value, pk = parse_datetime(value), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        value = None
+    if value is None:
+        raise NotFound("Invalid cursor")
+    return value, pk
+
+
+def keyset_page(queryset, field, cursor=None, limit=20):
+    """
+    (field, id) bo'yicha kamayish tartibida bitta sahifa: OFFSET siz,
+    limit+1 qator o'qiladi. (qatorlar, keyingi_cursor) qaytaradi.
+    values() querysetlari uchun `field` va `id` tanlangan bo'lishi kerak.
+    Querysetlar ro'yxati berilsa, har biri cursor bo'yicha filtrlanib UNION ALL qilinadi.
+    """
+    querysets = list(queryset) if isinstance(queryset, (list, tuple)) else [queryset]
+    if cursor:
+        value, pk = decode_keyset_cursor(cursor)
+        condition = Q(**{f"{field}__lt": value}) | Q(**{field: value, 'id__lt': pk})
+        querysets = [qs.filter(condition) for qs in querysets]
+    queryset = querysets[0]
+    if len(querysets) > 1:
+        queryset = queryset.union(*querysets[1:], all=True)
+    rows = list(queryset.order_by(f"-{field}", '-id')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_keyset_cursor(last[field], last['id'])
+    return rows, next_cursor
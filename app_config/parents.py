@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.db.models import OuterRef, Prefetch, Subquery
+
+from .billing import with_balance
+from .counters import attendance_summary
+from .models import AttendanceCounter, Course, Parent, Student
+
+
+def parent_queryset():
+    """
+    Ota-onalar ro'yxati uchun: farzandlar va ularning kurslari Prefetch bilan
+    olinadi, sahifa hajmidan qat'i nazar 3 ta so'rov.
+    """
+    students = Student.objects.prefetch_related(Prefetch('course', queryset=Course.objects.only('id')))
+    return Parent.objects.prefetch_related(Prefetch('students', queryset=students)).order_by('id')
+
+
+def latest_counter_month(student_ref):
+    """
+    Talaba uchun davomat hisoblagichi bor eng so'nggi oy (korrelyatsiyalangan subquery).
+    """
+    return Subquery(
+        AttendanceCounter.objects.filter(student=OuterRef(student_ref))
+        .order_by('-month')
+        .values('month')[:1]
+    )
+
+
+def parent_portal(parent):
+    """
+    Har bir farzand uchun guruh, oxirgi oy davomat foizi va qoldiq qarz.
+    Farzandlar balansi bilan bitta so'rovda, davomat AttendanceCounter dan
+    ikkinchi so'rovda hisoblanadi.
+    """
+    children = list(
+        with_balance(Student.objects.filter(parent=parent))
+        .annotate(attendance_month=latest_counter_month('pk'))
+        .values(
+            'id', 'user__full_name', 'user__phone', 'group_id', 'group__title',
+            'attendance_month', 'invoiced', 'paid', 'debt',
+        )
+        .order_by('id')
+    )
+    attendance = {}
+    if children:
+        counters = AttendanceCounter.objects.filter(
+            student_id__in=[child['id'] for child in children],
+            month=latest_counter_month('student_id'),
+        )
+        attendance = {row['student_id']: row for row in attendance_summary(counters, by_student=True)['students']}
+
+    results = []
+    for child in children:
+        summary = attendance.get(child['id'])
+        results.append({
+            "student_id": child['id'],
+            "full_name": child['user__full_name'],
+            "phone": child['user__phone'],
+            "group": {"id": child['group_id'], "title": child['group__title']} if child['group_id'] else None,
+            "attendance": {
+                "month": child['attendance_month'],
+                "total": summary['total'] if summary else 0,
+                "present": summary['present'] if summary else 0,
+                "rate": summary['rate'] if summary else None,
+            },
+            "invoiced": child['invoiced'],
+            "paid": child['paid'],
+            "balance": child['debt'],
+        })
+    return {
+        "parent": {"id": parent.id, "name": parent.name, "surname": parent.surname, "phone": parent.phone},
+        "children": results,
+        "total_balance": sum((child['balance'] for child in results), Decimal('0')),
+    }
@@ -1,6 +1,8 @@
 from rest_framework import permissions
 from rest_framework.permissions import BasePermission, SAFE_METHODS
 
+from .authentication import RoleClaimsAuthentication
+
 
 class AdminUser(permissions.BasePermission):
     """
@@ -85,3 +87,52 @@ class AllowAny(permissions.BasePermission):
     """
     def has_permission(self, request, view):
         return True
+
+
+# --- Token claimlari asosidagi ruxsatlar (bazaga murojaat qilmaydi) ---
+def token_claim(request, claim):
+    """
+    Claim tokendan faqat RoleClaimsAuthentication (role_version ni
+    tekshiradigan) orqali kirilgan bo'lsa o'qiladi. Boshqa autentifikatsiyalarda
+    (CachedJWTAuthentication, Token, Session) yuklangan User ishlatiladi:
+    aks holda eskirgan token rollari muddati tugaguncha amal qilardi.
+    """
+    token = request.auth
+    authenticator = getattr(request, 'successful_authenticator', None)
+    if isinstance(authenticator, RoleClaimsAuthentication) and hasattr(token, 'get'):
+        return bool(token.get(claim, False))
+    return bool(getattr(request.user, claim, False))
+
+
+class ClaimAdminUser(BasePermission):
+    """
+    AdminUser ning token claimlari bilan ishlaydigan varianti.
+    """
+    def has_permission(self, request, view):
+        return token_claim(request, 'is_admin')
+
+
+class ClaimIsAdminOrReadOnly(BasePermission):
+    """
+    IsAdminOrReadOnly ning token claimlari bilan ishlaydigan varianti.
+    """
+    def has_permission(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return token_claim(request, 'is_staff')
+
+
+class ClaimIsTeacher(BasePermission):
+    """
+    Faqat o'qituvchi (yoki admin) claimi bor tokenlarga ruxsat beradi.
+    """
+    def has_permission(self, request, view):
+        return token_claim(request, 'is_teacher') or token_claim(request, 'is_admin')
+
+
+class ClaimIsStudent(BasePermission):
+    """
+    Faqat talaba (yoki admin) claimi bor tokenlarga ruxsat beradi.
+    """
+    def has_permission(self, request, view):
+        return token_claim(request, 'is_student') or token_claim(request, 'is_admin')
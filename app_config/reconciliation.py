@@ -0,0 +1,294 @@
+import hashlib
+import re
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from difflib import SequenceMatcher
+
+from django.db import IntegrityError, transaction
+
+from .billing import debtors
+from .models import Payment, ReconciliationItem, Student
+from .revenue import apply_revenue_deltas, payment_deltas
+
+
+# Ko'chirma ustunlari: birinchi topilgan nom ishlatiladi (katta-kichik harf farqsiz)
+STATEMENT_COLUMNS = {
+    'amount': ('amount', 'summa', 'sum', 'price'),
+    'phone': ('phone', 'telefon', 'tel'),
+    'name': ('name', 'full_name', 'fio', 'payer'),
+    'date': ('date', 'sana', 'paid_at', 'vaqt'),
+    'reference': ('reference', 'ref', 'transaction', 'tranzaksiya', 'receipt', 'chek'),
+}
+
+PHONE_WEIGHT = 0.5
+NAME_WEIGHT = 0.35
+AMOUNT_WEIGHT = 0.15
+CONFIRM_SCORE = 0.65
+CONFIRM_MARGIN = 0.15
+# SequenceMatcher faqat eng ko'p umumiy tokenga ega nomzodlar uchun ishlatiladi
+NAME_SHORTLIST = 20
+MAX_CANDIDATES = 3
+
+OPEN_STATUSES = (ReconciliationItem.STATUS_REVIEW, ReconciliationItem.STATUS_UNMATCHED)
+
+
+class ReconciliationError(Exception):
+    pass
+
+
+def phone_key(value):
+    """
+    Telefonning oxirgi 9 raqami: "+998 90 123-45-67" va "901234567" bir xil kalit beradi.
+    """
+    digits = re.sub(r'\D', '', value or '')
+    return digits[-9:] if len(digits) >= 9 else None
+
+
+def name_tokens(value):
+    tokens = re.findall(r'\w+', (value or '').lower())
+    return frozenset(token for token in tokens if len(token) > 1 or token.isdigit())
+
+
+def parse_amount(value):
+    text = re.sub(r'[\s\xa0]', '', str(value or '')).replace(',', '.')
+    try:
+        amount = Decimal(text)
+    except InvalidOperation:
+        return None
+    return amount.quantize(Decimal('0.01')) if amount > 0 else None
+
+
+def line_fingerprint(month_id, date, amount, reference, phone='', name='', occurrence=0):
+    """
+    Ko'chirma qatorining barqaror izi: qator mazmuni va oy (fayl nomi emas),
+    shuning uchun qayta nomlangan fayl ham bir xil iz beradi, keyingi oy uchun
+    yuklangan ko'chirma esa yangi iz beradi. Fayl ichidagi aynan bir xil
+    qatorlar `occurrence` bilan ajraladi. Sana ham, tranzaksiya raqami ham
+    bo'lmasa qatorni ishonchli ajratib bo'lmaydi - None.
+    """
+    if not date and not reference:
+        return None
+    parts = [str(month_id), date, str(amount), reference, phone, name, str(occurrence)]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+def read_statement(rows, month_id=None):
+    """
+    iter_rows() qatorlaridan ko'chirma qatorlari (izi bilan) va xatolar ro'yxati.
+    """
+    lines, errors = [], []
+    seen = Counter()
+    for row_number, row in rows:
+        fields = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+
+        def pick(name):
+            return next((fields[alias] for alias in STATEMENT_COLUMNS[name] if fields.get(alias)), '')
+
+        amount = parse_amount(pick('amount'))
+        if amount is None:
+            errors.append({"row": row_number, "error": "Summa noto'g'ri yoki ko'rsatilmagan"})
+            continue
+        key = (pick('date'), amount, pick('reference'), pick('phone'), pick('name'))
+        lines.append({
+            "row_number": row_number,
+            "raw": row,
+            "amount": amount,
+            "phone": pick('phone'),
+            "name": pick('name'),
+            "fingerprint": line_fingerprint(month_id, *key, occurrence=seen[key]),
+        })
+        seen[key] += 1
+    return lines, errors
+
+
+class CandidateIndex:
+    """
+    Nomzod talabalar xotirada: telefon kaliti va nom tokenlari bo'yicha indekslar.
+
+    Ikkita so'rov bilan yuklanadi: oy bo'yicha qarzdorlar (ochiq hisoblar) va
+    ko'chirmadagi telefonlar egalari. Keyin qatorlar bazaga murojaat qilmasdan
+    solishtiriladi.
+    """
+
+    def __init__(self, month, phones):
+        self.students = {}
+        self.by_phone = {}
+        self.by_token = {}
+        for row in debtors(month):
+            self._add(row['id'], row['user__phone'], row['user__full_name'], row['group_id'], row['debt'])
+
+        forms = {form for key in phones for form in (key, '998' + key, '+998' + key)}
+        if forms:
+            rows = Student.objects.filter(user__phone__in=forms).values_list(
+                'id', 'user__phone', 'user__full_name', 'group_id',
+            )
+            for student_id, phone, full_name, group_id in rows:
+                if student_id not in self.students:
+                    self._add(student_id, phone, full_name, group_id, Decimal('0'))
+
+    def _add(self, student_id, phone, full_name, group_id, debt):
+        tokens = name_tokens(full_name)
+        self.students[student_id] = {
+            "phone": phone_key(phone),
+            "name": ' '.join(sorted(tokens)),
+            "group_id": group_id,
+            "debt": debt,
+        }
+        if phone_key(phone):
+            self.by_phone.setdefault(phone_key(phone), []).append(student_id)
+        for token in tokens:
+            self.by_token.setdefault(token, []).append(student_id)
+
+    def score(self, line):
+        """
+        Qator uchun [(ball, student_id), ...] kamayish tartibida.
+        """
+        key = phone_key(line['phone'])
+        tokens = name_tokens(line['name'])
+        name = ' '.join(sorted(tokens))
+
+        shared = Counter(student_id for token in tokens for student_id in self.by_token.get(token, ()))
+        ids = set(self.by_phone.get(key, ())) | {student_id for student_id, _ in shared.most_common(NAME_SHORTLIST)}
+
+        scored = []
+        for student_id in ids:
+            student = self.students[student_id]
+            score = 0.0
+            if key and student['phone'] == key:
+                score += PHONE_WEIGHT
+            if name and student['name']:
+                score += NAME_WEIGHT * SequenceMatcher(None, name, student['name']).ratio()
+            if student['debt'] > 0:
+                if line['amount'] == student['debt']:
+                    score += AMOUNT_WEIGHT
+                elif line['amount'] < student['debt']:
+                    score += AMOUNT_WEIGHT / 2
+            scored.append((round(score, 3), student_id))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return scored
+
+
+def is_confirmed(scored):
+    if not scored or scored[0][0] < CONFIRM_SCORE:
+        return False
+    return len(scored) == 1 or scored[0][0] - scored[1][0] >= CONFIRM_MARGIN
+
+
+def reconcile_statement(rows, source, month, payment_type, dry_run=False):
+    """
+    Ko'chirmani talabalar bilan solishtiradi. Aniq mosliklar bitta
+    Payment.bulk_create bilan yoziladi (RevenueRollup bilan bir tranzaksiyada),
+    noaniq va topilmagan qatorlar ReconciliationItem navbatiga tushadi.
+    Avval yuklangan qatorlar (izi ReconciliationItem da bor) o'tkazib yuboriladi,
+    shuning uchun faylni qayta yuklash to'lovlarni ikkilantirmaydi. Izi yo'q
+    qatorlar (sana ham, tranzaksiya raqami ham yo'q) avtomatik yozilmaydi,
+    ko'rib chiqish navbatiga tushadi.
+    """
+    lines, errors = read_statement(rows, month.id)
+    known = set(
+        ReconciliationItem.objects.filter(fingerprint__in=[line['fingerprint'] for line in lines if line['fingerprint']])
+        .values_list('fingerprint', flat=True)
+    )
+    skipped = [line['row_number'] for line in lines if line['fingerprint'] in known]
+    lines = [line for line in lines if line['fingerprint'] not in known]
+    index = CandidateIndex(month, {phone_key(line['phone']) for line in lines} - {None})
+
+    items, payments = [], []
+    for line in lines:
+        scored = index.score(line)
+        if is_confirmed(scored) and line['fingerprint']:
+            status = ReconciliationItem.STATUS_MATCHED
+            student = index.students[scored[0][1]]
+            # bitta talabaga bir nechta qator to'g'ri kelsa, qarz xotirada kamayadi
+            student['debt'] -= line['amount']
+            payments.append(Payment(
+                student_id=scored[0][1],
+                group_id=student['group_id'],
+                month_id=month.id,
+                payment_type_id=payment_type.id,
+                price=line['amount'],
+            ))
+        elif scored:
+            status = ReconciliationItem.STATUS_REVIEW
+        else:
+            status = ReconciliationItem.STATUS_UNMATCHED
+        items.append(ReconciliationItem(
+            source=source,
+            fingerprint=line['fingerprint'],
+            row_number=line['row_number'],
+            raw=line['raw'],
+            phone=line['phone'] or None,
+            name=line['name'] or None,
+            amount=line['amount'],
+            month_id=month.id,
+            payment_type_id=payment_type.id,
+            candidates=[
+                {"student_id": student_id, "score": score} for score, student_id in scored[:MAX_CANDIDATES]
+            ],
+            status=status,
+        ))
+
+    counts = Counter(item.status for item in items)
+    report = {
+        "source": source,
+        "lines": len(lines),
+        "matched": counts[ReconciliationItem.STATUS_MATCHED],
+        "review": counts[ReconciliationItem.STATUS_REVIEW],
+        "unmatched": counts[ReconciliationItem.STATUS_UNMATCHED],
+        "skipped": len(skipped),
+        "skipped_rows": skipped,
+        "unverified_rows": [line['row_number'] for line in lines if not line['fingerprint']],
+        "amount": sum((payment.price for payment in payments), Decimal('0')),
+        "errors": errors,
+    }
+    if dry_run:
+        report['items'] = [
+            {"row": item.row_number, "status": item.status, "amount": item.amount, "candidates": item.candidates}
+            for item in items
+        ]
+        return report
+
+    try:
+        with transaction.atomic():
+            payments = Payment.objects.bulk_create(payments)
+            apply_revenue_deltas(payment_deltas(payments))
+            matched = iter(payments)
+            for item in items:
+                if item.status == ReconciliationItem.STATUS_MATCHED:
+                    item.payment = next(matched)
+            ReconciliationItem.objects.bulk_create(items)
+    except IntegrityError:
+        # shu fayl parallel yuklangan: fingerprint unique, hech narsa yozilmaydi
+        raise ReconciliationError("Ko'chirma hozir boshqa so'rovda yuklanmoqda, keyinroq qayta urinib ko'ring")
+    return report
+
+
+@transaction.atomic
+def resolve_item(item_id, student, group=None):
+    """
+    Navbatdagi qatorni qo'lda tanlangan talabaga to'lov sifatida yozadi.
+    """
+    item = ReconciliationItem.objects.select_for_update().get(pk=item_id)
+    if item.status not in OPEN_STATUSES:
+        raise ReconciliationError(f"Qator allaqachon ko'rib chiqilgan: {item.status}")
+    payment = Payment.objects.create(
+        student=student,
+        group=group or student.group,
+        month=item.month,
+        payment_type=item.payment_type,
+        price=item.amount,
+    )
+    item.payment = payment
+    item.status = ReconciliationItem.STATUS_RESOLVED
+    item.save(update_fields=['payment', 'status', 'updated_at'])
+    return item
+
+
+@transaction.atomic
+def reject_item(item_id):
+    item = ReconciliationItem.objects.select_for_update().get(pk=item_id)
+    if item.status not in OPEN_STATUSES:
+        raise ReconciliationError(f"Qator allaqachon ko'rib chiqilgan: {item.status}")
+    item.status = ReconciliationItem.STATUS_REJECTED
+    item.save(update_fields=['status', 'updated_at'])
+    return item
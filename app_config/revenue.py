@@ -0,0 +1,129 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Sum, Value, When
+
+from .models import Group, Payment, RevenueRollup
+
+
+REVENUE_DIMENSIONS = {
+    'month': ('month_id', 'month__title'),
+    'course': ('course_id', 'course__title'),
+    'group': ('group_id', 'group__title'),
+    'payment_type': ('payment_type_id', 'payment_type__title'),
+}
+
+
+def revenue_key(month_id, course_id, group_id, payment_type_id):
+    return (month_id, course_id, group_id, payment_type_id)
+
+
+def _key_string(key):
+    return ':'.join('' if part is None else str(part) for part in key)
+
+
+def payment_deltas(payments, sign=1):
+    """
+    Payment obyektlaridan {key: (summa, soni)} o'zgarishlari. Guruhlarning
+    kursi bitta so'rov bilan olinadi.
+    """
+    payments = list(payments)
+    courses = dict(
+        Group.objects.filter(id__in={payment.group_id for payment in payments if payment.group_id})
+        .values_list('id', 'course_id')
+    )
+    deltas = {}
+    for payment in payments:
+        key = revenue_key(payment.month_id, courses.get(payment.group_id), payment.group_id, payment.payment_type_id)
+        amount, count = deltas.get(key, (Decimal('0'), 0))
+        deltas[key] = (amount + sign * Decimal(payment.price), count + sign)
+    return deltas
+
+
+def merge_deltas(*parts):
+    merged = {}
+    for part in parts:
+        for key, (amount, count) in part.items():
+            total_amount, total_count = merged.get(key, (Decimal('0'), 0))
+            merged[key] = (total_amount + amount, total_count + count)
+    return merged
+
+
+def apply_revenue_deltas(deltas):
+    """
+    {key: (summa, soni)} o'zgarishlarini qo'llaydi: yo'q qatorlar bitta
+    bulk_create bilan ochiladi, so'ng bitta UPDATE ... CASE bilan yangilanadi.
+    Payment yozuvi bilan bir tranzaksiyada chaqirilishi kerak.
+    """
+    deltas = {key: value for key, value in deltas.items() if value[0] or value[1]}
+    if not deltas:
+        return
+    keys = {_key_string(key): key for key in deltas}
+
+    with transaction.atomic():
+        RevenueRollup.objects.bulk_create(
+            [
+                RevenueRollup(
+                    key=key_string, month_id=key[0], course_id=key[1], group_id=key[2], payment_type_id=key[3],
+                )
+                for key_string, key in keys.items()
+            ],
+            ignore_conflicts=True,
+        )
+        RevenueRollup.objects.filter(key__in=keys).update(
+            amount=F('amount') + Case(
+                *(When(key=key_string, then=Value(deltas[key][0])) for key_string, key in keys.items()),
+                default=Value(Decimal('0')),
+                output_field=DecimalField(max_digits=14, decimal_places=2),
+            ),
+            count=F('count') + Case(
+                *(When(key=key_string, then=Value(deltas[key][1])) for key_string, key in keys.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+        )
+
+
+def rebuild_revenue_rollup(batch_size=1000):
+    """
+    Rollup jadvalini Payment jadvalidan boshidan qayta quradi.
+    """
+    rows = (
+        Payment.objects.values('month_id', 'group__course_id', 'group_id', 'payment_type_id')
+        .annotate(amount=Sum('price'), count=Count('id'))
+        .order_by()
+    )
+    with transaction.atomic():
+        RevenueRollup.objects.all().delete()
+        RevenueRollup.objects.bulk_create(
+            (
+                RevenueRollup(
+                    key=_key_string(revenue_key(
+                        row['month_id'], row['group__course_id'], row['group_id'], row['payment_type_id'],
+                    )),
+                    month_id=row['month_id'],
+                    course_id=row['group__course_id'],
+                    group_id=row['group_id'],
+                    payment_type_id=row['payment_type_id'],
+                    amount=row['amount'],
+                    count=row['count'],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=batch_size,
+        )
+    return RevenueRollup.objects.count()
+
+
+def revenue_report(dimensions, **filters):
+    """
+    Tanlangan o'lchovlar bo'yicha tushum (rollup jadvalidan, Payment skanerlanmaydi).
+    `filters` - month_id, course_id, group_id, payment_type_id.
+    """
+    fields = [field for name in dimensions for field in REVENUE_DIMENSIONS[name]]
+    queryset = RevenueRollup.objects.filter(**{key: value for key, value in filters.items() if value is not None})
+    if not fields:
+        totals = queryset.aggregate(amount=Sum('amount'), count=Sum('count'))
+        return [{"amount": totals['amount'] or Decimal('0'), "count": totals['count'] or 0}]
+    rows = queryset.values(*fields).annotate(amount=Sum('amount'), count=Sum('count')).filter(count__gt=0)
+    return list(rows.order_by(*(REVENUE_DIMENSIONS[name][0] for name in dimensions)))
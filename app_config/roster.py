@@ -0,0 +1,87 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Group, Student, Teacher
+from .statistics import mark_groups_dirty
+
+
+class RosterError(Exception):
+    """
+    Ro'yxatdagi ba'zi ID lar topilmadi; hech narsa o'zgartirilmaydi.
+    """
+
+    def __init__(self, label, missing):
+        super().__init__(f"{label} not found: {missing}")
+        self.label = label
+        self.missing = missing
+
+
+def _resolve(queryset, ids, label):
+    ids = set(ids)
+    found = set(queryset.filter(id__in=ids).values_list('id', flat=True))
+    if ids - found:
+        raise RosterError(label, sorted(ids - found))
+    return found
+
+
+def _resolve_students(queryset, student_ids):
+    """
+    Talabalarni bitta so'rov bilan tekshiradi: {id: (group_id, created)}.
+    """
+    ids = set(student_ids)
+    rows = {
+        student_id: (group_id, created)
+        for student_id, group_id, created in queryset.filter(id__in=ids).values_list('id', 'group_id', 'created')
+    }
+    if ids - set(rows):
+        raise RosterError('Students', sorted(ids - set(rows)))
+    return rows
+
+
+def _first_day(rows):
+    return min(created for _, created in rows).date() if rows else None
+
+
+@transaction.atomic
+def add_students(group, student_ids):
+    """
+    Talabalarni guruhga ko'chiradi: bitta tekshiruv va bitta UPDATE ... WHERE id IN.
+    """
+    rows = _resolve_students(Student.objects.all(), student_ids)
+    moving = {student_id: row for student_id, row in rows.items() if row[0] != group.id}
+    if not moving:
+        return 0
+    updated = Student.objects.filter(id__in=moving).update(group_id=group.id, updated=timezone.now())
+    # update() signallarni chaqirmaydi
+    mark_groups_dirty({group_id for group_id, _ in moving.values()} | {group.id}, _first_day(moving.values()))
+    return updated
+
+
+@transaction.atomic
+def remove_students(group, student_ids):
+    rows = _resolve_students(Student.objects.filter(group_id=group.id), student_ids)
+    removed = Student.objects.filter(id__in=rows).update(group_id=None, updated=timezone.now())
+    mark_groups_dirty([group.id], _first_day(rows.values()))
+    return removed
+
+
+@transaction.atomic
+def add_teachers(group, teacher_ids):
+    """
+    Group.teacher M2M ga bitta bulk_create bilan qo'shadi (mavjudlari o'tkazib yuboriladi).
+    """
+    ids = _resolve(Teacher.objects.all(), teacher_ids, 'Teachers')
+    Through = Group.teacher.through
+    existing = set(Through.objects.filter(group_id=group.id, teacher_id__in=ids).values_list('teacher_id', flat=True))
+    Through.objects.bulk_create(
+        [Through(group_id=group.id, teacher_id=teacher_id) for teacher_id in ids - existing],
+        ignore_conflicts=True,
+    )
+    return len(ids - existing)
+
+
+@transaction.atomic
+def remove_teachers(group, teacher_ids):
+    ids = _resolve(Teacher.objects.filter(groups=group), teacher_ids, 'Teachers')
+    deleted, _ = Group.teacher.through.objects.filter(group_id=group.id, teacher_id__in=ids).delete()
+    return deleted
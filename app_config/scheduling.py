@@ -0,0 +1,207 @@
+import threading
+from bisect import bisect_left, insort
+from itertools import accumulate
+
+from django.db import transaction
+
+from .models import Rooms, Table
+from .state import bump_version, read_version
+
+
+# RollupState qatori: jadval o'zgarishlari versiyasi barcha jarayonlar uchun umumiy
+SCHEDULE_STATE = 'schedule'
+
+
+class RoomIntervals:
+    """
+    Bitta xonaning dars oraliqlari, boshlanish vaqti bo'yicha saralangan.
+
+    `max_ends[i]` - 0..i oraliqlarning eng kech tugash vaqti. Kesishish
+    tekshiruvi bisect bilan boshlanadi va faqat kesishishi mumkin bo'lgan
+    oraliqlar ustidan orqaga yuradi: O(log n + k).
+    """
+
+    def __init__(self, entries=()):
+        self.entries = sorted(entries)
+        self._reindex()
+
+    def _reindex(self):
+        self.starts = [start for start, _, _ in self.entries]
+        self.max_ends = list(accumulate((end for _, end, _ in self.entries), max))
+
+    def overlapping(self, start, end, exclude=None):
+        result = []
+        index = bisect_left(self.starts, end) - 1  # start < end bo'lgan oxirgi oraliq
+        while index >= 0 and self.max_ends[index] > start:
+            entry_start, entry_end, table_id = self.entries[index]
+            if entry_end > start and table_id != exclude:
+                result.append(table_id)
+            index -= 1
+        return sorted(result)
+
+    def add(self, start, end, table_id):
+        insort(self.entries, (start, end, table_id))
+        self._reindex()
+
+    def remove(self, table_id):
+        self.entries = [entry for entry in self.entries if entry[2] != table_id]
+        self._reindex()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class ScheduleIndex:
+    """
+    Xonalar bandligi uchun jarayon ichidagi interval indeksi.
+
+    Table jadvali kunlik takrorlanuvchi dars oraliqlarini saqlaydi (kun maydoni
+    yo'q), shuning uchun indeks xona -> [start_time, end_time) oraliqlari.
+    Indeks Table dan bitta so'rov bilan quriladi va shu jarayondagi yozuvlarda
+    joyida yangilanadi. Boshqa jarayonlardagi yozuvlar bazadagi versiya
+    (RollupState 'schedule') orqali ko'rinadi: versiya mos kelmasa indeks
+    qayta quriladi. Indeks faqat tezkor tekshiruv uchun; yozishdan oldingi
+    yakuniy tekshiruv locked_conflicts() da bazadan qilinadi.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rooms = {}
+        self._room_of = {}
+        self._version = None
+
+    def rebuild(self, version=None):
+        # versiya jadvaldan oldin o'qiladi: oraliqdagi yozuv keyingi so'rovda qayta qurishga olib keladi
+        version = read_version(SCHEDULE_STATE) if version is None else version
+        rooms, room_of = {}, {}
+        rows = Table.objects.values_list('room_id', 'start_time', 'end_time', 'id')
+        for room_id, start, end, table_id in rows.iterator():
+            rooms.setdefault(room_id, []).append((start, end, table_id))
+            room_of[table_id] = room_id
+        with self._lock:
+            self._rooms = {room_id: RoomIntervals(entries) for room_id, entries in rooms.items()}
+            self._room_of = room_of
+            self._version = version
+
+    def _fresh(self):
+        version = read_version(SCHEDULE_STATE)
+        if version != self._version:
+            self.rebuild(version)
+
+    def conflicts(self, room_id, start, end, exclude=None):
+        """
+        [start, end) oralig'ida `room_id` xonasini band qilgan Table id lari.
+        """
+        self._fresh()
+        with self._lock:
+            intervals = self._rooms.get(room_id)
+            return intervals.overlapping(start, end, exclude) if intervals else []
+
+    def busy_rooms(self, start, end):
+        self._fresh()
+        with self._lock:
+            return {room_id for room_id, intervals in self._rooms.items() if intervals.overlapping(start, end)}
+
+    def _publish(self, apply=None):
+        """
+        Versiyani yozuv bilan bir tranzaksiyada oshiradi (rollback bo'lsa
+        versiya ham qaytadi). Commit bo'lgach, indeks shu yozuvdan oldingi
+        versiyada bo'lsa o'zgarish joyida qo'llanadi, aks holda keyingi
+        so'rovda qayta quriladi.
+        """
+        version = bump_version(SCHEDULE_STATE)
+
+        def commit():
+            with self._lock:
+                if self._version == version - 1 and apply is not None:
+                    apply()
+                    self._version = version
+        transaction.on_commit(commit)
+
+    def _remove(self, table_id):
+        room_id = self._room_of.pop(table_id, None)
+        if room_id in self._rooms:
+            self._rooms[room_id].remove(table_id)
+
+    def table_saved(self, table):
+        def apply():
+            self._remove(table.pk)
+            self._rooms.setdefault(table.room_id, RoomIntervals()).add(table.start_time, table.end_time, table.pk)
+            self._room_of[table.pk] = table.room_id
+        self._publish(apply)
+
+    def table_deleted(self, table_id):
+        self._publish(lambda: self._remove(table_id))
+
+    def invalidate(self):
+        """
+        bulk_create/update kabi signalsiz yozuvlardan keyin chaqiriladi.
+        """
+        self._publish()
+
+
+schedule_index = ScheduleIndex()
+
+
+def validate_batch(rows, tables_for=None):
+    """
+    Ko'plab jadval qatorlarini (masalan, butun semestr importi) tekshiradi:
+    har biri mavjud jadvallar bilan (standart - indeks) va qatorlar o'zaro.
+    `rows` - room, start_time, end_time kalitli dict lar. Natija - kesishishlar
+    ro'yxati: [{"index", "tables", "rows"}], bo'sh bo'lsa hammasi joylashadi.
+    """
+    tables_for = tables_for or schedule_index.conflicts
+    conflicts = {}
+
+    def report(index):
+        return conflicts.setdefault(index, {"index": index, "tables": [], "rows": []})
+
+    by_room = {}
+    for index, row in enumerate(rows):
+        room_id = row['room'].pk
+        tables = tables_for(room_id, row['start_time'], row['end_time'])
+        if tables:
+            report(index)['tables'] = tables
+        by_room.setdefault(room_id, []).append((row['start_time'], row['end_time'], index))
+
+    # xona ichida saralab, hali tugamagan qatorlar bilan solishtiriladi
+    for entries in by_room.values():
+        active = []
+        for start, end, index in sorted(entries):
+            active = [(active_end, other) for active_end, other in active if active_end > start]
+            for _, other in active:
+                report(index)['rows'].append(other)
+                report(other)['rows'].append(index)
+            active.append((end, index))
+
+    return [conflicts[index] for index in sorted(conflicts)]
+
+
+def lock_rooms(room_ids):
+    """
+    Xona qatorlarini tranzaksiya oxirigacha qulflaydi (SELECT ... FOR UPDATE,
+    id tartibida - deadlock bo'lmasin) va ularning jadvallarini bazadan o'qiydi:
+    {room_id: RoomIntervals}. transaction.atomic ichida chaqiriladi.
+    """
+    ids = sorted(set(room_ids))
+    list(Rooms.objects.select_for_update().filter(id__in=ids).order_by('id').values_list('id', flat=True))
+    entries = {}
+    rows = Table.objects.filter(room_id__in=ids).values_list('room_id', 'start_time', 'end_time', 'id')
+    for room_id, start, end, table_id in rows:
+        entries.setdefault(room_id, []).append((start, end, table_id))
+    return {room_id: RoomIntervals(entries.get(room_id, ())) for room_id in ids}
+
+
+def locked_conflicts(rows, exclude=None):
+    """
+    Yozish tranzaksiyasi ichidagi yakuniy tekshiruv: xonalar qulflanadi va
+    qatorlar indeks emas, bazadagi jadvallar bilan solishtiriladi. Parallel
+    so'rovlar shu xonalar uchun navbatga turadi, shuning uchun eskirgan indeks
+    ikki marta band qilishga olib kelmaydi. Natija validate_batch() formatida.
+    """
+    rooms = lock_rooms(row['room'].pk for row in rows)
+
+    def tables_for(room_id, start, end):
+        return rooms[room_id].overlapping(start, end, exclude)
+
+    return validate_batch(rows, tables_for)
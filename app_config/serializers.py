@@ -2,13 +2,22 @@ from rest_framework import serializers
 from .models import *
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.hashers import check_password
-from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+from rest_framework_simplejwt.serializers import TokenObtainSlidingSerializer, TokenRefreshSlidingSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenBlacklistSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth.hashers import make_password
 
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework.fields import DateField
 from rest_framework.serializers import Serializer
+from .archive import archived_until, needs_archive
+from .otp import get_otp_store
+from .scheduling import schedule_index
+from .tokens import RoleRefreshToken, RoleSlidingToken, add_role_claims
 
 
 User = get_user_model()
@@ -30,6 +39,28 @@ class DateFilterSerializer(Serializer):
     start_date = DateField(required=True)
     end_date = DateField(required=True)
 
+
+class StudentStatsBucketSerializer(DateFilterSerializer):
+    bucket = serializers.ChoiceField(choices=['day', 'week', 'month'], default='month')
+
+    def validate(self, attrs):
+        if attrs['start_date'] > attrs['end_date']:
+            raise serializers.ValidationError({"end_date": "end_date start_date dan oldin bo‘lishi mumkin emas"})
+        return attrs
+
+class ExportFilterSerializer(Serializer):
+    fmt = serializers.ChoiceField(choices=['ndjson', 'csv'], default='ndjson')
+    start_date = DateField(required=False)
+    end_date = DateField(required=False)
+    group = serializers.IntegerField(required=False, min_value=1)
+
+class StudentTimelineSerializer(Serializer):
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+    sections = serializers.MultipleChoiceField(choices=['attendance', 'payments', 'homework'], required=False)
+    attendance_cursor = serializers.CharField(required=False)
+    payments_cursor = serializers.CharField(required=False)
+    homework_cursor = serializers.CharField(required=False)
+
 class TokenRefreshResponseSerializer(serializers.Serializer):
     access = serializers.CharField()
 
@@ -55,22 +86,82 @@ class TokenBlacklistResponseSerializer(serializers.Serializer):
     def update(self, instance, validated_data):
         raise NotImplementedError()
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    # Rol claimlari RoleRefreshToken.for_user ichida qo'shiladi
+    token_class = RoleRefreshToken
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
 
         # Add custom claims
-        token['name'] = user.name
+        token['name'] = user.full_name
         # ...
 
         return token
 
+
+class RoleTokenObtainSlidingSerializer(TokenObtainSlidingSerializer):
+    token_class = RoleSlidingToken
+
+
+def token_owner(token):
+    """
+    Token egasi; o'chirilgan yoki faol bo'lmagan foydalanuvchi uchun 401.
+    """
+    user = User.objects.filter(**{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]}).first()
+    if user is None or not user.is_active:
+        raise AuthenticationFailed("User not found or inactive", code="user_not_found")
+    return user
+
+
+class RoleTokenRefreshSerializer(BaseTokenRefreshSerializer):
+    """
+    Yangi access tokenga rol claimlarini bazadagi joriy qiymatlardan qayta yozadi.
+    """
+    token_class = RoleRefreshToken
+
+    def validate(self, attrs):
+        # bazaviy validate() o'chirilgan foydalanuvchida DoesNotExist (500) beradi
+        user = token_owner(self.token_class(attrs['refresh']))
+        data = super().validate(attrs)
+        data['access'] = str(add_role_claims(AccessToken(data['access']), user))
+        return data
+
+
+class RoleTokenBlacklistSerializer(TokenBlacklistSerializer):
+    token_class = RoleRefreshToken
+
+
+class RoleTokenRefreshSlidingSerializer(TokenRefreshSlidingSerializer):
+    token_class = RoleSlidingToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        token = self.token_class(data['token'])
+        data['token'] = str(add_role_claims(token, token_owner(token)))
+        return data
+
 class UserAllSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = "__all__"   
 
 
+# Ro'yxat uchun yengil serializer: parol xeshi va groups/user_permissions M2M siz.
+# values() dan olingan dict lar bilan ham ishlaydi.
+class UserListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ("id", "phone", "full_name", "is_active", "is_staff", "is_admin",
+                  "is_student", "is_teacher", "created")
+
+
+class UserDetailSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = UserListSerializer.Meta.fields + ("last_login", "updated")
+
+
 class GetTeachersByIdsSerializer(serializers.Serializer):
     teacher_ids = serializers.ListField(child=serializers.IntegerField())
     
@@ -85,6 +176,60 @@ class PaymentSerializer(serializers.ModelSerializer):
         model = Payment
         fields = '__all__'
 
+class RevenueReportSerializer(serializers.Serializer):
+    by = serializers.CharField(required=False, default='month', help_text="month,course,group,payment_type")
+    month = serializers.IntegerField(required=False, min_value=1)
+    course = serializers.IntegerField(required=False, min_value=1)
+    group = serializers.IntegerField(required=False, min_value=1)
+    payment_type = serializers.IntegerField(required=False, min_value=1)
+
+    def validate_by(self, value):
+        dimensions = [part.strip() for part in value.split(',') if part.strip()]
+        unknown = [part for part in dimensions if part not in ('month', 'course', 'group', 'payment_type')]
+        if unknown:
+            raise serializers.ValidationError(f"Noma'lum o‘lcham: {', '.join(unknown)}")
+        return list(dict.fromkeys(dimensions))
+
+class InvoiceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Invoice
+        fields = '__all__'
+
+class BillingRunSerializer(serializers.Serializer):
+    month = serializers.PrimaryKeyRelatedField(queryset=Month.objects.all())
+
+class DebtorFilterSerializer(serializers.Serializer):
+    month = serializers.PrimaryKeyRelatedField(queryset=Month.objects.all(), required=False)
+    group = serializers.IntegerField(required=False, min_value=1)
+
+class DebtorSerializer(serializers.Serializer):
+    student_id = serializers.IntegerField(source='id')
+    full_name = serializers.CharField(source='user__full_name')
+    phone = serializers.CharField(source='user__phone')
+    group_id = serializers.IntegerField()
+    group = serializers.CharField(source='group__title')
+    invoiced = serializers.DecimalField(max_digits=14, decimal_places=2)
+    paid = serializers.DecimalField(max_digits=14, decimal_places=2)
+    debt = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class ReconciliationUploadSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    month = serializers.PrimaryKeyRelatedField(queryset=Month.objects.all())
+    payment_type = serializers.PrimaryKeyRelatedField(queryset=PaymentType.objects.all())
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+class ReconciliationItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ReconciliationItem
+        fields = (
+            'id', 'source', 'row_number', 'phone', 'name', 'amount', 'month', 'payment_type',
+            'candidates', 'status', 'payment', 'raw', 'created_at',
+        )
+
+class ReconciliationResolveSerializer(serializers.Serializer):
+    student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.select_related('group'))
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=False)
+
 class PaymentTypeSerializer(serializers.ModelSerializer):
     class Meta:
         model = PaymentType
@@ -123,10 +268,33 @@ class AttendanceLevelSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class AttendanceSerializer(serializers.ModelSerializer):
+    level_title = serializers.CharField(source='level.title', read_only=True)
+    status_title = serializers.CharField(source='status.title', read_only=True)
+    group_title = serializers.CharField(source='group.title', read_only=True)
+
     class Meta:
         model = Attendance
         fields = '__all__'
 
+    def validate_date(self, value):
+        if needs_archive(value):
+            raise serializers.ValidationError(f"{archived_until()} gacha bo‘lgan davomat arxivlangan")
+        return value
+
+class AttendanceSummaryFilterSerializer(serializers.Serializer):
+    month = serializers.DateField(required=False, input_formats=['%Y-%m', 'iso-8601'])
+    group = serializers.IntegerField(required=False, min_value=1)
+
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    student = serializers.IntegerField(min_value=1)
+    status = serializers.IntegerField(min_value=1)
+    level = serializers.IntegerField(min_value=1, required=False)
+
+class AttendanceBulkSerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+    level = serializers.IntegerField(min_value=1, required=False)
+    items = AttendanceBulkItemSerializer(many=True, allow_empty=False)
+
 # --- Courses Serializer ---
 class CourseSerializer(serializers.ModelSerializer):
     class Meta:
@@ -139,6 +307,25 @@ class GroupSerializer(serializers.ModelSerializer):
         model = Group
         fields = '__all__'
 
+class GroupRosterSerializer(serializers.Serializer):
+    """
+    Bitta ID (student_id / teacher_id) yoki ro'yxat (student_ids / teacher_ids).
+    Qaysi nom ishlatilishi context['name'] da beriladi.
+    """
+    student_id = serializers.IntegerField(required=False, min_value=1)
+    student_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+    teacher_id = serializers.IntegerField(required=False, min_value=1)
+    teacher_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=1000)
+
+    def validate(self, attrs):
+        name = self.context.get('name', 'student')
+        ids = list(attrs.get(f'{name}_ids') or [])
+        if attrs.get(f'{name}_id'):
+            ids.append(attrs[f'{name}_id'])
+        if not ids:
+            raise serializers.ValidationError({f'{name}_ids': "Kamida bitta ID berilishi kerak"})
+        return {'ids': ids}
+
 # --- Homework Serializers ---
 class TopicsSerializer(serializers.ModelSerializer):
     class Meta:
@@ -150,11 +337,28 @@ class GroupHomeWorkSerializer(serializers.ModelSerializer):
         model = GroupHomeWork
         fields = '__all__'
 
+class GroupHomeWorkBulkSerializer(serializers.Serializer):
+    topics = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=500)
+    groups = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, max_length=500)
+    course = serializers.IntegerField(required=False, min_value=1)
+    descriptions = serializers.CharField(required=False, max_length=500)
+
+    def validate(self, attrs):
+        if not attrs.get('groups') and not attrs.get('course'):
+            raise serializers.ValidationError({"groups": "groups yoki course berilishi kerak"})
+        return attrs
+
 class HomeWorkSerializer(serializers.ModelSerializer):
     class Meta:
         model = HomeWork
         fields = '__all__'
 
+class HomeWorkInboxSerializer(serializers.Serializer):
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+    group = serializers.IntegerField(required=False, min_value=1)
+    teacher = serializers.IntegerField(required=False, min_value=1)
+
 # --- Table Types and Tables Serializers ---
 class TableTypeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -166,6 +370,37 @@ class TableSerializer(serializers.ModelSerializer):
         model = Table
         fields = '__all__'
 
+    def validate(self, attrs):
+        start = attrs.get('start_time', getattr(self.instance, 'start_time', None))
+        end = attrs.get('end_time', getattr(self.instance, 'end_time', None))
+        room = attrs.get('room', getattr(self.instance, 'room', None))
+        if start >= end:
+            raise serializers.ValidationError({"end_time": "end_time start_time dan keyin bo'lishi kerak"})
+        # bulk rejimida kesishishlar validate_batch() da birga tekshiriladi
+        if not self.context.get('batch'):
+            conflicts = schedule_index.conflicts(room.pk, start, end, exclude=getattr(self.instance, 'pk', None))
+            if conflicts:
+                raise serializers.ValidationError({"room": f"Xona bu vaqtda band (jadvallar: {conflicts})"})
+        return attrs
+
+class TableBatchSerializer(serializers.Serializer):
+    items = TableSerializer(many=True)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate_items(self, value):
+        if not value:
+            raise serializers.ValidationError("Kamida bitta jadval kerak")
+        return value
+
+class FreeRoomsSerializer(serializers.Serializer):
+    start = serializers.TimeField()
+    end = serializers.TimeField()
+
+    def validate(self, attrs):
+        if attrs['start'] >= attrs['end']:
+            raise serializers.ValidationError({"end": "end start dan keyin bo'lishi kerak"})
+        return attrs
+
 
 # Student serializer
 class StudentSerializer(serializers.ModelSerializer):
@@ -181,6 +416,10 @@ class ParentSerializer(serializers.ModelSerializer):
         model = Parent
         fields = ('id','name','surname','address','phone','description','students')
 
+class StudentImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    chunk_size = serializers.IntegerField(required=False, default=500, min_value=1, max_value=5000)
+
 # Student va ota-onani yaratish uchun serializer
 class UserAndStudentSerializer(serializers.Serializer):
     user = UserSerializer()
@@ -228,11 +467,9 @@ class ResetPasswordSerializer(serializers.Serializer):
     phone = serializers.CharField()
 
     def validate(self, data):
-        user = User.objects.filter(phone=data['phone']).first()
-        if not user:
+        if not User.objects.filter(phone=data['phone']).exists():
             raise serializers.ValidationError({"error": "Bunday foydalanuvchi mavjud emas"})
-        user.otp_code = "123456"  # OTP
-        user.save()
+        get_otp_store().issue(data['phone'])  # OTP
         return data
 
 class VerifyOTPSerializer(serializers.Serializer):
@@ -245,13 +482,13 @@ class SetNewPasswordSerializer(serializers.Serializer):
     new_password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        user = User.objects.filter(phone=data['phone'], otp_code=data['otp']).first()
-        if not user:
+        user = User.objects.filter(phone=data['phone']).first()
+        #  OTP to'g'ri bo'lsa store dan o'chiriladi
+        if not user or not get_otp_store().verify(data['phone'], data['otp'], consume=True):
             raise serializers.ValidationError({"error": "Foydalanuvchi topilmadi yoki OTP noto‘g‘ri"})
 
         user.password = make_password(data['new_password'])
-        user.otp_code = None  #  OTP kodni o‘chiramiz
-        user.save()
+        user.save(update_fields=['password'])
         return data
     
 class TokenRefreshSerializer(serializers.Serializer):
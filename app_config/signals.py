@@ -0,0 +1,121 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .authentication import invalidate_cached_user
+from .blacklist import blacklist_filter
+from .models import Group, Payment, Student, Table, User
+from .revenue import apply_revenue_deltas, merge_deltas, payment_deltas
+from .scheduling import schedule_index
+from .statistics import mark_groups_dirty, mark_student_stats_dirty
+from .tokens import forget_role_version, publish_role_version
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    forget_role_version(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_roles_changed(sender, instance, **kwargs):
+    publish_role_version(instance)
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def token_blacklisted(sender, instance, created, **kwargs):
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: blacklist_filter.add(jti))
+
+
+# Kunlik talabalar statistikasi (app_config/statistics.py)
+@receiver(pre_save, sender=Student)
+def student_before_save(sender, instance, **kwargs):
+    instance._previous_group_id = (
+        Student.objects.filter(pk=instance.pk).values_list('group_id', flat=True).first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Student)
+def student_saved(sender, instance, created, **kwargs):
+    if created:
+        mark_groups_dirty([instance.group_id], instance.created.date())
+        return
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if previous_group_id != instance.group_id:
+        mark_groups_dirty([previous_group_id, instance.group_id], instance.created.date())
+
+
+@receiver(post_delete, sender=Student)
+def student_deleted(sender, instance, **kwargs):
+    mark_groups_dirty([instance.group_id], instance.created.date())
+
+
+@receiver(pre_save, sender=Group)
+def group_before_save(sender, instance, **kwargs):
+    instance._previous_dates = (
+        Group.objects.filter(pk=instance.pk).values_list('start_date', 'end_date').first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_dates', None)
+    if previous != (instance.start_date, instance.end_date):
+        mark_groups_dirty([instance.pk], min(filter(None, [instance.start_date, *(previous or ())])))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    mark_student_stats_dirty(instance.start_date)
+
+
+# Xonalar bandligi indeksi (app_config/scheduling.py)
+@receiver(post_save, sender=Table)
+def table_saved(sender, instance, **kwargs):
+    schedule_index.table_saved(instance)
+
+
+@receiver(post_delete, sender=Table)
+def table_deleted(sender, instance, **kwargs):
+    schedule_index.table_deleted(instance.pk)
+
+
+# Tushum rollup jadvali (app_config/revenue.py): admin, ORM va kaskad o'chirishlar ham
+@receiver(pre_save, sender=Payment)
+def payment_before_save(sender, instance, **kwargs):
+    previous = (
+        Payment.objects.filter(pk=instance.pk).only('month_id', 'group_id', 'payment_type_id', 'price').first()
+        if instance.pk else None
+    )
+    instance._previous_revenue = payment_deltas([previous], sign=-1) if previous else {}
+
+
+@receiver(post_save, sender=Payment)
+def payment_saved(sender, instance, **kwargs):
+    apply_revenue_deltas(merge_deltas(getattr(instance, '_previous_revenue', {}), payment_deltas([instance])))
+
+
+# Month/PaymentType/Student o'chirilganda ham: CASCADE har bir Payment uchun post_delete yuboradi
+@receiver(post_delete, sender=Payment)
+def payment_deleted(sender, instance, **kwargs):
+    apply_revenue_deltas(payment_deltas([instance], sign=-1))
+
+
+@receiver(pre_delete, sender=Group)
+def group_before_delete(sender, instance, **kwargs):
+    # Payment.group SET_NULL signalsiz UPDATE: tushum guruhsiz kalitga ko'chiriladi
+    payments = list(Payment.objects.filter(group=instance).only('month_id', 'group_id', 'payment_type_id', 'price'))
+    if payments:
+        old = payment_deltas(payments, sign=-1)
+        for payment in payments:
+            payment.group_id = None
+        apply_revenue_deltas(merge_deltas(old, payment_deltas(payments)))
@@ -0,0 +1,53 @@
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import RollupState
+
+
+def read_state(name):
+    """
+    (watermark, version, refreshed_at) - qator bo'lmasa (None, 0, None). Bitta SELECT.
+    """
+    row = RollupState.objects.filter(name=name).values_list('watermark', 'version', 'refreshed_at').first()
+    return row or (None, 0, None)
+
+
+def read_version(name):
+    return RollupState.objects.filter(name=name).values_list('version', flat=True).first() or 0
+
+
+def bump_version(name, **fields):
+    """
+    Versiyani atomik oshiradi (UPDATE ... SET version = version + 1) va yangisini qaytaradi.
+    """
+    RollupState.objects.get_or_create(name=name)
+    RollupState.objects.filter(name=name).update(version=F('version') + 1, **fields)
+    return read_version(name)
+
+
+def lock_state(name, nowait=True):
+    """
+    Holat qatorini tranzaksiya oxirigacha qulflaydi (SELECT ... FOR UPDATE NOWAIT).
+    Boshqa jarayon qulflagan bo'lsa None qaytaradi; nowait=False bo'lsa
+    qulf bo'shaguncha kutadi. transaction.atomic ichida chaqiriladi.
+    """
+    RollupState.objects.get_or_create(name=name)
+    try:
+        with transaction.atomic():  # savepoint: xato tashqi tranzaksiyani buzmasin
+            return RollupState.objects.select_for_update(nowait=nowait).get(name=name)
+    except DatabaseError:
+        return None
+
+
+def save_state(state, **fields):
+    """
+    Qulflangan qatorni yangilaydi: watermark va boshqa maydonlar, versiya +1.
+    """
+    for field, value in fields.items():
+        setattr(state, field, value)
+    state.refreshed_at = timezone.now()
+    state.version = F('version') + 1
+    state.save()
+    state.refresh_from_db(fields=['version'])
+    return state
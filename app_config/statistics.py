@@ -0,0 +1,282 @@
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import Group, Student, StudentDailyStat, StudentStatDirty
+from .state import lock_state, read_state, read_version, save_state
+
+
+STATE_NAME = 'student_stats'
+STATS_SETTINGS = getattr(settings, 'STUDENT_STATS', {})
+# Bugungi (tugamagan) kun shu muddatdan tez-tez qayta hisoblanmaydi
+TODAY_REFRESH_INTERVAL = STATS_SETTINGS.get('TODAY_REFRESH_INTERVAL', 60)
+# O'tgan davrlar uchun bucket natijalari keshi (versiya o'zgarsa avtomatik eskiradi)
+BUCKET_CACHE_TTL = 60 * 60
+
+BUCKETS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def mark_student_stats_dirty(day):
+    """
+    `day` dan boshlab barcha guruhlar statistikasini qayta hisoblash kerakligini belgilaydi.
+    """
+    if day is not None:
+        StudentStatDirty.objects.create(from_date=day)
+
+
+def mark_groups_dirty(group_ids, day=None):
+    """
+    Guruh tarkibi o'zgarganda faqat shu guruhlar qatorlari qayta hisoblanadi:
+    studying guruh boshlangan kundan, registered esa `day` dan. Guruhsiz
+    talabalar (None) uchun barcha guruhlar `day` dan belgilanadi.
+    """
+    group_ids = set(group_ids)
+    if None in group_ids:
+        mark_student_stats_dirty(day)
+    starts = Group.objects.filter(id__in=group_ids - {None}).values_list('id', 'start_date')
+    StudentStatDirty.objects.bulk_create([
+        StudentStatDirty(group_id=group_id, from_date=min(filter(None, [start, day])))
+        for group_id, start in starts
+        if start or day
+    ])
+
+
+def _days(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def build_daily_stats(start, end, group_ids=None):
+    """
+    [start, end] oralig'idagi kunlik qatorlarni uchta set-based so'rov bilan hisoblaydi.
+    `group_ids` berilsa faqat shu guruhlar qatorlari.
+    """
+    totals = defaultdict(lambda: [0, 0, 0])  # registered, studying, graduated
+
+    registrations = Student.objects.filter(created__date__range=(start, end))
+    groups = Group.objects.filter(start_date__lte=end, end_date__gte=start)
+    if group_ids is not None:
+        registrations = registrations.filter(group_id__in=group_ids)
+        groups = groups.filter(id__in=group_ids)
+
+    registrations = (
+        registrations.annotate(day=TruncDate('created'))
+        .values('day', 'group_id', 'group__course_id')
+        .annotate(count=Count('id'))
+    )
+    for row in registrations:
+        totals[(row['day'], row['group__course_id'], row['group_id'])][0] += row['count']
+
+    groups = (
+        groups.annotate(count=Count('students'))
+        .filter(count__gt=0)
+        .values('id', 'course_id', 'start_date', 'end_date', 'count')
+    )
+    for group in groups:
+        for day in _days(max(start, group['start_date']), min(end, group['end_date'])):
+            totals[(day, group['course_id'], group['id'])][1] += group['count']
+        if start <= group['end_date'] <= end:
+            totals[(group['end_date'], group['course_id'], group['id'])][2] += group['count']
+
+    return [
+        StudentDailyStat(
+            date=day, course_id=course_id, group_id=group_id,
+            registered=registered, studying=studying, graduated=graduated,
+        )
+        for (day, course_id, group_id), (registered, studying, graduated) in totals.items()
+    ]
+
+
+def refresh_student_stats(start, end, group_ids=None):
+    rows = StudentDailyStat.objects.filter(date__range=(start, end))
+    if group_ids is not None:
+        rows = rows.filter(group_id__in=group_ids)
+    with transaction.atomic():
+        rows.delete()
+        StudentDailyStat.objects.bulk_create(build_daily_stats(start, end, group_ids), batch_size=1000)
+
+
+def earliest_stats_date():
+    dates = [
+        Student.objects.aggregate(day=Min('created'))['day'],
+        Group.objects.aggregate(day=Min('start_date'))['day'],
+    ]
+    dates = [day.date() if hasattr(day, 'date') else day for day in dates if day]
+    return min(dates) if dates else None
+
+
+@transaction.atomic
+def ensure_student_stats(until=None, rebuild=False, wait=False):
+    """
+    Rollup jadvalini `until` (standart - bugun) gacha inkremental to'ldiradi.
+    Holat (watermark) RollupState da, o'zgarish belgilari StudentStatDirty da
+    saqlanadi; bir vaqtda faqat bitta jarayon hisoblaydi (SELECT FOR UPDATE).
+    Oxirgi hisoblangan kun (u tugamagan bo'lishi mumkin) va undan keyingi
+    kunlar barcha guruhlar uchun, undan oldingi belgilar esa faqat belgilangan
+    guruhlar uchun qayta hisoblanadi. Qulf band bo'lsa False qaytaradi
+    (wait=True bo'lsa qulf bo'shaguncha kutadi).
+    """
+    until = until or timezone.localdate()
+    state = lock_state(STATE_NAME, nowait=not wait)
+    if state is None:
+        return False
+
+    marks = list(StudentStatDirty.objects.values_list('id', 'group_id', 'from_date'))
+    rolled_until = None if rebuild else state.watermark
+    if rolled_until is None and not rebuild:
+        rolled_until = StudentDailyStat.objects.aggregate(day=Max('date'))['day']
+
+    start = earliest_stats_date() if rolled_until is None else min(rolled_until, until)
+    if start is not None:
+        global_marks = [from_date for _, group_id, from_date in marks if group_id is None]
+        start = min([start, *global_marks])
+        refresh_student_stats(start, until)
+
+        group_marks = {}
+        for _, group_id, from_date in marks:
+            if group_id is not None and from_date < start:
+                group_marks[group_id] = min(from_date, group_marks.get(group_id, from_date))
+        for group_id, from_date in group_marks.items():
+            refresh_student_stats(from_date, start - timedelta(days=1), [group_id])
+
+    # Shu orada qo'shilgan belgilar keyingi hisoblashda qoladi
+    StudentStatDirty.objects.filter(id__in=[mark_id for mark_id, _, _ in marks]).delete()
+    save_state(state, watermark=until)  # versiya +1: bucket keshi eskiradi
+    return True
+
+
+def student_stats_stale(today=None):
+    """
+    Rollup yangilanishi kerakmi: bugungacha to'ldirilmagan, bugungi kun
+    TODAY_REFRESH_INTERVAL dan eski yoki qayta hisoblash belgilari bor.
+    """
+    today = today or timezone.localdate()
+    watermark, _, refreshed_at = read_state(STATE_NAME)
+    if watermark is None or watermark < today:
+        return True
+    if refreshed_at is None or timezone.now() - refreshed_at > timedelta(seconds=TODAY_REFRESH_INTERVAL):
+        return True
+    return StudentStatDirty.objects.exists()
+
+
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='student-stats')
+_refresh_lock = threading.Lock()
+_refresh_future = None
+
+
+def _refresh_in_background():
+    try:
+        ensure_student_stats()
+    finally:
+        connection.close()
+
+
+def schedule_student_stats_refresh():
+    """
+    Rollupni so'rovdan tashqarida, fon threadida yangilaydi (jarayonda bir
+    vaqtda bittadan ko'p emas). STUDENT_STATS['BACKGROUND_REFRESH'] = False
+    bo'lsa faqat rollup_student_stats buyrug'i (cron) yangilaydi.
+    """
+    global _refresh_future
+    if not STATS_SETTINGS.get('BACKGROUND_REFRESH', True):
+        return False
+    with _refresh_lock:
+        if _refresh_future is not None and not _refresh_future.done():
+            return False
+        _refresh_future = _refresh_executor.submit(_refresh_in_background)
+    return True
+
+
+def refresh_if_stale(today=None):
+    """
+    Rollup hech qachon to'ldirilmagan bo'lsa (deploydan keyingi birinchi
+    so'rov) u shu so'rovda sinxron quriladi - bo'sh jadvaldan noto'g'ri javob
+    berilmasin. Keyingi yangilashlar fonda.
+    """
+    if read_state(STATE_NAME)[0] is None:
+        ensure_student_stats(wait=True)
+    elif student_stats_stale(today):
+        transaction.on_commit(schedule_student_stats_refresh)
+
+
+def student_stats_for_range(start_date, end_date):
+    """
+    Sana oralig'i uchun statistika: O(kunlar) qatorlar yig'indisi.
+    studying - oraliqning oxirgi kunidagi (yoki bugungi) holat.
+    Javob mavjud rollupdan beriladi; eskirgan bo'lsa yangilash fonda boshlanadi
+    (birinchi marta esa rollup shu so'rovda quriladi).
+    """
+    today = timezone.localdate()
+    refresh_if_stale(today)
+
+    rows = StudentDailyStat.objects.filter(date__range=(start_date, end_date))
+    sums = rows.aggregate(registered=Sum('registered'), graduated=Sum('graduated'))
+    snapshot_day = min(end_date, today)
+    studying = (
+        StudentDailyStat.objects.filter(date=snapshot_day).aggregate(total=Sum('studying'))['total']
+        if snapshot_day >= start_date else 0
+    )
+    return {
+        "registered_students": sums['registered'] or 0,
+        "studying_students": studying or 0,
+        "graduated_students": sums['graduated'] or 0,
+    }
+
+
+def student_stats_buckets(start_date, end_date, bucket='month'):
+    """
+    Kun/hafta/oy bo'yicha kurs va guruh kesimidagi statistika: rollup jadvali
+    ustida bitta GROUP BY so'rovi. Natija (oraliq, bucket) bo'yicha keshlanadi.
+    active - davr ichida guruhda bir vaqtda o'qigan talabalarning eng ko'p soni.
+    """
+    today = timezone.localdate()
+    # Versiya RollupState da: istalgan jarayondagi rollup keshni eskirtiradi
+    version = read_version(STATE_NAME)
+    # Bugunni o'z ichiga olgan oraliq har kuni yangi kalit oladi
+    key = f"student_stats:buckets:{version}:{bucket}:{start_date}:{min(end_date, today)}"
+    results = cache.get(key)
+    if results is not None:
+        return results
+
+    refresh_if_stale(today)
+    rows = (
+        StudentDailyStat.objects.filter(date__range=(start_date, end_date))
+        .annotate(period=BUCKETS[bucket]('date'))
+        .values('period', 'course_id', 'course__title', 'group_id', 'group__title')
+        .annotate(
+            registered=Sum('registered'),
+            active=Max('studying'),
+            graduated=Sum('graduated'),
+        )
+        .order_by('period', 'course_id', 'group_id')
+    )
+    results = [
+        {
+            "period": row['period'],
+            "course_id": row['course_id'],
+            "course": row['course__title'],
+            "group_id": row['group_id'],
+            "group": row['group__title'],
+            "registered": row['registered'],
+            "active": row['active'],
+            "graduated": row['graduated'],
+        }
+        for row in rows
+    ]
+    timeout = TODAY_REFRESH_INTERVAL if end_date >= today else BUCKET_CACHE_TTL
+    cache.set(key, results, timeout=timeout)
+    return results
@@ -0,0 +1,73 @@
+import datetime
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from app_config.archive import archive_attendance, archive_cutoff, archived_until, attendance_queryset, needs_archive
+from app_config.models import ArchivedAttendance, Attendance
+
+from .utils import client_for, fast_hashing, make_school
+
+
+@fast_hashing
+class AttendanceArchiveTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.school = make_school(students=1)
+        self.student = self.school.students[0]
+        self.old_day = datetime.date(2025, 1, 15)
+        self.rows = [
+            Attendance.objects.create(
+                level=self.school.level, student=self.student, group=self.school.group,
+                status=self.school.present, date=day,
+            )
+            for day in (self.old_day, self.old_day + datetime.timedelta(days=1), self.school.today)
+        ]
+
+    def test_cutoff_is_first_day_of_month(self):
+        self.assertEqual(archive_cutoff(6, datetime.date(2026, 3, 20)), datetime.date(2025, 9, 1))
+
+    def test_rows_move_in_batches_and_keep_ids(self):
+        moved = archive_attendance(datetime.date(2025, 2, 1), batch_size=1)
+        self.assertEqual(moved, 2)
+        self.assertEqual(Attendance.objects.get().id, self.rows[2].id)
+        self.assertEqual(sorted(ArchivedAttendance.objects.values_list('id', flat=True)), [self.rows[0].id, self.rows[1].id])
+
+    def test_boundary_is_seen_by_another_process(self):
+        # Web worker chegarani arxivlashdan oldin o'qiydi
+        self.assertFalse(needs_archive())
+        # Arxivlash boshqa jarayonda (buyruq) bajariladi va bu jarayon keshiga tegmaydi
+        archive_attendance(datetime.date(2025, 2, 1))
+        cache.clear()
+        self.assertEqual(archived_until(), self.old_day + datetime.timedelta(days=1))
+        self.assertTrue(needs_archive(self.old_day))
+        self.assertFalse(needs_archive(self.school.today))
+
+    def test_reads_union_archived_rows(self):
+        archive_attendance(datetime.date(2025, 2, 1))
+        ids = [row.id for row in attendance_queryset(student_id=self.student.id).order_by('-date')]
+        self.assertEqual(ids, [row.id for row in reversed(self.rows)])
+        recent = attendance_queryset(start=self.school.today, student_id=self.student.id)
+        self.assertEqual([row.id for row in recent], [self.rows[2].id])
+
+    def test_history_endpoint_includes_archive(self):
+        archive_attendance(datetime.date(2025, 2, 1))
+        response = client_for(self.school.admin).get(f'/students/{self.student.id}/attendance/')
+        self.assertEqual(len(response.json()['results']), 3)
+
+    def test_writes_to_archived_dates_are_rejected(self):
+        archive_attendance(datetime.date(2025, 2, 1))
+        response = client_for(self.school.admin).post('/attendances/', {
+            'level': self.school.level.id, 'student': self.student.id, 'status': self.school.absent.id,
+            'group': self.school.group.id, 'date': self.old_day,
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('date', response.json())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('archive_attendance', '--months', '6', stdout=out)
+        self.assertIn("2 ta yozuv arxivlandi", out.getvalue())
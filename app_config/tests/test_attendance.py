@@ -0,0 +1,148 @@
+import datetime
+
+from django.db.models import Sum
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from app_config.models import Attendance, AttendanceCounter
+from app_config.tokens import RoleRefreshToken
+
+from .utils import MigrationTestCase, client_for, fast_hashing, make_school
+
+
+@fast_hashing
+class AttendanceBulkTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=3)
+        self.url = f'/groups/{self.school.group.id}/attendance/bulk/'
+        self.payload = {
+            'level': self.school.level.id,
+            'items': [
+                {'student': student.id, 'status': self.school.present.id}
+                for student in self.school.students
+            ],
+        }
+
+    def post(self, user, payload=None):
+        return client_for(user).post(self.url, payload or self.payload, format='json')
+
+    def test_students_cannot_mark_attendance(self):
+        response = self.post(self.school.students[0].user)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_teacher_and_admin_can_mark(self):
+        self.assertEqual(self.post(self.school.teacher.user).status_code, 200)
+        self.assertEqual(self.post(self.school.admin).status_code, 200)
+
+    def test_demoted_teacher_token_is_rejected(self):
+        teacher = self.school.teacher.user
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {RoleRefreshToken.for_user(teacher).access_token}')
+        teacher.is_teacher = False
+        teacher.save()
+        response = client.post(self.url, self.payload, format='json')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'roles_changed')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_repeat_is_an_upsert_and_counters_follow(self):
+        first = self.post(self.school.teacher.user).json()
+        self.assertEqual((first['created'], first['updated']), (3, 0))
+
+        self.payload['items'][0]['status'] = self.school.absent.id
+        second = self.post(self.school.teacher.user).json()
+        self.assertEqual((second['created'], second['updated']), (0, 3))
+        self.assertEqual(Attendance.objects.count(), 3)
+
+        counts = dict(
+            AttendanceCounter.objects.values('status__name').annotate(total=Sum('count')).values_list('status__name', 'total')
+        )
+        self.assertEqual(counts, {'present': 2, 'absent': 1})
+
+    def test_invalid_items_are_rejected_before_writing(self):
+        outsider = self.school.students[0]
+        outsider.group = None
+        outsider.save()
+        response = self.post(self.school.admin)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('student', response.json())
+        self.assertFalse(Attendance.objects.exists())
+
+        payload = dict(self.payload, level=None)
+        payload.pop('level')
+        response = self.post(self.school.admin, payload)
+        self.assertIn('level', response.json())
+
+
+def create_old_attendance(apps, statuses):
+    """
+    0009 sxemasida bitta talabaga ketma-ket davomat yozuvlari (date maydoni hali yo'q).
+    """
+    User = apps.get_model('app_config', 'User')
+    Student = apps.get_model('app_config', 'Student')
+    Course = apps.get_model('app_config', 'Course')
+    Group = apps.get_model('app_config', 'Group')
+    Level = apps.get_model('app_config', 'AttendanceLevel')
+    Status = apps.get_model('app_config', 'Status')
+    Attendance = apps.get_model('app_config', 'Attendance')
+
+    course = Course.objects.create(title='Python')
+    group = Group.objects.create(title='G1', course=course, start_date='2026-01-01', end_date='2026-12-31')
+    student = Student.objects.create(user=User.objects.create(phone='998901112233', password='x'), group=group)
+    level = Level.objects.create(title='L1')
+    by_name = {
+        'present': Status.objects.create(title='Keldi', name='present'),
+        'absent': Status.objects.create(title='Kelmadi', name='absent'),
+    }
+    return [
+        Attendance.objects.create(level=level, student=student, status=by_name[name], group=group)
+        for name in statuses
+    ]
+
+
+class AttendanceDateMigrationTests(MigrationTestCase):
+    migrate_from = '0009_homework_created'
+    migrate_to = '0010_attendance_date'
+
+    def setUpBeforeMigration(self, apps):
+        Attendance = apps.get_model('app_config', 'Attendance')
+        rows = create_old_attendance(apps, ['present', 'absent'])
+        yesterday = rows[0].created - datetime.timedelta(days=1)
+        Attendance.objects.filter(pk=rows[0].pk).update(created=yesterday)
+        self.expected = {rows[0].pk: yesterday.date(), rows[1].pk: rows[1].created.date()}
+
+    def test_dates_are_backfilled(self):
+        Attendance = self.apps.get_model('app_config', 'Attendance')
+        self.assertEqual(dict(Attendance.objects.values_list('id', 'date')), self.expected)
+
+
+class AttendanceDateDuplicateMigrationTests(TransactionTestCase):
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('app_config', target)])
+        return executor.loader.project_state([('app_config', target)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes('app_config'))
+
+    def test_duplicates_stop_the_migration_without_deleting(self):
+        apps = self.migrate('0009_homework_created')
+        Attendance = apps.get_model('app_config', 'Attendance')
+        rows = create_old_attendance(apps, ['present', 'absent'])
+
+        with self.assertRaisesMessage(RuntimeError, f"id={[row.pk for row in rows]}"):
+            self.migrate('0010_attendance_date')
+        self.assertEqual(Attendance.objects.count(), 2)
+
+        # qo'lda tuzatilgandan keyin migratsiya o'tadi
+        Attendance.objects.filter(pk=rows[0].pk).delete()
+        apps = self.migrate('0010_attendance_date')
+        self.assertEqual(apps.get_model('app_config', 'Attendance').objects.get().pk, rows[1].pk)
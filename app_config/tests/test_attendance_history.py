@@ -0,0 +1,61 @@
+import datetime
+
+from django.db import connection
+from django.test import TestCase
+
+from app_config.models import Attendance, Group
+
+from .utils import client_for, fast_hashing, make_school
+
+
+@fast_hashing
+class AttendanceHistoryTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.client = client_for(self.school.admin)
+        self.student = self.school.students[0]
+        self.today = self.school.today
+        self.other = Group.objects.create(title='G2', course=self.school.course, start_date=self.today, end_date=self.today)
+        for days in (0, 5, 40):
+            Attendance.objects.create(
+                level=self.school.level, student=self.student, group=self.school.group,
+                status=self.school.absent if days == 5 else self.school.present,
+                date=self.today - datetime.timedelta(days=days),
+            )
+        Attendance.objects.create(
+            level=self.school.level, student=self.student, group=self.other,
+            status=self.school.present, date=self.today,
+        )
+        self.url = f'/students/{self.student.id}/attendance/'
+
+    def dates(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row['date'] for row in response.json()['results']]
+
+    def days_ago(self, *days):
+        return [str(self.today - datetime.timedelta(days=day)) for day in days]
+
+    def test_newest_lesson_first(self):
+        self.assertEqual(self.dates(), self.days_ago(0, 0, 5, 40))
+
+    def test_date_range_and_id_filters(self):
+        since = self.today - datetime.timedelta(days=30)
+        self.assertEqual(self.dates(**{'from': since}), self.days_ago(0, 0, 5))
+        self.assertEqual(self.dates(to=since), self.days_ago(40))
+        self.assertEqual(self.dates(group=self.other.id), self.days_ago(0))
+        self.assertEqual(self.dates(status=self.school.absent.id), self.days_ago(5))
+
+    def test_rows_carry_titles(self):
+        row = self.client.get(self.url, {'group': self.other.id}).json()['results'][0]
+        self.assertEqual((row['group_title'], row['status_title'], row['level_title']), ('G2', 'Keldi', 'L1'))
+
+    def test_invalid_filters_are_400(self):
+        for params in ({'from': '2026-13-01'}, {'to': 'yesterday'}, {'group': 'x'}, {'status': '-1'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, 400, params)
+
+    def test_range_scan_uses_student_date_index(self):
+        queryset = Attendance.objects.filter(student_id=self.student.id, date__gte=self.today).order_by('-date', '-id')
+        if connection.vendor == 'sqlite':
+            self.assertIn('attendance_student_date_idx', queryset.explain())
@@ -0,0 +1,62 @@
+import datetime
+
+from django.test import TestCase
+
+from app_config.attendance import attendance_matrix
+from app_config.models import Attendance
+
+from .utils import client_for, fast_hashing, make_school
+
+
+@fast_hashing
+class AttendanceMatrixTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.month = self.school.today.replace(day=1)
+        self.first, self.second = self.school.students
+        self.mark(self.first, 1, self.school.present)
+        self.mark(self.second, 2, self.school.absent)
+        self.url = f'/groups/{self.school.group.id}/attendance/matrix/'
+        self.client = client_for(self.school.teacher.user)
+
+    def mark(self, student, day, status):
+        return Attendance.objects.create(
+            level=self.school.level, student=student, group=self.school.group,
+            status=status, date=self.month.replace(day=day),
+        )
+
+    def test_compact_matrix(self):
+        matrix = attendance_matrix(self.school.group, self.month)
+        self.assertEqual(matrix['shape'], [2, 2])
+        codes = {status['name']: status['code'] for status in matrix['statuses']}
+        students = [student['id'] for student in matrix['students']]
+        row = students.index(self.first.id)
+        self.assertEqual(matrix['codes'][row * 2:row * 2 + 2], [codes['present'], 0])
+        row = students.index(self.second.id)
+        self.assertEqual(matrix['codes'][row * 2:row * 2 + 2], [0, codes['absent']])
+
+    def test_students_who_left_keep_their_row(self):
+        self.second.group = None
+        self.second.save()
+        matrix = attendance_matrix(self.school.group, self.month)
+        self.assertIn(self.second.id, [student['id'] for student in matrix['students']])
+
+    def test_etag_answers_304_until_data_changes(self):
+        response = self.client.get(self.url, {'month': self.month.strftime('%Y-%m')})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, {'month': self.month.strftime('%Y-%m')}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.mark(self.first, 3, self.school.absent)
+        response = self.client.get(self.url, {'month': self.month.strftime('%Y-%m')}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_other_month_is_empty(self):
+        previous = (self.month - datetime.timedelta(days=1)).replace(day=1)
+        matrix = attendance_matrix(self.school.group, previous)
+        self.assertEqual(matrix['dates'], [])
+        self.assertEqual(matrix['codes'], [])
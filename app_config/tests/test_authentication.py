@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import RequestFactory, TestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from app_config.authentication import CachedJWTAuthentication, invalidate_cached_user, user_cache
+from app_config.cache import TTLCache
+from app_config.models import User
+from app_config.tokens import RoleRefreshToken
+
+from .utils import fast_hashing, make_user
+
+
+class TTLCacheTests(TestCase):
+
+    def test_entries_expire_after_ttl(self):
+        cache = TTLCache(max_size=10, ttl=5)
+        with mock.patch('app_config.cache.time.monotonic', return_value=100):
+            cache.set('a', 1)
+        with mock.patch('app_config.cache.time.monotonic', return_value=104):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('app_config.cache.time.monotonic', return_value=105):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+
+@fast_hashing
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = make_user('998901112233')
+        token = RoleRefreshToken.for_user(self.user).access_token
+        self.request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.auth = CachedJWTAuthentication()
+
+    def test_second_request_makes_no_queries(self):
+        self.auth.authenticate(self.request)
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate(self.request)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_returned_user_is_a_copy(self):
+        first, _ = self.auth.authenticate(self.request)
+        first.full_name = 'changed'
+        second, _ = self.auth.authenticate(self.request)
+        self.assertNotEqual(second.full_name, 'changed')
+
+    def test_saving_user_invalidates_cache(self):
+        self.auth.authenticate(self.request)
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(self.request)
+
+    def test_deleting_user_invalidates_cache(self):
+        self.auth.authenticate(self.request)
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(self.request)
+
+    def test_queryset_update_is_visible_after_explicit_invalidation(self):
+        # update() signal yubormaydi: hujjatlashtirilgan cheklov
+        self.auth.authenticate(self.request)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user, _ = self.auth.authenticate(self.request)
+        self.assertTrue(user.is_active)
+
+        invalidate_cached_user(self.user.pk)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(self.request)
@@ -0,0 +1,147 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from app_config.billing import debtors, run_billing
+from app_config.models import Group, Invoice, Payment
+
+from .utils import MigrationTestCase, client_for, fast_hashing, make_school
+
+
+@fast_hashing
+class RunBillingTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=3)
+        self.month = self.school.month
+
+    def test_rerun_does_not_duplicate(self):
+        first = run_billing(self.month)
+        self.assertEqual((first['students'], first['created'], first['updated']), (3, 3, 0))
+        second = run_billing(self.month)
+        self.assertEqual((second['created'], second['updated']), (0, 3))
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_rerun_picks_up_new_price(self):
+        run_billing(self.month)
+        Group.objects.filter(pk=self.school.group.pk).update(price='600000')
+        run_billing(self.month)
+        self.assertEqual(set(Invoice.objects.values_list('amount', flat=True)), {Decimal('600000')})
+
+    def test_group_change_mid_month_keeps_one_invoice(self):
+        run_billing(self.month)
+        other = Group.objects.create(
+            title='G2',
+            course=self.school.course,
+            start_date=self.school.today,
+            end_date=self.school.today + datetime.timedelta(days=30),
+            price='300000',
+        )
+        student = self.school.students[0]
+        student.group = other
+        student.save()
+
+        result = run_billing(self.month)
+        self.assertEqual(result['created'], 0)
+        invoice = Invoice.objects.get(student=student, month=self.month)
+        self.assertEqual((invoice.group_id, invoice.amount), (other.id, Decimal('300000')))
+
+        rows = {row['id']: row for row in debtors(month=self.month)}
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[student.id]['debt'], Decimal('300000'))
+
+    def test_finished_groups_are_not_billed(self):
+        Group.objects.filter(pk=self.school.group.pk).update(end_date=self.school.today - datetime.timedelta(days=1))
+        self.assertEqual(run_billing(self.month)['students'], 0)
+
+
+@fast_hashing
+class DebtorsTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=3)
+        run_billing(self.school.month)
+
+    def pay(self, student, price):
+        return Payment.objects.create(
+            student=student, group=self.school.group, month=self.school.month,
+            payment_type=self.school.payment_type, price=price,
+        )
+
+    def test_debt_is_invoice_minus_payments(self):
+        first, second, third = self.school.students
+        self.pay(first, '500000')
+        self.pay(second, '100000')
+        self.pay(second, '100000')
+        rows = list(debtors(month=self.school.month))
+        self.assertEqual([row['id'] for row in rows], [third.id, second.id])
+        self.assertEqual(rows[1]['paid'], Decimal('200000'))
+        self.assertEqual(rows[1]['debt'], Decimal('300000'))
+
+    def test_endpoint_filters_by_group(self):
+        response = client_for(self.school.admin).get(
+            '/billing/debtors/', {'month': self.school.month.id, 'group': self.school.group.id + 1},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+
+class GroupPriceMigrationTests(MigrationTestCase):
+    migrate_from = '0015_grouphomework_unique_topic'
+    migrate_to = '0016_group_price_invoice'
+
+    def setUpBeforeMigration(self, apps):
+        Course = apps.get_model('app_config', 'Course')
+        Group = apps.get_model('app_config', 'Group')
+        course = Course.objects.create(title='Python')
+        start, end = datetime.date(2026, 9, 1), datetime.date(2026, 12, 1)
+        self.ids = {
+            price: Group.objects.create(
+                title=price, course=course, start_date=start, end_date=end, price=price,
+                descriptions='Izoh' if price == '-5' else None,
+            ).id
+            for price in ["500 000", "500,000 so'm", "1.2e6", "narxi yo'q", "-5"]
+        }
+
+    def test_prices_are_normalized(self):
+        Group = self.apps.get_model('app_config', 'Group')
+        prices = dict(Group.objects.values_list('title', 'price'))
+        self.assertEqual(prices["500 000"], Decimal('500000'))
+        self.assertEqual(prices["500,000 so'm"], Decimal('500000'))
+        self.assertEqual(prices["1.2e6"], Decimal('1200000'))
+        self.assertIsNone(prices["narxi yo'q"])
+        self.assertIsNone(prices["-5"])
+        notes = dict(Group.objects.values_list('title', 'descriptions'))
+        self.assertEqual(notes["narxi yo'q"], "Eski narx: narxi yo'q")
+        self.assertEqual(notes["-5"], "Izoh | Eski narx: -5")
+        self.assertIsNone(notes["500 000"])
+
+
+class InvoiceUniqueMonthMigrationTests(MigrationTestCase):
+    migrate_from = '0019_student_stats_state'
+    migrate_to = '0020_invoice_unique_student_month'
+
+    def setUpBeforeMigration(self, apps):
+        Course = apps.get_model('app_config', 'Course')
+        Group = apps.get_model('app_config', 'Group')
+        Invoice = apps.get_model('app_config', 'Invoice')
+        Month = apps.get_model('app_config', 'Month')
+        Student = apps.get_model('app_config', 'Student')
+        User = apps.get_model('app_config', 'User')
+        course = Course.objects.create(title='Python')
+        start, end = datetime.date(2026, 9, 1), datetime.date(2026, 12, 1)
+        old = Group.objects.create(title='Old', course=course, start_date=start, end_date=end, price='500000')
+        self.new = Group.objects.create(title='New', course=course, start_date=start, end_date=end, price='300000')
+        self.month = Month.objects.create(title='Oktyabr')
+        self.moved = Student.objects.create(user=User.objects.create(phone='998910000001'), group_id=self.new.id)
+        self.stayed = Student.objects.create(user=User.objects.create(phone='998910000002'), group_id=old.id)
+        Invoice.objects.create(student_id=self.moved.id, group_id=old.id, month_id=self.month.id, amount='500000')
+        Invoice.objects.create(student_id=self.moved.id, group_id=self.new.id, month_id=self.month.id, amount='300000')
+        Invoice.objects.create(student_id=self.stayed.id, group_id=old.id, month_id=self.month.id, amount='500000')
+
+    def test_latest_invoice_is_kept(self):
+        Invoice = self.apps.get_model('app_config', 'Invoice')
+        self.assertEqual(Invoice.objects.count(), 2)
+        invoice = Invoice.objects.get(student_id=self.moved.id, month_id=self.month.id)
+        self.assertEqual((invoice.group_id, invoice.amount), (self.new.id, Decimal('300000')))
@@ -0,0 +1,140 @@
+import datetime
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from app_config.blacklist import BlacklistFilter, BloomFilter, blacklist_filter, prune_expired_tokens
+from app_config.tokens import RoleRefreshToken
+
+from .utils import fast_hashing, make_user
+
+
+class BloomFilterTests(TestCase):
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        values = [f"jti-{i}" for i in range(1000)]
+        for value in values:
+            bloom.add(value)
+        self.assertTrue(all(value in bloom for value in values))
+
+    def test_false_positive_rate_stays_near_target(self):
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"in-{i}")
+        false_positives = sum(f"out-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives / 10000, 0.03)
+        self.assertLess(bloom.estimated_error_rate(), 0.02)
+
+
+@fast_hashing
+class BlacklistFilterTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('998901112233')
+        self.filter = BlacklistFilter(capacity=100, error_rate=0.01, sync_interval=60)
+
+    def blacklisted_token(self):
+        token = RoleRefreshToken.for_user(self.user)
+        token.blacklist()
+        return token
+
+    def test_blacklisted_jti_is_found(self):
+        token = self.blacklisted_token()
+        self.assertTrue(self.filter.is_blacklisted(token['jti']))
+
+    def test_unknown_jti_skips_database(self):
+        self.blacklisted_token()
+        self.filter.sync(force=True)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.filter.is_blacklisted('not-a-real-jti'))
+        self.assertEqual(self.filter.stats()['checks'], 1)
+
+    def test_incremental_sync_picks_up_new_rows(self):
+        self.filter.sync(force=True)
+        token = self.blacklisted_token()
+        self.filter.sync(force=True)
+        self.assertEqual(self.filter.stats()['entries'], 1)
+        self.assertTrue(self.filter.is_blacklisted(token['jti']))
+
+    def test_late_committed_lower_id_is_picked_up(self):
+        expires = timezone.now() + datetime.timedelta(days=1)
+        tokens = [
+            OutstandingToken.objects.create(user=self.user, jti=f"late-{i}", token='x', expires_at=expires)
+            for i in range(3)
+        ]
+        BlacklistedToken.objects.create(id=10, token=tokens[0])
+        BlacklistedToken.objects.create(id=30, token=tokens[2])
+        self.filter.sync(force=True)
+        # id=20 ajratilgan tranzaksiya id=30 dan keyin commit bo'ldi
+        BlacklistedToken.objects.create(id=20, token=tokens[1])
+        self.filter.sync(force=True)
+        self.assertTrue(self.filter.is_blacklisted('late-1'))
+        self.assertEqual(self.filter.stats()['entries'], 3)
+
+    def test_overlap_window_expires(self):
+        stale = BlacklistFilter(capacity=100, error_rate=0.01, sync_interval=60, sync_overlap=0)
+        self.blacklisted_token()
+        stale.sync(force=True)
+        with mock.patch('app_config.blacklist.time.monotonic', return_value=time.monotonic() + 1):
+            stale.sync(force=True)
+        self.assertEqual(stale._windows[0][1], stale._last_id)
+
+    def test_full_filter_is_rebuilt_larger(self):
+        small = BlacklistFilter(capacity=1, error_rate=0.01, sync_interval=0)
+        first = self.blacklisted_token()
+        small.sync(force=True)
+        second = self.blacklisted_token()
+        small.sync(force=True)
+        self.assertEqual(small.capacity, 2)
+        self.assertTrue(small.is_blacklisted(first['jti']))
+        self.assertTrue(small.is_blacklisted(second['jti']))
+
+    def test_refresh_token_check_uses_filter(self):
+        blacklist_filter.reset()
+        token = self.blacklisted_token()
+        with self.assertRaises(TokenError):
+            RoleRefreshToken(str(token))
+
+    def test_blacklisted_refresh_is_rejected_over_http(self):
+        blacklist_filter.reset()
+        refresh = str(RoleRefreshToken.for_user(self.user))
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(client.post('/api/token/blacklist/', {'refresh': refresh}).status_code, 200)
+        response = client.post('/auth/token/refresh/', {'refresh': refresh})
+        self.assertEqual(response.status_code, 401)
+
+
+@fast_hashing
+class PruneExpiredTokensTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user('998901112233')
+        past = timezone.now() - datetime.timedelta(days=2)
+        self.expired = [
+            OutstandingToken.objects.create(
+                user=self.user, jti=f"old-{i}", token='x', created_at=past, expires_at=past,
+            )
+            for i in range(5)
+        ]
+        BlacklistedToken.objects.create(token=self.expired[0])
+        self.live = RoleRefreshToken.for_user(self.user)
+
+    def test_expired_rows_are_deleted_in_batches(self):
+        deleted = prune_expired_tokens(batch_size=2)
+        self.assertEqual(deleted, {"outstanding": 5, "blacklisted": 1})
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [self.live['jti']])
+
+    def test_command_reports_table_sizes(self):
+        out = StringIO()
+        call_command('prune_tokens', stdout=out)
+        self.assertIn("outstanding=5, blacklisted=1", out.getvalue())
+        self.assertIn("outstanding=1", out.getvalue())
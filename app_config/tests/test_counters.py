@@ -0,0 +1,81 @@
+import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from app_config.counters import apply_counter_deltas, attendance_summary, rebuild_attendance_counters
+from app_config.models import Attendance, AttendanceCounter
+
+from .utils import client_for, fast_hashing, make_school
+
+
+def counter_rows():
+    return sorted(AttendanceCounter.objects.exclude(count=0).values_list('student_id', 'group_id', 'status_id', 'month', 'count'))
+
+
+@fast_hashing
+class AttendanceCounterTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.client = client_for(self.school.admin)
+        self.student = self.school.students[0]
+
+    def create(self, days_ago=0, status=None):
+        response = self.client.post('/attendances/', {
+            'level': self.school.level.id,
+            'student': self.student.id,
+            'status': (status or self.school.present).id,
+            'group': self.school.group.id,
+            'date': self.school.today - datetime.timedelta(days=days_ago),
+        })
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def assertMatchesRebuild(self):
+        live = counter_rows()
+        rebuild_attendance_counters()
+        self.assertEqual(live, counter_rows())
+
+    def test_viewset_writes_keep_counters_in_sync(self):
+        first = self.create(0)
+        self.create(1)
+        self.create(40, status=self.school.absent)
+        self.assertMatchesRebuild()
+
+        self.client.patch(f'/attendances/{first}/', {'status': self.school.absent.id})
+        self.assertMatchesRebuild()
+
+        self.client.delete(f'/attendances/{first}/')
+        self.assertMatchesRebuild()
+
+    def test_apply_counter_deltas_merges_keys(self):
+        month = self.school.today.replace(day=1)
+        key = (self.student.id, self.school.group.id, self.school.present.id, month)
+        apply_counter_deltas({key: 2})
+        apply_counter_deltas({key: -1})
+        self.assertEqual(AttendanceCounter.objects.get().count, 1)
+        with self.assertNumQueries(0):
+            apply_counter_deltas({key: 0})
+
+    def test_summary_rate(self):
+        self.create(0)
+        self.create(1)
+        self.create(2, status=self.school.absent)
+        summary = attendance_summary(AttendanceCounter.objects.all())
+        self.assertEqual((summary['total'], summary['present'], summary['absent']), (3, 2, 1))
+        self.assertEqual(summary['rate'], 66.67)
+
+        response = self.client.get(f'/students/{self.student.id}/attendance/summary/')
+        self.assertEqual(response.json()['total'], 3)
+        response = self.client.get(f'/groups/{self.school.group.id}/attendance/summary/')
+        self.assertEqual(response.json()['students'][0]['student_id'], self.student.id)
+
+    def test_rebuild_command(self):
+        Attendance.objects.create(
+            level=self.school.level, student=self.student, status=self.school.present, group=self.school.group,
+        )
+        out = StringIO()
+        call_command('rebuild_attendance_counters', stdout=out)
+        self.assertEqual(AttendanceCounter.objects.get().count, 1)
@@ -0,0 +1,76 @@
+import csv
+import datetime
+import io
+import json
+
+from django.test import TestCase
+
+from app_config.archive import archive_attendance
+from app_config.models import Attendance, Group, Payment
+
+from .utils import client_for, fast_hashing, make_school, make_student
+
+
+def body(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@fast_hashing
+class ExportTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.client = client_for(self.school.admin)
+        self.other = Group.objects.create(title='G2', course=self.school.course, start_date=self.school.today, end_date=self.school.today)
+        make_student('998912000001', group=self.other)
+        for student in self.school.students:
+            Attendance.objects.create(
+                level=self.school.level, student=student, status=self.school.present, group=self.school.group,
+            )
+            Payment.objects.create(
+                student=student, group=self.school.group, month=self.school.month,
+                payment_type=self.school.payment_type, price='500000',
+            )
+
+    def test_ndjson_students(self):
+        response = self.client.get('/exports/students/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body(response).splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['phone'], self.school.students[0].user.phone)
+        self.assertEqual(rows[0]['course'], 'Python')
+
+    def test_csv_payments_with_header(self):
+        response = self.client.get('/exports/payments/', {'fmt': 'csv'})
+        self.assertIn('attachment; filename="payments.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(body(response).lstrip('\ufeff'))))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['month'], 'Oktyabr')
+        self.assertEqual(rows[0]['price'], '500000.00')
+
+    def test_filters(self):
+        response = self.client.get('/exports/students/', {'group': self.other.id})
+        self.assertEqual(len(body(response).splitlines()), 1)
+        response = self.client.get('/exports/attendance/', {'start_date': self.school.today.replace(year=self.school.today.year + 1)})
+        self.assertEqual(body(response), '')
+
+    def test_unknown_kind_and_permissions(self):
+        self.assertEqual(self.client.get('/exports/teachers/').status_code, 404)
+        self.assertEqual(client_for(self.school.students[0].user).get('/exports/students/').status_code, 403)
+
+    def test_attendance_includes_archive(self):
+        old = Attendance.objects.create(
+            level=self.school.level, student=self.school.students[0], status=self.school.present,
+            group=self.school.group, date=datetime.date(2020, 1, 10),
+        )
+        archive_attendance(datetime.date(2020, 2, 1))
+        self.assertFalse(Attendance.objects.filter(id=old.id).exists())
+
+        response = self.client.get('/exports/attendance/', {'fmt': 'csv'})
+        rows = list(csv.DictReader(io.StringIO(body(response).lstrip('\ufeff'))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[-1]['id'], str(old.id))
+        self.assertEqual(rows[-1]['full_name'], self.school.students[0].user.full_name)
+
+        response = self.client.get('/exports/attendance/', {'group': self.other.id})
+        self.assertEqual(body(response), '')
@@ -0,0 +1,100 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import check_password
+from django.test import TestCase
+
+from app_config.hashing import (
+    PasswordCheckPool, PasswordPoolOverloaded, averify_credentials, hash_passwords, verify_credentials,
+)
+
+from .utils import client_for, fast_hashing, make_user
+
+
+PHONE = '998901112233'
+
+
+class PasswordCheckPoolTests(TestCase):
+
+    def test_overflow_is_rejected_without_waiting(self):
+        pool = PasswordCheckPool(max_workers=1, max_queue=1, retry_after=7)
+        release = threading.Event()
+        futures = [pool.submit(release.wait) for _ in range(2)]
+        with self.assertRaises(PasswordPoolOverloaded) as ctx:
+            pool.submit(release.wait)
+        self.assertEqual(ctx.exception.wait, 7)
+        self.assertEqual(ctx.exception.status_code, 503)
+
+        release.set()
+        for future in futures:
+            future.result()
+        stats = pool.stats()
+        self.assertEqual((stats['completed'], stats['rejected'], stats['in_flight']), (2, 1, 0))
+
+    def test_slot_is_released_when_check_raises(self):
+        pool = PasswordCheckPool(max_workers=1, max_queue=0)
+
+        def fail():
+            raise RuntimeError
+
+        with self.assertRaises(RuntimeError):
+            pool.submit(fail).result()
+        self.assertEqual(pool.submit(lambda: 1).result(), 1)
+
+
+@fast_hashing
+class VerifyCredentialsTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user(PHONE, password='secret-1')
+
+    def test_valid_password_returns_user(self):
+        self.assertEqual(verify_credentials(PHONE, 'secret-1'), self.user)
+        self.assertIsNone(verify_credentials(PHONE, 'wrong'))
+
+    def test_unknown_phone_still_hashes(self):
+        with mock.patch('app_config.models.User.set_password') as set_password:
+            self.assertIsNone(verify_credentials('998900000099', 'secret-1'))
+        set_password.assert_called_once_with('secret-1')
+
+    def test_inactive_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(verify_credentials(PHONE, 'secret-1'))
+
+    def test_async_variant(self):
+        self.assertEqual(async_to_sync(averify_credentials)(PHONE, 'secret-1'), self.user)
+
+    def test_hash_passwords_in_parallel(self):
+        hashed = hash_passwords(['a', 'b', ''], workers=2)
+        self.assertTrue(check_password('a', hashed[0]))
+        self.assertTrue(check_password('b', hashed[1]))
+        self.assertFalse(check_password('', hashed[2]))
+
+
+@fast_hashing
+class LoginEndpointTests(TestCase):
+
+    def setUp(self):
+        self.user = make_user(PHONE, password='secret-1')
+
+    def test_login_returns_tokens(self):
+        response = self.client.post('/auth/login/', {'phone': PHONE, 'password': 'secret-1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+    def test_overloaded_pool_answers_503_with_retry_after(self):
+        with mock.patch('app_config.hashing.password_pool.submit', side_effect=PasswordPoolOverloaded(wait=3)):
+            response = self.client.post('/auth/login/', {'phone': PHONE, 'password': 'secret-1'})
+            async_response = self.client.post('/auth/login/async/', {'phone': PHONE, 'password': 'secret-1'}, content_type='application/json')
+        for resp in (response, async_response):
+            self.assertEqual(resp.status_code, 503)
+            self.assertEqual(resp['Retry-After'], '3')
+
+    def test_stats_are_admin_only(self):
+        self.assertEqual(client_for(self.user).get('/auth/stats/').status_code, 403)
+        admin = make_user('998900000000', is_admin=True, is_staff=True)
+        response = client_for(admin).get('/auth/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('rejected', response.json()['password_pool'])
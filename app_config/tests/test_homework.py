@@ -0,0 +1,140 @@
+import datetime
+
+from django.test import TestCase
+
+from app_config.homework import homework_inbox, pending_homework
+from app_config.models import Group, GroupHomeWork, HomeWork, Teacher, Topics
+
+from .utils import MigrationTestCase, client_for, fast_hashing, make_school, make_student, make_user
+
+
+@fast_hashing
+class HomeworkInboxTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.topic = Topics.objects.create(title='T1', course=self.school.course)
+        self.other_teacher = Teacher.objects.create(user=make_user('998900000002', is_teacher=True))
+        self.other_group = Group.objects.create(
+            title='G2', course=self.school.course, start_date=self.school.group.start_date, end_date=self.school.group.end_date,
+        )
+        self.other_group.teacher.add(self.other_teacher)
+
+        mine = GroupHomeWork.objects.create(group=self.school.group, topic=self.topic)
+        theirs = GroupHomeWork.objects.create(group=self.other_group, topic=self.topic)
+        outsider = make_student('998912000001', group=self.other_group)
+        self.pending = [
+            HomeWork.objects.create(groupHomeWork=mine, student=student, link=f'https://example.com/{student.id}')
+            for student in self.school.students
+        ]
+        HomeWork.objects.create(groupHomeWork=mine, student=self.school.students[0], link='https://example.com/ok', is_active=True)
+        HomeWork.objects.create(groupHomeWork=theirs, student=outsider, link='https://example.com/theirs')
+
+    def test_teacher_sees_pending_work_in_own_groups(self):
+        response = client_for(self.school.teacher.user).get('/homework-submissions/inbox/')
+        payload = response.json()
+        self.assertEqual(sorted(row['id'] for row in payload['results']), sorted(hw.id for hw in self.pending))
+        self.assertEqual(payload['groups'], [{"group_id": self.school.group.id, "group": 'G1', "pending": 2}])
+
+    def test_admin_sees_all_or_filters_by_teacher(self):
+        client = client_for(self.school.admin)
+        self.assertEqual(len(client.get('/homework-submissions/inbox/').json()['results']), 3)
+        response = client.get('/homework-submissions/inbox/', {'teacher': self.other_teacher.id})
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_students_are_forbidden(self):
+        response = client_for(self.school.students[0].user).get('/homework-submissions/inbox/')
+        self.assertEqual(response.status_code, 403)
+
+    def test_pages_with_two_queries(self):
+        queryset = pending_homework(teacher_user_id=self.school.teacher.user_id)
+        with self.assertNumQueries(2):
+            first = homework_inbox(queryset, limit=1)
+        second = homework_inbox(queryset, cursor=first['next'], limit=1)
+        self.assertIsNone(second['next'])
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(ids, sorted((hw.id for hw in self.pending), reverse=True))
+
+
+@fast_hashing
+class AssignHomeworkTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=0)
+        self.client = client_for(self.school.admin)
+        self.topics = [Topics.objects.create(title=f'T{i}', course=self.school.course) for i in range(2)]
+        self.second = Group.objects.create(
+            title='G2', course=self.school.course, start_date=self.school.group.start_date, end_date=self.school.group.end_date,
+        )
+        self.finished = Group.objects.create(
+            title='Old', course=self.school.course,
+            start_date=datetime.date(2020, 1, 1), end_date=datetime.date(2020, 6, 1),
+        )
+
+    def post(self, payload):
+        return self.client.post('/homework-reviews/bulk/', payload, format='json')
+
+    def test_assign_to_listed_groups_is_idempotent(self):
+        payload = {'topics': [topic.id for topic in self.topics], 'groups': [self.school.group.id, self.second.id]}
+        self.assertEqual(self.post(payload).json(), {"created": 4, "existing": 0, "skipped": 0})
+        self.assertEqual(self.post(payload).json(), {"created": 0, "existing": 4, "skipped": 0})
+        self.assertEqual(GroupHomeWork.objects.count(), 4)
+
+    def test_course_assigns_only_active_groups(self):
+        response = self.post({'topics': [self.topics[0].id], 'course': self.school.course.id})
+        self.assertEqual(response.json()['created'], 2)
+        self.assertFalse(GroupHomeWork.objects.filter(group=self.finished).exists())
+
+    def test_mismatched_courses_are_skipped(self):
+        from app_config.models import Course
+
+        other = Topics.objects.create(title='JS', course=Course.objects.create(title='JS'))
+        response = self.post({'topics': [self.topics[0].id, other.id], 'groups': [self.school.group.id]})
+        self.assertEqual(response.json(), {"created": 1, "existing": 0, "skipped": 1})
+
+    def test_unknown_ids_are_400(self):
+        response = self.post({'topics': [999999], 'groups': [999999]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'topics', 'groups'})
+        self.assertEqual(self.post({'topics': [self.topics[0].id]}).status_code, 400)
+
+
+class GroupHomeworkUniqueMigrationTests(MigrationTestCase):
+    migrate_from = '0014_homework_pending_index'
+    migrate_to = '0015_grouphomework_unique_topic'
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model('app_config', 'User')
+        Student = apps.get_model('app_config', 'Student')
+        Course = apps.get_model('app_config', 'Course')
+        Group = apps.get_model('app_config', 'Group')
+        Topics = apps.get_model('app_config', 'Topics')
+        GroupHomeWork = apps.get_model('app_config', 'GroupHomeWork')
+        HomeWork = apps.get_model('app_config', 'HomeWork')
+
+        course = Course.objects.create(title='Python')
+        group = Group.objects.create(title='G1', course=course, start_date='2026-01-01', end_date='2026-12-31')
+        topic = Topics.objects.create(title='T1', course=course)
+        student = Student.objects.create(user=User.objects.create(phone='998901112233', password='x'), group=group)
+
+        copies = [
+            GroupHomeWork.objects.create(group=group, topic=topic, is_active=active, descriptions=note)
+            for active, note in [(False, 'Birinchi'), (True, None), (False, 'Ikkinchi')]
+        ]
+        self.keep_id = copies[0].id
+        self.homework_ids = [
+            HomeWork.objects.create(groupHomeWork=copy, student=student, link='https://example.com').id
+            for copy in copies
+        ]
+
+    def test_duplicates_merge_and_submissions_move(self):
+        GroupHomeWork = self.apps.get_model('app_config', 'GroupHomeWork')
+        HomeWork = self.apps.get_model('app_config', 'HomeWork')
+        self.assertEqual(
+            list(GroupHomeWork.objects.values_list('id', 'is_active', 'descriptions')),
+            [(self.keep_id, True, 'Birinchi | Ikkinchi')],
+        )
+        self.assertEqual(
+            sorted(HomeWork.objects.filter(groupHomeWork_id=self.keep_id).values_list('id', flat=True)),
+            self.homework_ids,
+        )
@@ -0,0 +1,138 @@
+import io
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DataError
+from django.test import TestCase
+
+from app_config.importers import ImportFormatError, StudentImporter, iter_rows, parse_ids
+from app_config.models import Student, User
+
+from .utils import client_for, fast_hashing, make_school, make_user
+
+
+def csv_file(*lines):
+    header = 'phone,full_name,password,group,course,descriptions'
+    return io.BytesIO('\n'.join((header,) + lines).encode())
+
+
+class ParseIdsTests(TestCase):
+
+    def test_integer_ids(self):
+        self.assertEqual(parse_ids('1, 2;3'), [1, 2, 3])
+        self.assertEqual(parse_ids('4.0'), [4])  # XLSX raqamli katak
+        self.assertEqual(parse_ids(''), [])
+
+    def test_fractional_or_text_ids_are_rejected(self):
+        for value in ('1.9', 'abc', 'nan', 'inf'):
+            with self.assertRaises(ValueError):
+                parse_ids(value)
+
+
+@fast_hashing
+class StudentImporterTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=0)
+        self.group = self.school.group
+        self.course = self.school.course
+
+    def run_import(self, fileobj, **kwargs):
+        return StudentImporter(workers=2, **kwargs).run(iter_rows(fileobj, 'students.csv'))
+
+    def test_valid_rows_are_created_in_chunks(self):
+        report = self.run_import(csv_file(
+            f'998911000001,Ali,p1,{self.group.id},{self.course.id},',
+            f'998911000002,Vali,p2,,"{self.course.id}",izoh',
+            '998911000003,Gani,p3,,,',
+        ), chunk_size=2)
+        self.assertEqual(report, {"created": 3, "failed": 0, "errors": []})
+        student = Student.objects.get(user__phone='998911000001')
+        self.assertEqual(student.group, self.group)
+        self.assertEqual(list(student.course.all()), [self.course])
+        self.assertTrue(student.user.check_password('p1'))
+        self.assertTrue(student.user.is_student)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        make_user('998911000009')
+        long_name = 'x' * 51
+        report = self.run_import(csv_file(
+            '998911000009,Dup,p,,,',                     # mavjud telefon
+            '998911000001,Ali,p,,,',
+            '998911000001,Ali again,p,,,',               # faylda takror
+            'abc,Bad,p,,,',                              # noto'g'ri telefon
+            '998911000002,Vali,p,999,,',                 # guruh yo'q
+            f'998911000003,{long_name},p,,,',            # full_name > 50
+            f'998911000004,Ok,p,,,{"d" * 501}',          # descriptions > 500
+            '998911000005,Ok,p,1.9,,',                   # kasr ID
+        ))
+        self.assertEqual(report['created'], 1)
+        errors = {error['row']: error['errors'] for error in report['errors']}
+        self.assertIn('phone', errors[2])
+        self.assertIn('phone', errors[4])
+        self.assertIn('phone', errors[5])
+        self.assertIn('group', errors[6])
+        self.assertIn('full_name', errors[7])
+        self.assertIn('descriptions', errors[8])
+        self.assertIn('group', errors[9])
+
+    def test_database_error_fails_only_the_chunk(self):
+        with mock.patch.object(StudentImporter, 'write', side_effect=DataError('value too long')):
+            report = self.run_import(csv_file('998911000001,Ali,p,,,'))
+        self.assertEqual(report['failed'], 1)
+        self.assertFalse(User.objects.filter(phone='998911000001').exists())
+
+    def test_xlsx_rows(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['phone', 'full_name', 'password', 'group', 'course', 'descriptions'])
+        sheet.append(['998911000001', 'Ali', 'p', self.group.id, float(self.course.id), None])
+        sheet.append([None] * 6)
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        report = StudentImporter().run(iter_rows(buffer, 'students.xlsx'))
+        self.assertEqual(report['created'], 1)
+        self.assertEqual(Student.objects.get().group, self.group)
+
+    def test_unknown_extension(self):
+        with self.assertRaises(ImportFormatError):
+            iter_rows(io.BytesIO(b''), 'students.txt')
+
+    def test_corrupt_files(self):
+        with self.assertRaises(ImportFormatError):
+            list(iter_rows(io.BytesIO(b'not a zip archive'), 'students.xlsx'))
+        with self.assertRaises(ImportFormatError):
+            list(iter_rows(io.BytesIO('phone,full_name\n998911000001,Ali\xeb\n'.encode('latin-1')), 'students.csv'))
+
+    def test_api_corrupt_upload(self):
+        for name, content in (('students.xlsx', b'PK\x03\x04broken'), ('students.csv', b'phone,full_name\n\xff\xfe,\xfa\n')):
+            upload = SimpleUploadedFile(name, content)
+            response = client_for(self.school.admin).post('/students/import/', {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, 400, name)
+
+    def test_api_endpoint(self):
+        upload = SimpleUploadedFile('students.csv', csv_file('998911000001,Ali,p,,,').read())
+        response = client_for(self.school.admin).post('/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 1)
+
+        upload = SimpleUploadedFile('students.txt', b'x')
+        response = client_for(self.school.admin).post('/students/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_management_command(self):
+        with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as handle:
+            handle.write(csv_file('998911000001,Ali,p,,,', 'bad,,p,,,').read())
+        self.addCleanup(os.unlink, handle.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_students', handle.name, stdout=out, stderr=err)
+        self.assertIn("yaratildi=1, xato=1", out.getvalue())
+        self.assertIn("3-qator", err.getvalue())
@@ -0,0 +1,153 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app_config.cache import shared_cache_configured
+from app_config.models import OTPCode
+from app_config.otp import CacheOTPStore, DatabaseOTPStore, get_otp_store
+
+from .utils import MigrationTestCase, fast_hashing, make_user
+
+
+PHONE = '998901112233'
+
+
+class OTPStoreContract:
+    """
+    Ikkala backend uchun umumiy xulq testlari.
+    """
+    store_class = None
+
+    def setUp(self):
+        cache.clear()
+        self.store = self.store_class(ttl=300, max_attempts=3)
+
+    def test_issued_code_verifies(self):
+        code = self.store.issue(PHONE)
+        self.assertTrue(self.store.verify(PHONE, code))
+        self.assertTrue(self.store.verify(PHONE, code))
+
+    def test_wrong_code_is_rejected(self):
+        self.store.issue(PHONE)
+        self.assertFalse(self.store.verify(PHONE, 'xxxxxx'))
+
+    def test_consume_discards_code(self):
+        code = self.store.issue(PHONE)
+        self.assertTrue(self.store.verify(PHONE, code, consume=True))
+        self.assertFalse(self.store.verify(PHONE, code))
+
+    def test_attempts_are_limited(self):
+        code = self.store.issue(PHONE)
+        for _ in range(3):
+            self.store.verify(PHONE, 'xxxxxx')
+        self.assertFalse(self.store.verify(PHONE, code))
+
+    def test_reissue_resets_attempts(self):
+        self.store.issue(PHONE)
+        for _ in range(3):
+            self.store.verify(PHONE, 'xxxxxx')
+        code = self.store.issue(PHONE)
+        self.assertTrue(self.store.verify(PHONE, code))
+
+    def test_code_is_not_stored_in_plain_text(self):
+        store = self.store_class(static_code='123456')
+        store.issue(PHONE)
+        self.assertTrue(store.verify(PHONE, '123456'))
+        self.assertNotEqual(store.make_hash(PHONE, '123456'), '123456')
+
+
+class CacheOTPStoreTests(OTPStoreContract, TestCase):
+    store_class = CacheOTPStore
+
+    def test_counter_expiring_before_incr_is_a_failed_check(self):
+        code = self.store.issue(PHONE)
+        with mock.patch('app_config.otp.cache.incr', side_effect=ValueError):
+            self.assertFalse(self.store.verify(PHONE, code))
+        self.assertIsNone(cache.get(f"otp:{PHONE}"))
+
+
+class DatabaseOTPStoreTests(OTPStoreContract, TestCase):
+    store_class = DatabaseOTPStore
+
+    def test_expired_code_is_rejected(self):
+        code = self.store.issue(PHONE)
+        OTPCode.objects.update(expires_at=timezone.now() - datetime.timedelta(seconds=1))
+        self.assertFalse(self.store.verify(PHONE, code))
+
+    def test_code_survives_cache_clear(self):
+        # boshqa worker yoki qayta ishga tushirish
+        code = self.store.issue(PHONE)
+        cache.clear()
+        self.assertTrue(self.store.verify(PHONE, code))
+
+
+class OTPStoreSelectionTests(TestCase):
+
+    def tearDown(self):
+        get_otp_store.cache_clear()
+
+    def test_database_store_without_shared_cache(self):
+        get_otp_store.cache_clear()
+        self.assertFalse(shared_cache_configured())
+        self.assertIsInstance(get_otp_store(), DatabaseOTPStore)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}})
+    def test_cache_store_with_shared_cache(self):
+        get_otp_store.cache_clear()
+        self.assertIsInstance(get_otp_store(), CacheOTPStore)
+
+    @override_settings(OTP_STORE={'BACKEND': 'app_config.otp.CacheOTPStore', 'TTL': 60})
+    def test_explicit_backend_wins(self):
+        get_otp_store.cache_clear()
+        store = get_otp_store()
+        self.assertIsInstance(store, CacheOTPStore)
+        self.assertEqual(store.ttl, 60)
+
+
+@fast_hashing
+class PasswordResetFlowTests(TestCase):
+
+    def setUp(self):
+        get_otp_store.cache_clear()
+        self.user = make_user(PHONE)
+        self.client = APIClient()
+
+    def test_reset_verify_and_set_new_password(self):
+        response = self.client.post('/auth/reset-password/', {'phone': PHONE})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(OTPCode.objects.filter(phone=PHONE).exists())
+
+        response = self.client.post('/auth/verify-otp/', {'phone': PHONE, 'otp': '123456'})
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post('/auth/set-new-password/', {'phone': PHONE, 'otp': '123456', 'new_password': 'new-pass-1'})
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-pass-1'))
+
+        response = self.client.post('/auth/set-new-password/', {'phone': PHONE, 'otp': '123456', 'new_password': 'other'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_wrong_otp_is_rejected(self):
+        self.client.post('/auth/reset-password/', {'phone': PHONE})
+        response = self.client.post('/auth/verify-otp/', {'phone': PHONE, 'otp': '000000'})
+        self.assertEqual(response.status_code, 400)
+
+
+class OTPStoreMigrationTests(MigrationTestCase):
+    migrate_from = '0004_user_role_version'
+    migrate_to = '0005_otp_store'
+
+    def setUpBeforeMigration(self, apps):
+        User = apps.get_model('app_config', 'User')
+        User.objects.create(phone=PHONE, password='x', otp_code='654321')
+        User.objects.create(phone='998909998877', password='x')
+
+    def test_pending_codes_are_carried_over(self):
+        OTPCode = self.apps.get_model('app_config', 'OTPCode')
+        self.assertEqual(list(OTPCode.objects.values_list('phone', flat=True)), [PHONE])
+        self.assertTrue(DatabaseOTPStore().verify(PHONE, '654321'))
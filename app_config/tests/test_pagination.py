@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import NotFound
+
+from app_config.models import Parent
+from app_config.pagination import KeysetCursorPagination, cached_count, keyset_page
+
+from .utils import client_for, fast_hashing, make_user
+
+
+def make_parents(count):
+    return [
+        Parent.objects.create(name=f"P{i}", surname='S', phone='1', address='A')
+        for i in range(count)
+    ]
+
+
+@fast_hashing
+class CursorPaginationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.parents = make_parents(7)
+        self.client = client_for(make_user('998900000000', is_admin=True, is_staff=True))
+
+    def walk(self, url):
+        ids = []
+        while url:
+            payload = self.client.get(url).json()
+            ids += [row['id'] for row in payload['results']]
+            url = payload['next']
+        return ids
+
+    def test_page_mode_keeps_bare_list(self):
+        response = self.client.get('/parent/')
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 7)
+
+    @mock.patch.object(KeysetCursorPagination, 'page_size', 3)
+    def test_cursor_pages_cover_every_row_once(self):
+        ids = self.walk('/parent/?pagination=cursor')
+        self.assertEqual(ids, sorted((p.id for p in self.parents), reverse=True))
+
+    @mock.patch.object(KeysetCursorPagination, 'page_size', 3)
+    def test_cursor_mode_skips_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/parent/?pagination=cursor')
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql']])
+
+    def test_with_count_is_cached(self):
+        response = self.client.get('/parent/?pagination=cursor&with_count=true')
+        self.assertEqual(response.json()['count'], 7)
+        make_parents(1)
+        response = self.client.get('/parent/?pagination=cursor&with_count=true')
+        self.assertEqual(response.json()['count'], 7)  # COUNT_CACHE_TTL davomida taxminiy
+
+    def test_cached_count_of_empty_queryset(self):
+        self.assertEqual(cached_count(Parent.objects.filter(pk__in=[])), 0)
+
+
+class KeysetPageTests(TestCase):
+
+    def setUp(self):
+        self.parents = make_parents(5)
+
+    def test_pages_follow_cursor(self):
+        queryset = Parent.objects.values('id', 'created_at')
+        first, cursor = keyset_page(queryset, 'created_at', limit=3)
+        second, last = keyset_page(queryset, 'created_at', cursor, limit=3)
+        ids = [row['id'] for row in first + second]
+        self.assertEqual(ids, sorted((p.id for p in self.parents), reverse=True))
+        self.assertIsNone(last)
+
+    def test_union_of_querysets(self):
+        low = Parent.objects.filter(id__lte=self.parents[1].id).values('id', 'created_at')
+        high = Parent.objects.filter(id__gt=self.parents[1].id).values('id', 'created_at')
+        rows, cursor = keyset_page([low, high], 'created_at', limit=4)
+        rest, _ = keyset_page([low, high], 'created_at', cursor, limit=4)
+        self.assertEqual(len(rows) + len(rest), 5)
+        self.assertEqual(len({row['id'] for row in rows + rest}), 5)
+
+    def test_invalid_cursor_is_404(self):
+        with self.assertRaises(NotFound):
+            keyset_page(Parent.objects.values('id', 'created_at'), 'created_at', 'not-a-cursor')
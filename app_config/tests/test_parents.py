@@ -0,0 +1,83 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from app_config.billing import run_billing
+from app_config.models import AttendanceCounter, Parent, Payment
+from app_config.parents import parent_portal
+
+from .utils import client_for, fast_hashing, make_school, make_student
+
+
+@fast_hashing
+class ParentListTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=0)
+        self.client = client_for(self.school.admin)
+
+    def add_parents(self, count, start=0):
+        for i in range(start, start + count):
+            parent = Parent.objects.create(name=f'Ota {i}', surname='Test', phone=f'99893000{i:04d}', address='Toshkent')
+            parent.students.add(
+                make_student(f'99892000{i:04d}', group=self.school.group),
+                make_student(f'99892100{i:04d}', group=self.school.group),
+            )
+
+    def list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/parent/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_parents(self):
+        self.add_parents(2)
+        _, small = self.list_queries()
+        self.add_parents(6, start=2)
+        response, large = self.list_queries()
+        self.assertEqual(small, large)
+        self.assertEqual(len(response.json()), 8)
+        self.assertEqual(response.json()[0]['students'][0]['course'], [self.school.course.id])
+
+
+@fast_hashing
+class ParentPortalTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.first, self.second = self.school.students
+        self.parent = Parent.objects.create(name='Ota', surname='Test', phone='998930000001', address='Toshkent')
+        self.parent.students.add(self.first, self.second)
+        run_billing(self.school.month)
+        Payment.objects.create(
+            student=self.first, group=self.school.group, month=self.school.month,
+            payment_type=self.school.payment_type, price='200000',
+        )
+        old, latest = datetime.date(2026, 9, 1), datetime.date(2026, 10, 1)
+        for month, status, count in [(old, self.school.absent, 10), (latest, self.school.present, 3), (latest, self.school.absent, 1)]:
+            AttendanceCounter.objects.create(
+                student=self.first, group=self.school.group, status=status, month=month, count=count,
+            )
+
+    def test_children_balance_and_latest_month_attendance(self):
+        portal = parent_portal(self.parent)
+        first, second = portal['children']
+        self.assertEqual(first['student_id'], self.first.id)
+        self.assertEqual(first['group'], {"id": self.school.group.id, "title": 'G1'})
+        self.assertEqual(first['attendance']['month'], datetime.date(2026, 10, 1))
+        self.assertEqual((first['attendance']['total'], first['attendance']['present'], first['attendance']['rate']), (4, 3, 75.0))
+        self.assertEqual((first['invoiced'], first['paid'], first['balance']), (Decimal('500000'), Decimal('200000'), Decimal('300000')))
+        self.assertEqual(second['attendance'], {"month": None, "total": 0, "present": 0, "rate": None})
+        self.assertEqual(portal['total_balance'], Decimal('800000'))
+
+    def test_portal_uses_two_queries(self):
+        with self.assertNumQueries(2):
+            parent_portal(self.parent)
+
+    def test_endpoint(self):
+        response = client_for(self.school.admin).get(f'/parent/{self.parent.id}/portal/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['children']), 2)
@@ -0,0 +1,172 @@
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from app_config.billing import run_billing
+from app_config.models import Month, Payment, ReconciliationItem
+from app_config.reconciliation import reconcile_statement, resolve_item
+from app_config.revenue import revenue_report
+
+from .utils import MigrationTestCase, client_for, fast_hashing, make_school
+
+
+def statement(*lines):
+    return [(number, dict(line)) for number, line in enumerate(lines, start=2)]
+
+
+@fast_hashing
+class ReconcileStatementTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=3)
+        run_billing(self.school.month)
+        self.first, self.second, _ = self.school.students
+
+    def reconcile(self, rows, **kwargs):
+        return reconcile_statement(
+            rows, source='bank.csv', month=self.school.month, payment_type=self.school.payment_type, **kwargs,
+        )
+
+    def rows(self):
+        return statement(
+            {'phone': self.first.user.phone, 'name': self.first.user.full_name, 'amount': '500 000',
+             'date': '2026-10-01', 'reference': 'T-1'},
+            {'name': 'Nomalum Shaxs', 'amount': '100000', 'date': '2026-10-01', 'reference': 'T-2'},
+        )
+
+    def test_exact_match_is_paid(self):
+        report = self.reconcile(self.rows())
+        self.assertEqual((report['matched'], report['unmatched'], report['skipped']), (1, 1, 0))
+        payment = Payment.objects.get()
+        self.assertEqual((payment.student_id, payment.price), (self.first.id, Decimal('500000')))
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('500000'), "count": 1})
+
+    def test_reupload_skips_known_lines(self):
+        self.reconcile(self.rows())
+        report = self.reconcile(self.rows())
+        self.assertEqual((report['lines'], report['skipped'], report['skipped_rows']), (0, 2, [2, 3]))
+        self.assertEqual(Payment.objects.count(), 1)
+        self.assertEqual(ReconciliationItem.objects.count(), 2)
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('500000'), "count": 1})
+
+    def test_identical_lines_in_one_file_are_kept(self):
+        line = {'phone': self.second.user.phone, 'name': self.second.user.full_name, 'amount': '250000', 'date': '2026-10-02'}
+        report = self.reconcile(statement(line, line))
+        self.assertEqual(report['matched'], 2)
+        self.assertEqual(self.reconcile(statement(line, line, line))['skipped'], 2)
+        self.assertEqual(Payment.objects.filter(student=self.second).count(), 3)
+
+    def test_renamed_file_is_still_skipped(self):
+        self.reconcile(self.rows())
+        report = reconcile_statement(
+            self.rows(), source='bank (1).csv', month=self.school.month, payment_type=self.school.payment_type,
+        )
+        self.assertEqual((report['lines'], report['skipped']), (0, 2))
+        self.assertEqual(Payment.objects.count(), 1)
+
+    def test_same_lines_for_another_month_are_new(self):
+        self.reconcile(self.rows())
+        november = Month.objects.create(title='Noyabr')
+        report = reconcile_statement(
+            self.rows(), source='bank.csv', month=november, payment_type=self.school.payment_type,
+        )
+        self.assertEqual(report['skipped'], 0)
+        self.assertEqual(Payment.objects.filter(month=november).count(), 1)
+
+    def test_lines_without_date_or_reference_go_to_review(self):
+        line = {'phone': self.first.user.phone, 'name': self.first.user.full_name, 'amount': '500000'}
+        for _ in range(2):
+            report = self.reconcile(statement(line))
+            self.assertEqual((report['matched'], report['review'], report['skipped']), (0, 1, 0))
+            self.assertEqual(report['unverified_rows'], [2])
+        self.assertFalse(Payment.objects.exists())
+        self.assertEqual(
+            list(ReconciliationItem.objects.values_list('fingerprint', 'status')),
+            [(None, ReconciliationItem.STATUS_REVIEW)] * 2,
+        )
+
+    def test_dry_run_writes_nothing(self):
+        self.reconcile(self.rows()[:1])
+        report = self.reconcile(self.rows(), dry_run=True)
+        self.assertEqual((report['skipped'], len(report['items'])), (1, 1))
+        self.assertEqual(ReconciliationItem.objects.count(), 1)
+
+    def test_resolve_updates_revenue_once(self):
+        self.reconcile(self.rows())
+        item = ReconciliationItem.objects.get(status=ReconciliationItem.STATUS_UNMATCHED)
+        resolve_item(item.pk, self.second)
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('600000'), "count": 2})
+
+    def test_endpoint_reupload(self):
+        client = client_for(self.school.admin)
+        content = (
+            "phone,name,amount,date,reference\n"
+            f"{self.first.user.phone},{self.first.user.full_name},500000,2026-10-01,T-1\n"
+        ).encode()
+
+        def upload():
+            return client.post('/payments/reconcile/', {
+                'file': SimpleUploadedFile('bank.csv', content, content_type='text/csv'),
+                'month': self.school.month.id,
+                'payment_type': self.school.payment_type.id,
+            }, format='multipart')
+
+        self.assertEqual(upload().json()['matched'], 1)
+        response = upload()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()['matched'], response.json()['skipped']), (0, 1))
+        self.assertEqual(Payment.objects.count(), 1)
+
+
+class ReconciliationFingerprintMigrationTests(MigrationTestCase):
+    migrate_from = '0021_payment_protect_month_type'
+    migrate_to = '0022_reconciliationitem_fingerprint'
+
+    def setUpBeforeMigration(self, apps):
+        Month = apps.get_model('app_config', 'Month')
+        PaymentType = apps.get_model('app_config', 'PaymentType')
+        ReconciliationItem = apps.get_model('app_config', 'ReconciliationItem')
+        month = Month.objects.create(title='Oktyabr')
+        payment_type = PaymentType.objects.create(title='Naqd')
+        raw = {'Amount': '500000', 'Date': '2026-10-01', 'Reference': 'T-1'}
+        # bir fayl ikki marta yuklangan
+        for _ in range(2):
+            ReconciliationItem.objects.create(
+                source='bank.csv', row_number=2, raw=raw, amount='500000', month=month, payment_type=payment_type,
+            )
+
+    def test_fingerprints_are_unique(self):
+        ReconciliationItem = self.apps.get_model('app_config', 'ReconciliationItem')
+        fingerprints = set(ReconciliationItem.objects.values_list('fingerprint', flat=True))
+        self.assertEqual(len(fingerprints), 2)
+
+
+class ReconciliationFingerprintMonthMigrationTests(MigrationTestCase):
+    migrate_from = '0022_reconciliationitem_fingerprint'
+    migrate_to = '0023_reconciliation_fingerprint_month'
+
+    def setUpBeforeMigration(self, apps):
+        Month = apps.get_model('app_config', 'Month')
+        PaymentType = apps.get_model('app_config', 'PaymentType')
+        ReconciliationItem = apps.get_model('app_config', 'ReconciliationItem')
+        self.month = Month.objects.create(title='Oktyabr')
+        payment_type = PaymentType.objects.create(title='Naqd')
+        for number, raw in enumerate([
+            {'Amount': '500000', 'Date': '2026-10-01', 'Reference': 'T-1'},
+            {'Amount': '500000', 'Phone': '998901112233'},
+        ]):
+            ReconciliationItem.objects.create(
+                source='bank.csv', fingerprint=f'old-{number}', row_number=number + 2, raw=raw,
+                amount='500000', month=self.month, payment_type=payment_type,
+            )
+
+    def test_fingerprints_use_month_and_skip_unverifiable_lines(self):
+        from app_config.reconciliation import line_fingerprint
+
+        ReconciliationItem = self.apps.get_model('app_config', 'ReconciliationItem')
+        fingerprints = list(ReconciliationItem.objects.order_by('id').values_list('fingerprint', flat=True))
+        self.assertEqual(fingerprints, [
+            line_fingerprint(self.month.id, '2026-10-01', Decimal('500000.00'), 'T-1'),
+            None,
+        ])
@@ -0,0 +1,101 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+
+from app_config.models import Group, Month, Payment, PaymentType, RevenueRollup
+from app_config.revenue import rebuild_revenue_rollup, revenue_report
+
+from .utils import client_for, fast_hashing, make_school
+
+
+def rollup_rows():
+    return sorted(
+        (row.month_id, row.course_id, row.group_id, row.payment_type_id, row.amount, row.count)
+        for row in RevenueRollup.objects.filter(count__gt=0)
+    )
+
+
+@fast_hashing
+class RevenueRollupTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.card = PaymentType.objects.create(title='Karta')
+
+    def pay(self, price, student=None, **extra):
+        extra.setdefault('group', self.school.group)
+        extra.setdefault('month', self.school.month)
+        extra.setdefault('payment_type', self.school.payment_type)
+        return Payment.objects.create(student=student or self.school.students[0], price=price, **extra)
+
+    def assertMatchesRebuild(self):
+        incremental = rollup_rows()
+        rebuild_revenue_rollup()
+        self.assertEqual(incremental, rollup_rows())
+
+    def test_orm_create_update_delete(self):
+        first = self.pay('100000')
+        second = self.pay('250000', student=self.school.students[1])
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('350000'), "count": 2})
+
+        first.price = '150000'
+        first.payment_type = self.card
+        first.save()
+        second.delete()
+        self.assertEqual(revenue_report(['payment_type']), [{
+            'payment_type_id': self.card.id, 'payment_type__title': 'Karta',
+            'amount': Decimal('150000'), 'count': 1,
+        }])
+        self.assertMatchesRebuild()
+
+    def test_student_cascade_is_subtracted(self):
+        self.pay('100000')
+        self.pay('200000', student=self.school.students[1])
+        self.school.students[0].delete()
+        self.assertEqual(revenue_report([])[0]['amount'], Decimal('200000'))
+        self.assertMatchesRebuild()
+
+    def test_group_delete_moves_revenue_to_no_group(self):
+        group = Group.objects.create(
+            title='G2', course=self.school.course,
+            start_date=self.school.today, end_date=self.school.today + datetime.timedelta(days=30),
+        )
+        self.pay('100000', group=group)
+        group.delete()
+        self.assertEqual(revenue_report(['group']), [{
+            'group_id': None, 'group__title': None, 'amount': Decimal('100000'), 'count': 1,
+        }])
+        self.assertMatchesRebuild()
+
+    def test_month_and_type_cascades_are_subtracted(self):
+        november = Month.objects.create(title='Noyabr')
+        self.pay('100000')
+        self.pay('200000', month=november)
+        self.pay('300000', payment_type=self.card)
+        november.delete()
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('400000'), "count": 2})
+        self.card.delete()
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('100000'), "count": 1})
+        self.assertMatchesRebuild()
+
+    def test_endpoints(self):
+        client = client_for(self.school.admin)
+        response = client.post('/payments/create/payment/', {
+            'student': self.school.students[0].id, 'group': self.school.group.id,
+            'month': self.school.month.id, 'payment_type': self.school.payment_type.id, 'price': '100000',
+        })
+        self.assertEqual(response.status_code, 201)
+        payment_id = response.json()['id']
+        self.assertEqual(client.put(f'/payments/{payment_id}/update/payment/', {'price': '120000'}).status_code, 200)
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('120000'), "count": 1})
+
+        self.assertEqual(client.delete(f'/payments/{payment_id}/delete/payment/').status_code, 204)
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('0'), "count": 0})
+        self.assertMatchesRebuild()
+
+        self.pay('50000')
+        response = client.delete(f'/months/{self.school.month.id}/delete/month/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(revenue_report([])[0], {"amount": Decimal('0'), "count": 0})
+        self.assertMatchesRebuild()
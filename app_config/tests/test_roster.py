@@ -0,0 +1,59 @@
+from django.test import TestCase
+
+from app_config.models import Group, StudentStatDirty, Teacher
+from app_config.roster import RosterError, add_students, add_teachers, remove_students, remove_teachers
+
+from .utils import client_for, fast_hashing, make_school, make_student, make_user
+
+
+@fast_hashing
+class GroupRosterTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.group = self.school.group
+        self.target = Group.objects.create(
+            title='G2', course=self.school.course, start_date=self.group.start_date, end_date=self.group.end_date,
+        )
+        self.client = client_for(self.school.admin)
+
+    def test_add_students_moves_in_one_update(self):
+        ids = [student.id for student in self.school.students]
+        StudentStatDirty.objects.all().delete()
+        with self.assertNumQueries(6):  # savepoint, tekshiruv, UPDATE, guruh sanalari, statistika belgisi, release
+            moved = add_students(self.target, ids)
+        self.assertEqual(moved, 2)
+        self.assertEqual(set(self.target.students.values_list('id', flat=True)), set(ids))
+        self.assertEqual(set(StudentStatDirty.objects.values_list('group_id', flat=True)), {self.group.id, self.target.id})
+        self.assertEqual(add_students(self.target, ids), 0)
+
+    def test_unknown_ids_change_nothing(self):
+        with self.assertRaises(RosterError) as ctx:
+            add_students(self.target, [self.school.students[0].id, 999999])
+        self.assertEqual(ctx.exception.missing, [999999])
+        self.assertFalse(self.target.students.exists())
+
+    def test_remove_only_members(self):
+        outsider = make_student('998912000001', group=self.target)
+        with self.assertRaises(RosterError):
+            remove_students(self.group, [outsider.id])
+        self.assertEqual(remove_students(self.group, [self.school.students[0].id]), 1)
+        self.assertEqual(self.group.students.count(), 1)
+
+    def test_teachers(self):
+        second = Teacher.objects.create(user=make_user('998900000002', is_teacher=True))
+        self.assertEqual(add_teachers(self.group, [self.school.teacher.id, second.id]), 1)
+        self.assertEqual(self.group.teacher.count(), 2)
+        self.assertEqual(remove_teachers(self.group, [second.id]), 1)
+        with self.assertRaises(RosterError):
+            remove_teachers(self.group, [second.id])
+
+    def test_endpoints_accept_single_id_or_list(self):
+        student = self.school.students[0]
+        response = self.client.post(f'/groups/{self.target.id}/students_add/', {'student_id': student.id}, format='json')
+        self.assertEqual(response.json()['count'], 1)
+        response = self.client.post(
+            f'/groups/{self.target.id}/students_remove/', {'student_ids': [student.id, 999999]}, format='json',
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [999999])
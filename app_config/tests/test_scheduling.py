@@ -0,0 +1,90 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from app_config.models import RollupState, Rooms, Table, TableType
+from app_config.scheduling import SCHEDULE_STATE, RoomIntervals, ScheduleIndex, schedule_index, validate_batch
+
+from .utils import client_for, fast_hashing, make_user
+
+
+def at(hour, minute=0):
+    return datetime.time(hour, minute)
+
+
+class RoomIntervalsTests(TestCase):
+
+    def test_overlapping_is_half_open(self):
+        intervals = RoomIntervals([(at(9), at(11), 1), (at(11), at(12), 2), (at(8), at(17), 3)])
+        self.assertEqual(intervals.overlapping(at(10), at(11)), [1, 3])
+        self.assertEqual(intervals.overlapping(at(17), at(18)), [])
+        self.assertEqual(intervals.overlapping(at(11), at(11, 30), exclude=3), [2])
+
+
+@fast_hashing
+class ScheduleIndexTests(TestCase):
+
+    def setUp(self):
+        self.room = Rooms.objects.create(title='101')
+        self.other_room = Rooms.objects.create(title='102')
+        self.type = TableType.objects.create(title='Dars')
+        self.client = client_for(make_user('998900000000', is_admin=True, is_staff=True))
+
+    def table(self, start, end, room=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Table.objects.create(start_time=start, end_time=end, room=room or self.room, type=self.type)
+
+    def payload(self, start, end, room=None):
+        return {'start_time': start, 'end_time': end, 'room': (room or self.room).id, 'type': self.type.id}
+
+    def test_version_is_stored_in_database(self):
+        before = RollupState.objects.filter(name=SCHEDULE_STATE).values_list('version', flat=True).first() or 0
+        self.table(at(9), at(11))
+        self.assertEqual(RollupState.objects.get(name=SCHEDULE_STATE).version, before + 1)
+
+    def test_other_process_index_sees_new_tables(self):
+        other = ScheduleIndex()  # boshqa worker jarayonining indeksi
+        self.assertEqual(other.conflicts(self.room.id, at(9), at(10)), [])
+        table = self.table(at(9), at(11))
+        self.assertEqual(other.conflicts(self.room.id, at(9), at(10)), [table.id])
+        self.assertEqual(other.busy_rooms(at(10), at(12)), {self.room.id})
+
+    def test_local_writes_are_applied_in_place(self):
+        schedule_index.rebuild()
+        table = self.table(at(9), at(11))
+        with self.assertNumQueries(1):  # faqat versiya tekshiruvi
+            self.assertEqual(schedule_index.conflicts(self.room.id, at(10), at(12)), [table.id])
+
+    def test_overlap_is_rejected(self):
+        self.table(at(9), at(11))
+        response = self.client.post('/tables/', self.payload('10:00', '12:00'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post('/tables/', self.payload('11:00', '12:00')).status_code, 201)
+
+    def test_stale_index_is_caught_under_lock(self):
+        existing = self.table(at(9), at(11))
+        # boshqa jarayon indeksi bu jadvalni hali ko'rmagan
+        with mock.patch.object(schedule_index, 'conflicts', return_value=[]):
+            response = self.client.post('/tables/', self.payload('10:00', '12:00'))
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(str(existing.id), str(response.json()['room']))
+
+            response = self.client.post('/tables/bulk/', {'items': [self.payload('10:30', '11:30')]}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()['conflicts'][0]['tables'], [existing.id])
+        self.assertEqual(Table.objects.count(), 1)
+
+    def test_update_excludes_itself(self):
+        table = self.table(at(9), at(11))
+        response = self.client.patch(f'/tables/{table.id}/', {'end_time': '11:30'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_batch_rows_conflict_with_each_other(self):
+        rows = [
+            {'room': self.room, 'start_time': at(9), 'end_time': at(11)},
+            {'room': self.room, 'start_time': at(10), 'end_time': at(12)},
+            {'room': self.other_room, 'start_time': at(10), 'end_time': at(12)},
+        ]
+        conflicts = validate_batch(rows)
+        self.assertEqual([(c['index'], c['rows']) for c in conflicts], [(0, [1]), (1, [0])])
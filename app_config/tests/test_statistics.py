@@ -0,0 +1,204 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import TestCase
+
+from app_config import statistics
+from app_config.models import Group, RollupState, StudentDailyStat, StudentStatDirty
+from app_config.statistics import (
+    ensure_student_stats, schedule_student_stats_refresh, student_stats_buckets, student_stats_for_range,
+    student_stats_stale,
+)
+
+from .utils import client_for, fast_hashing, make_school, make_student
+
+
+@fast_hashing
+class StudentStatsRollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.school = make_school(students=3)
+        self.today = self.school.today
+        self.other = Group.objects.create(
+            title='G2', course=self.school.course,
+            start_date=self.today - datetime.timedelta(days=30),
+            end_date=self.today + datetime.timedelta(days=30),
+        )
+        make_student('998912000001', group=self.other)
+        ensure_student_stats(self.today)
+
+    def studying(self, group, day=None):
+        rows = StudentDailyStat.objects.filter(group=group, date=day or self.today)
+        return rows.aggregate(total=Sum('studying'))['total'] or 0
+
+    def test_rollup_matches_source_tables(self):
+        self.assertEqual(self.studying(self.school.group), 3)
+        self.assertEqual(self.studying(self.other), 1)
+        stats = student_stats_for_range(self.today - datetime.timedelta(days=90), self.today)
+        self.assertEqual(stats, {"registered_students": 4, "studying_students": 4, "graduated_students": 0})
+        self.assertFalse(StudentStatDirty.objects.exists())
+        self.assertEqual(RollupState.objects.get(name='student_stats').watermark, self.today)
+
+    def test_dirty_marks_survive_a_cold_cache(self):
+        # boshqa worker yoki qayta ishga tushirish: belgilar bazada
+        make_student('998912000002', group=self.other)
+        cache.clear()
+        self.assertTrue(StudentStatDirty.objects.filter(group=self.other).exists())
+        ensure_student_stats(self.today)
+        self.assertEqual(self.studying(self.other), 2)
+
+    def test_group_change_refreshes_only_affected_groups(self):
+        past = self.today - datetime.timedelta(days=45)
+        # boshqa guruh qatorini buzamiz: qayta hisoblanmasa o'zgarmay qoladi
+        StudentDailyStat.objects.filter(group=self.school.group, date=past).update(studying=99)
+
+        student = self.school.students[0]
+        student.group = self.other
+        student.save()
+        marks = set(StudentStatDirty.objects.values_list('group_id', flat=True))
+        self.assertEqual(marks, {self.other.id, self.school.group.id})
+        StudentStatDirty.objects.filter(group=self.school.group).delete()
+
+        ensure_student_stats(self.today)
+        self.assertEqual(self.studying(self.other, self.today - datetime.timedelta(days=20)), 2)
+        self.assertEqual(self.studying(self.school.group, past), 99)
+
+    def test_group_date_change_marks_only_that_group(self):
+        self.other.start_date -= datetime.timedelta(days=10)
+        self.other.save()
+        self.assertEqual(
+            list(StudentStatDirty.objects.values_list('group_id', 'from_date')),
+            [(self.other.id, self.other.start_date)],
+        )
+        ensure_student_stats(self.today)
+        self.assertEqual(self.studying(self.other, self.other.start_date), 1)
+
+    def test_marks_added_during_rollup_are_kept(self):
+        original = statistics.refresh_student_stats
+
+        def refresh_and_mark(*args, **kwargs):
+            original(*args, **kwargs)
+            StudentStatDirty.objects.create(from_date=self.today)
+
+        with mock.patch.object(statistics, 'refresh_student_stats', side_effect=refresh_and_mark):
+            ensure_student_stats(self.today)
+        self.assertTrue(StudentStatDirty.objects.exists())
+
+    def test_locked_state_skips_rollup(self):
+        with mock.patch.object(statistics, 'lock_state', return_value=None):
+            self.assertFalse(ensure_student_stats(self.today))
+            out = StringIO()
+            call_command('rollup_student_stats', stdout=out)
+        self.assertIn("Boshqa jarayon", out.getvalue())
+
+    def test_staleness(self):
+        self.assertFalse(student_stats_stale(self.today))
+        self.assertTrue(student_stats_stale(self.today + datetime.timedelta(days=1)))
+        make_student('998912000003')
+        self.assertTrue(student_stats_stale(self.today))
+
+    def test_rebuild_command(self):
+        StudentDailyStat.objects.all().delete()
+        out = StringIO()
+        call_command('rollup_student_stats', '--rebuild', stdout=out)
+        self.assertEqual(self.studying(self.school.group), 3)
+
+
+@fast_hashing
+class StudentFilterViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.school = make_school(students=2)
+        self.client = client_for(self.school.admin)
+
+    def post(self):
+        today = self.school.today
+        return self.client.post('/students-statistic/', {
+            'start_date': today - datetime.timedelta(days=90), 'end_date': today,
+        })
+
+    def test_first_request_builds_rollup(self):
+        # deploydan keyin: jadval bo'sh, watermark yo'q
+        self.assertFalse(RollupState.objects.filter(name='student_stats').exists())
+        response = self.post()
+        self.assertEqual(response.json(), {
+            "total_students": 2, "registered_students": 2, "studying_students": 2, "graduated_students": 0,
+        })
+        self.assertEqual(RollupState.objects.get(name='student_stats').watermark, self.school.today)
+
+    def test_request_does_not_rebuild_inline(self):
+        ensure_student_stats(self.school.today)
+        make_student('998912000003', group=self.school.group)
+        with mock.patch.object(statistics, 'ensure_student_stats') as ensure, \
+                mock.patch.object(statistics, 'schedule_student_stats_refresh') as schedule, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.post()
+        self.assertEqual(response.status_code, 200)
+        ensure.assert_not_called()
+        schedule.assert_called_once()
+
+    def test_answers_from_rollup(self):
+        ensure_student_stats(self.school.today)
+        response = self.post()
+        self.assertEqual(response.json()['studying_students'], 2)
+        self.assertEqual(response.json()['total_students'], 2)
+
+    def test_one_background_refresh_at_a_time(self):
+        pending = mock.Mock(done=mock.Mock(return_value=False))
+        with mock.patch.object(statistics, '_refresh_executor') as executor, \
+                mock.patch.object(statistics, '_refresh_future', None):
+            executor.submit.return_value = pending
+            self.assertTrue(schedule_student_stats_refresh())
+            self.assertFalse(schedule_student_stats_refresh())
+        executor.submit.assert_called_once()
+
+    def test_background_refresh_can_be_disabled(self):
+        with mock.patch.object(statistics, 'STATS_SETTINGS', {'BACKGROUND_REFRESH': False}):
+            self.assertFalse(schedule_student_stats_refresh())
+
+
+@fast_hashing
+class StudentStatsBucketTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.school = make_school(students=2)
+        self.today = self.school.today
+        ensure_student_stats(self.today)
+        self.start = self.today - datetime.timedelta(days=90)
+
+    def test_buckets_group_rollup_rows(self):
+        rows = student_stats_buckets(self.start, self.today, 'month')
+        self.assertEqual(sum(row['registered'] for row in rows), 2)
+        self.assertEqual(max(row['active'] for row in rows), 2)
+        self.assertEqual({row['group'] for row in rows}, {'G1'})
+
+    def test_cached_result_costs_one_version_query(self):
+        student_stats_buckets(self.start, self.today, 'week')
+        with self.assertNumQueries(1):
+            student_stats_buckets(self.start, self.today, 'week')
+
+    def test_rollup_in_another_process_invalidates_cache(self):
+        student_stats_buckets(self.start, self.today, 'month')
+        make_student('998912000009', group=self.school.group)
+        # Boshqa jarayon rollup qildi: bu jarayonning keshiga tegmaydi, versiya esa bazada
+        ensure_student_stats(self.today)
+        rows = student_stats_buckets(self.start, self.today, 'month')
+        self.assertEqual(sum(row['registered'] for row in rows), 3)
+
+    def test_endpoint(self):
+        response = client_for(self.school.admin).get('/students-statistic/buckets/', {
+            'start_date': self.start, 'end_date': self.today, 'bucket': 'day',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['bucket'], 'day')
+        response = client_for(self.school.admin).get('/students-statistic/buckets/', {
+            'start_date': self.today, 'end_date': self.start,
+        })
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,81 @@
+import datetime
+
+from django.test import TestCase
+
+from app_config.models import Attendance, GroupHomeWork, HomeWork, Parent, Payment, Topics
+from app_config.timeline import student_timeline
+
+from .utils import client_for, fast_hashing, make_school, make_student
+
+
+@fast_hashing
+class StudentTimelineTests(TestCase):
+
+    def setUp(self):
+        self.school = make_school(students=2)
+        self.student = self.school.students[0]
+        for days in range(5):
+            Attendance.objects.create(
+                level=self.school.level, student=self.student, status=self.school.present,
+                group=self.school.group, date=self.school.today - datetime.timedelta(days=days),
+            )
+        Payment.objects.create(
+            student=self.student, group=self.school.group, month=self.school.month,
+            payment_type=self.school.payment_type, price='500000',
+        )
+        topic = Topics.objects.create(title='T1', course=self.school.course)
+        homework = GroupHomeWork.objects.create(group=self.school.group, topic=topic)
+        HomeWork.objects.create(groupHomeWork=homework, student=self.student, link='https://example.com/1')
+        Parent.objects.create(name='Ota', surname='S', phone='1', address='A').students.add(self.student)
+        self.url = f'/students/{self.student.id}/timeline/'
+
+    def test_profile_and_merged_sections(self):
+        timeline = student_timeline(self.student.id)
+        profile = timeline['student']
+        self.assertEqual(profile['group']['course'], 'Python')
+        self.assertEqual([parent['name'] for parent in profile['parents']], ['Ota'])
+        self.assertEqual(len(timeline['timeline']), 7)
+        times = [(event['time'], event['id']) for event in timeline['timeline']]
+        self.assertEqual(times, sorted(times, reverse=True))
+        self.assertEqual({event['type'] for event in timeline['timeline']}, {'attendance', 'payments', 'homework'})
+
+    def test_sections_page_independently(self):
+        response = client_for(self.school.admin).get(self.url, {'limit': 2, 'sections': 'attendance'})
+        payload = response.json()
+        self.assertEqual(len(payload['timeline']), 2)
+        self.assertEqual(list(payload['cursors']), ['attendance'])
+
+        seen = [event['id'] for event in payload['timeline']]
+        while payload['cursors']['attendance']:
+            payload = client_for(self.school.admin).get(self.url, {
+                'limit': 2, 'sections': 'attendance', 'attendance_cursor': payload['cursors']['attendance'],
+            }).json()
+            seen += [event['id'] for event in payload['timeline']]
+        self.assertEqual(sorted(seen), sorted(Attendance.objects.values_list('id', flat=True)))
+
+    def test_query_count_is_fixed(self):
+        client = client_for(self.school.admin)
+        client.get(self.url)
+        with self.assertNumQueries(8):  # talaba, arxiv chegarasi, kurslar, ota-onalar, hisoblagichlar, 3 ta bo'lim
+            client.get(self.url)
+
+    def test_access(self):
+        self.assertEqual(client_for(self.student.user).get(self.url).status_code, 200)
+        other = self.school.students[1].user
+        self.assertEqual(client_for(other).get(self.url).status_code, 403)
+        self.assertEqual(client_for(self.school.admin).get('/students/999999/timeline/').status_code, 404)
+
+
+@fast_hashing
+class StudentGroupsViewTests(TestCase):
+
+    def test_lists_the_students_group(self):
+        school = make_school(students=1)
+        student = school.students[0]
+        response = client_for(school.admin).get(f'/users/student-groups/{student.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([group['id'] for group in response.json()], [school.group.id])
+
+        lonely = make_student('998912000001')
+        response = client_for(school.admin).get(f'/users/student-groups/{lonely.id}/')
+        self.assertEqual(response.json(), [])
@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from app_config.authentication import CachedJWTAuthentication, RoleClaimsAuthentication, RoleClaimsUser
+from app_config.permissions import ClaimAdminUser, ClaimIsTeacher
+from app_config.serializers import RoleTokenRefreshSerializer
+from app_config.tokens import RoleRefreshToken, role_version_key
+
+from .utils import fast_hashing, make_school, make_user
+
+
+def bearer(token):
+    return RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+
+@fast_hashing
+class RoleClaimsAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = make_user('998901112233', is_teacher=True)
+        self.refresh = RoleRefreshToken.for_user(self.user)
+        self.auth = RoleClaimsAuthentication()
+
+    def test_token_carries_role_claims(self):
+        access = self.refresh.access_token
+        self.assertTrue(access['is_teacher'])
+        self.assertFalse(access['is_admin'])
+        self.assertEqual(access['role_version'], self.user.role_version)
+
+    def test_authenticates_without_loading_user(self):
+        self.auth.authenticate(bearer(self.refresh.access_token))
+        with self.assertNumQueries(0):
+            user, _ = self.auth.authenticate(bearer(self.refresh.access_token))
+        self.assertIsInstance(user, RoleClaimsUser)
+        self.assertTrue(user.is_teacher)
+
+    def test_role_change_rejects_old_token(self):
+        access = self.refresh.access_token
+        self.user.is_teacher = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(bearer(access))
+
+    def test_role_change_seen_with_cold_cache(self):
+        # Boshqa worker yoki qayta ishga tushirish: keshda hech narsa yo'q
+        access = self.refresh.access_token
+        self.user.is_admin = True
+        self.user.save()
+        cache.clear()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(bearer(access))
+        self.assertEqual(cache.get(role_version_key(self.user.pk)), self.user.role_version)
+
+    def test_deleted_user_is_rejected(self):
+        access = self.refresh.access_token
+        self.user.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate(bearer(access))
+
+    def test_refresh_restamps_claims(self):
+        self.user.is_admin = True
+        self.user.save()
+        serializer = RoleTokenRefreshSerializer(data={'refresh': str(self.refresh)})
+        self.assertTrue(serializer.is_valid())
+        access = AccessToken(serializer.validated_data['access'])
+        self.assertTrue(access['is_admin'])
+        self.assertEqual(access['role_version'], self.user.role_version)
+
+    def test_refresh_endpoint_restamps_claims(self):
+        self.user.is_admin = True
+        self.user.save()
+        response = APIClient().post('/auth/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.json()['access'])
+        self.assertTrue(access['is_admin'])
+        self.assertEqual(access['role_version'], self.user.role_version)
+
+    def test_refresh_for_deleted_user_is_401(self):
+        refresh = str(self.refresh)
+        self.user.delete()
+        serializer = RoleTokenRefreshSerializer(data={'refresh': refresh})
+        with self.assertRaises(AuthenticationFailed) as ctx:
+            serializer.is_valid()
+        self.assertEqual(ctx.exception.status_code, 401)
+
+
+@fast_hashing
+class ClaimViewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.school = make_school(students=1)
+        self.student = self.school.students[0]
+        self.client = APIClient()
+        token = RoleRefreshToken.for_user(self.school.teacher.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_read_endpoints_skip_user_lookup(self):
+        url = f'/students/{self.student.id}/attendance/summary/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if '"app_config_user"' in q['sql']])
+
+    def test_claim_permissions_use_token(self):
+        request = bearer('x')
+        request.auth = {'is_teacher': True}
+        request.user = None
+        request.successful_authenticator = RoleClaimsAuthentication()
+        self.assertTrue(ClaimIsTeacher().has_permission(request, None))
+        self.assertFalse(ClaimAdminUser().has_permission(request, None))
+
+    def test_unversioned_authenticator_uses_loaded_user(self):
+        # CachedJWTAuthentication role_version ni tekshirmaydi: eski claim emas, User ishlatiladi
+        user = self.school.teacher.user
+        user.is_teacher = False
+        request = bearer('x')
+        request.auth = {'is_teacher': True}
+        request.user = user
+        request.successful_authenticator = CachedJWTAuthentication()
+        self.assertFalse(ClaimIsTeacher().has_permission(request, None))
+
+    def test_claim_permissions_fall_back_to_user(self):
+        request = bearer('x')
+        request.auth = None
+        request.user = self.school.admin
+        self.assertTrue(ClaimAdminUser().has_permission(request, None))
@@ -0,0 +1,60 @@
+from django.test import TestCase
+
+from .utils import client_for, fast_hashing, make_user
+
+
+HIDDEN = ('password', 'groups', 'user_permissions')
+
+
+@fast_hashing
+class UserEndpointsTests(TestCase):
+
+    def setUp(self):
+        self.admin = make_user('998900000000', is_admin=True, is_staff=True)
+        self.client = client_for(self.admin)
+        make_user('998901110001', is_student=True)
+        make_user('998901110002', is_student=True, is_active=False)
+        make_user('998901110003', is_teacher=True)
+
+    def assertSlim(self, row):
+        for field in HIDDEN:
+            self.assertNotIn(field, row)
+
+    def test_create_response_hides_password_hash(self):
+        response = self.client.post('/users/', {'phone': '998901110009', 'password': 'x', 'full_name': 'Ali'})
+        self.assertEqual(response.status_code, 201)
+        self.assertSlim(response.json())
+        self.assertEqual(response.json()['full_name'], 'Ali')
+
+        response = self.client.post('/users/create/user/', {'phone': '998901110010', 'password': 'x'})
+        self.assertEqual(response.status_code, 201)
+        self.assertSlim(response.json())
+
+    def test_update_response_hides_password_hash(self):
+        user = make_user('998901110011')
+        response = self.client.patch(f'/users/{user.id}/', {'full_name': 'Vali'})
+        self.assertEqual(response.status_code, 200)
+        self.assertSlim(response.json())
+        self.assertEqual(response.json()['full_name'], 'Vali')
+
+    def test_list_and_retrieve_are_slim(self):
+        rows = self.client.get('/users/').json()['results']
+        self.assertEqual(len(rows), 4)
+        self.assertSlim(rows[0])
+        self.assertSlim(self.client.get(f'/users/{self.admin.id}/').json())
+
+    def test_role_and_active_filters(self):
+        phones = lambda url: sorted(row['phone'] for row in self.client.get(url).json()['results'])
+        self.assertEqual(phones('/users/?role=student'), ['998901110001', '998901110002'])
+        self.assertEqual(phones('/users/?role=student&is_active=true'), ['998901110001'])
+        self.assertEqual(phones('/users/?role=teacher'), ['998901110003'])
+        self.assertEqual(self.client.get('/users/?role=parent').status_code, 400)
+        self.assertEqual(self.client.get('/users/?is_active=maybe').status_code, 400)
+
+    def test_paginated_list_query_count_is_constant(self):
+        for i in range(20):
+            make_user(f'99890222{i:04d}')
+        with self.assertNumQueries(2):
+            response = self.client.get('/?page=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertSlim(response.json()['results'][0])
@@ -0,0 +1,95 @@
+import datetime
+from types import SimpleNamespace
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from app_config.models import (
+    AttendanceLevel, Course, Group, Month, PaymentType, Status, Student, Teacher, User,
+)
+
+
+# Testlarda parol xeshlash tez bo'lishi uchun
+fast_hashing = override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+
+
+def make_user(phone, password='pass12345', **extra):
+    return User.objects.create_user(phone=phone, password=password, **extra)
+
+
+def make_student(phone, group=None, full_name=None, **extra):
+    user = make_user(phone, is_student=True, full_name=full_name or f"Student {phone[-4:]}")
+    student = Student.objects.create(user=user, group=group, **extra)
+    if group is not None:
+        student.course.add(group.course)
+    return student
+
+
+def make_school(students=3, price='500000'):
+    """
+    Kichik test muhiti: admin, o'qituvchi, kurs, guruh va talabalar,
+    davomat statuslari, to'lov turi va oy.
+    """
+    today = timezone.localdate()
+    admin = make_user('998900000000', is_admin=True, is_staff=True)
+    teacher = Teacher.objects.create(user=make_user('998900000001', is_teacher=True))
+    course = Course.objects.create(title='Python')
+    group = Group.objects.create(
+        title='G1',
+        course=course,
+        start_date=today - datetime.timedelta(days=60),
+        end_date=today + datetime.timedelta(days=60),
+        price=price,
+    )
+    group.teacher.add(teacher)
+    return SimpleNamespace(
+        admin=admin,
+        teacher=teacher,
+        course=course,
+        group=group,
+        students=[make_student(f'99891000{i:04d}', group=group) for i in range(students)],
+        level=AttendanceLevel.objects.create(title='L1'),
+        present=Status.objects.create(title='Keldi', name='present'),
+        absent=Status.objects.create(title='Kelmadi', name='absent'),
+        payment_type=PaymentType.objects.create(title='Naqd'),
+        month=Month.objects.create(title='Oktyabr'),
+        today=today,
+    )
+
+
+def client_for(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Ma'lumot migratsiyalarini tekshirish: baza `migrate_from` holatiga
+    qaytariladi, `setUpBeforeMigration(apps)` eski sxemada qatorlar yaratadi,
+    so'ng `migrate_to` gacha migratsiya qilinadi va `self.apps` yangilanadi.
+    """
+    app = 'app_config'
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([(self.app, self.migrate_from)])
+        self.setUpBeforeMigration(executor.loader.project_state([(self.app, self.migrate_from)]).apps)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([(self.app, self.migrate_to)])
+        self.apps = executor.loader.project_state([(self.app, self.migrate_to)]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes(self.app))
+
+    def setUpBeforeMigration(self, apps):
+        pass
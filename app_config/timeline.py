@@ -0,0 +1,87 @@
+from .archive import needs_archive
+from .counters import attendance_summary
+from .models import ArchivedAttendance, Attendance, AttendanceCounter, HomeWork, Parent, Payment, Student
+from .pagination import keyset_page
+
+
+TIMELINE_DEFAULT_LIMIT = 20
+TIMELINE_MAX_LIMIT = 100
+
+# section -> (model, vaqt maydoni, values() ustunlari)
+TIMELINE_SECTIONS = {
+    'attendance': (Attendance, 'created', (
+        'id', 'created', 'group_id', 'group__title', 'status__title', 'level__title',
+    )),
+    'payments': (Payment, 'created_at', (
+        'id', 'created_at', 'group_id', 'group__title', 'month__title', 'payment_type__title', 'price',
+    )),
+    'homework': (HomeWork, 'created', (
+        'id', 'created', 'link', 'is_active', 'descriptions',
+        'groupHomeWork_id', 'groupHomeWork__topic__title', 'groupHomeWork__group__title',
+    )),
+}
+# Arxivlangan yozuvlari bor bo'limlar
+TIMELINE_ARCHIVES = {
+    'attendance': ArchivedAttendance,
+}
+
+
+def student_profile(student):
+    group = student.group
+    return {
+        "id": student.id,
+        "user_id": student.user_id,
+        "full_name": student.user.full_name,
+        "phone": student.user.phone,
+        "is_active": student.is_active,
+        "created": student.created,
+        "group": {
+            "id": group.id,
+            "title": group.title,
+            "course_id": group.course_id,
+            "course": group.course.title,
+            "start_date": group.start_date,
+            "end_date": group.end_date,
+        } if group else None,
+        "courses": list(student.course.values('id', 'title')),
+        "parents": list(
+            Parent.objects.filter(students=student).values('id', 'name', 'surname', 'phone')
+        ),
+        "attendance": attendance_summary(AttendanceCounter.objects.filter(student_id=student.id)),
+    }
+
+
+def student_timeline(student_id, cursors=None, limit=TIMELINE_DEFAULT_LIMIT, sections=None):
+    """
+    Talaba profili va so'nggi davomat/to'lov/uy ishlari bitta javobda.
+    So'rovlar soni o'zgarmas: talaba (group, course, user bilan), kurslar,
+    ota-onalar, davomat hisoblagichlari va har bir bo'lim uchun bittadan keyset so'rov.
+    Har bir bo'lim o'z cursori bilan alohida varaqlanadi.
+    """
+    student = (
+        Student.objects.select_related('user', 'group__course')
+        .filter(id=student_id)
+        .first()
+    )
+    if student is None:
+        return None
+
+    cursors = cursors or {}
+    sections = sections or list(TIMELINE_SECTIONS)
+    events = []
+    next_cursors = {}
+    for name in sections:
+        model, field, columns = TIMELINE_SECTIONS[name]
+        queryset = model.objects.filter(student_id=student.id).values(*columns)
+        if name in TIMELINE_ARCHIVES and needs_archive():
+            archived = TIMELINE_ARCHIVES[name].objects.filter(student_id=student.id).values(*columns)
+            queryset = [queryset, archived]
+        rows, next_cursors[name] = keyset_page(queryset, field, cursors.get(name), limit)
+        events.extend({"type": name, "time": row[field], **row} for row in rows)
+
+    events.sort(key=lambda event: (event['time'], event['id']), reverse=True)
+    return {
+        "student": student_profile(student),
+        "cursors": next_cursors,
+        "timeline": events,
+    }
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, SlidingToken
+
+from .blacklist import blacklist_filter
+
+
+# Access tokenga imzolanadigan rol claimlari
+ROLE_CLAIMS = ('is_admin', 'is_staff', 'is_teacher', 'is_student')
+ROLE_VERSION_CLAIM = 'role_version'
+# Keshdagi role_version shu muddatdan keyin bazadan qayta o'qiladi: kesh
+# jarayon ichida bo'lsa ham boshqa workerlardagi o'zgarish shu vaqtda ko'rinadi
+ROLE_VERSION_TTL = getattr(settings, 'USER_CACHE', {}).get('TTL', 15)
+
+
+def role_version_key(user_id):
+    return f"role_version:{user_id}"
+
+
+def publish_role_version(user):
+    """
+    Foydalanuvchining joriy role_version qiymatini keshga yozadi.
+    Claim rejimidagi autentifikatsiya tokendagi versiyani shu bilan solishtiradi.
+    """
+    cache.set(role_version_key(user.pk), user.role_version, timeout=ROLE_VERSION_TTL)
+
+
+def forget_role_version(user_id):
+    cache.delete(role_version_key(user_id))
+
+
+def get_role_version(user_id):
+    """
+    Joriy role_version: keshdan, bo'lmasa bazadagi User.role_version dan
+    (ROLE_VERSION_TTL ga keshlanadi). Foydalanuvchi o'chirilgan bo'lsa None.
+    """
+    version = cache.get(role_version_key(user_id))
+    if version is None:
+        version = (
+            get_user_model().objects.filter(pk=user_id).values_list('role_version', flat=True).first()
+        )
+        if version is not None:
+            cache.set(role_version_key(user_id), version, timeout=ROLE_VERSION_TTL)
+    return version
+
+
+def add_role_claims(token, user):
+    for claim in ROLE_CLAIMS:
+        token[claim] = bool(getattr(user, claim))
+    token[ROLE_VERSION_CLAIM] = user.role_version
+    return token
+
+
+class FilteredBlacklistMixin:
+    """
+    Qora ro'yxat tekshiruvini har safar jadvalga so'rov yubormasdan
+    blacklist_filter orqali bajaradi.
+    """
+
+    def check_blacklist(self):
+        if blacklist_filter.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+
+class RoleRefreshToken(FilteredBlacklistMixin, RefreshToken):
+    """
+    Rol bayroqlari va role_version claimlari bilan refresh token.
+    Undan olingan access token ham shu claimlarni nusxalaydi.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        return add_role_claims(super().for_user(user), user)
+
+
+class RoleSlidingToken(FilteredBlacklistMixin, SlidingToken):
+
+    @classmethod
+    def for_user(cls, user):
+        return add_role_claims(super().for_user(user), user)
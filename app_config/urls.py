@@ -4,7 +4,7 @@ from .views import *
 from app_config.views import PopulateMockDataView
 from rest_framework_simplejwt.views import (
     TokenObtainSlidingView,
-    TokenRefreshSlidingView, TokenVerifyView, TokenBlacklistView
+    TokenRefreshSlidingView, TokenRefreshView, TokenVerifyView, TokenBlacklistView
 )
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
@@ -23,6 +23,9 @@ router.register(r'comments', CommentViewSet, basename='comment')
 router.register(r'teachers', TeacherViewSet, basename='teachers')
 router.register(r'populate-mock-data', MockDataViewSet, basename="mockdata")
 router.register(r'statuses', StatusViewSet, basename='status')
+router.register(r'payments', PaymentViewSet, basename='payment')
+router.register(r'payment-types', PaymentTypeViewSet, basename='paymenttype')
+router.register(r'months', MonthViewSet, basename='month')
 
 
 
@@ -44,6 +47,9 @@ urlpatterns = [
     # Student CRUD
     path('students/', StudentListCreateAPIView.as_view(), name='student-list-create'),
     path('students/<int:pk>/', StudentRetrieveUpdateDestroyAPIView.as_view(), name='student-detail'),
+    path('students/import/', StudentImportAPIView.as_view(), name='student-import'),
+    path('students/<int:student_id>/timeline/', StudentTimelineView.as_view(), name='student-timeline'),
+    path('students/<int:student_id>/attendance/summary/', StudentAttendanceSummaryView.as_view(), name='student-attendance-summary'),
     path('students/<int:student_id>/attendance/', StudentAttendanceListView.as_view(), name='student-attendance'),
 
     path('users/create/user/', UserCreateView.as_view(), name='create-user'),
@@ -55,10 +61,16 @@ urlpatterns = [
 
     # path('create/student/', StudentCreateAPIView.as_view(), name='create-student'),
     path("auth/login/", LoginAPIView.as_view(), name="login"),
+    path("auth/login/async/", async_login_view, name="login-async"),
     path("auth/logout/", LogoutView.as_view(), name="logout"),
     path("auth/me/", CurrentUserView.as_view(), name="me"),
+    path("auth/stats/", AuthStatsView.as_view(), name="auth-stats"),
     
     path('students-statistic/', StudentFilterView.as_view(), name='recent-students'),
+    path('billing/run/', BillingRunAPIView.as_view(), name='billing-run'),
+    path('billing/debtors/', DebtorListView.as_view(), name='billing-debtors'),
+    path('exports/<str:kind>/', ExportAPIView.as_view(), name='export'),
+    path('students-statistic/buckets/', StudentStatsBucketView.as_view(), name='students-statistic-buckets'),
      
     path('api/token/', TokenObtainSlidingView.as_view(), name='token_obtain'),
     path('api/token/refresh/', TokenRefreshSlidingView.as_view(), name='token_refresh'),
@@ -70,7 +82,8 @@ urlpatterns = [
     path('auth/reset-password/', ResetPasswordAPIView.as_view(), name='reset-password'),
     path('auth/verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
     path('auth/set-new-password/', SetNewPasswordAPIView.as_view(), name='set-new-password'),
-    path('auth/token/refresh/', CustomTokenRefreshView.as_view(), name='token-refresh'),
+    # TokenRefreshView: SIMPLE_JWT['TOKEN_REFRESH_SERIALIZER'] (rol claimlari, blacklist tekshiruvi)
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='token-refresh'),
     
     path('', include(router.urls)),
 ]
\ No newline at end of file
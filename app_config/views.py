@@ -3,12 +3,14 @@ from rest_framework.generics import UpdateAPIView
 from rest_framework.generics import ListAPIView
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import RetrieveAPIView
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.hashers import make_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
+from rest_framework.parsers import MultiPartParser
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework_simplejwt.views import TokenRefreshView, TokenVerifyView, TokenBlacklistView
 from .models import *
@@ -16,14 +18,19 @@ from .models import Status
 from .serializers import *
 from .serializers import GetTeachersByIdsSerializer
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from django.db.models import Q
 from .serializers import UserAndStudentSerializer
-from .permissions import AdminUser, AdminOrOwner
+from .permissions import AdminUser, AdminOrOwner, ClaimIsTeacher
 from rest_framework.pagination import PageNumberPagination
+from .pagination import OptionalCursorPagination, paginated_list
 from django.shortcuts import get_object_or_404
 from faker import Faker
 import random
 from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.cache import quote_etag
+from django.utils.dateparse import parse_date
 from django.utils.timezone import make_aware
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
@@ -31,12 +38,88 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAdminUser
 from django.core.management import call_command
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from asgiref.sync import sync_to_async
+import json
+from .archive import attendance_queryset
+from .attendance import attendance_matrix, attendance_matrix_etag, mark_group_attendance
+from .authentication import CLAIM_AUTHENTICATION_CLASSES, user_cache
+from .counters import apply_counter_deltas, attendance_key, attendance_summary
+from .billing import debtors, run_billing
+from .blacklist import blacklist_filter, token_table_stats
+from .exports import EXPORTS, streaming_export
+from .homework import assign_homework, homework_inbox, pending_homework
+from .hashing import PasswordPoolOverloaded, averify_credentials, password_pool, verify_credentials
+from .importers import ImportFormatError, StudentImporter, iter_rows
+from .otp import get_otp_store
+from .parents import parent_portal, parent_queryset
+from .reconciliation import OPEN_STATUSES, ReconciliationError, reconcile_statement, reject_item, resolve_item
+from .revenue import revenue_report
+from .roster import RosterError, add_students, add_teachers, remove_students, remove_teachers
+from .scheduling import locked_conflicts, schedule_index, validate_batch
+from .statistics import student_stats_buckets, student_stats_for_range
+from .timeline import TIMELINE_SECTIONS, student_timeline
+from .tokens import RoleRefreshToken
 
 fake = Faker()
 
 User = get_user_model()
 
-class UserViewSet(viewsets.ModelViewSet):
+USER_ROLE_FILTERS = {
+    'student': 'is_student',
+    'teacher': 'is_teacher',
+    'admin': 'is_admin',
+}
+
+
+class UserFilterMixin:
+    """
+    ?role=student|teacher|admin va ?is_active= filtrlari.
+    Ro'yxat values() orqali olinadi, shuning uchun sahifa doimiy sonli so'rov bilan quriladi.
+    """
+
+    def filter_users(self, queryset):
+        role = self.request.query_params.get('role')
+        if role:
+            if role not in USER_ROLE_FILTERS:
+                raise ValidationError({"role": f"Quyidagilardan biri bo‘lishi kerak: {', '.join(USER_ROLE_FILTERS)}"})
+            queryset = queryset.filter(**{USER_ROLE_FILTERS[role]: True})
+
+        is_active = self.request.query_params.get('is_active')
+        if is_active is not None:
+            if is_active.lower() not in ('true', 'false', '1', '0'):
+                raise ValidationError({"is_active": "true yoki false bo‘lishi kerak"})
+            queryset = queryset.filter(is_active=is_active.lower() in ('true', '1'))
+        return queryset
+
+    def get_list_queryset(self):
+        queryset = self.filter_users(User.objects.all())
+        return queryset.order_by('id').values(*UserListSerializer.Meta.fields)
+
+
+class UserDetailResponseMixin:
+    """
+    create/update javobi UserDetailSerializer orqali qaytariladi: kirish
+    UserAllSerializer bilan qabul qilinadi, lekin parol xeshi va M2M lar chiqmaydi.
+    """
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        headers = self.get_success_headers(serializer.data)
+        return Response(UserDetailSerializer(serializer.instance).data, status=status.HTTP_201_CREATED, headers=headers)
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        serializer = self.get_serializer(self.get_object(), data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        return Response(UserDetailSerializer(serializer.instance).data)
+
+
+class UserViewSet(UserDetailResponseMixin, UserFilterMixin, viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserAllSerializer 
 
@@ -45,14 +128,26 @@ class UserViewSet(viewsets.ModelViewSet):
             return [AllowAny()]
         return [IsAuthenticated()]
 
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.get_list_queryset()
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UserListSerializer
+        if self.action == 'retrieve':
+            return UserDetailSerializer
+        return super().get_serializer_class()
+
     @action(detail=False, methods=['POST'], permission_classes=[AllowAny])
     def login(self, request):
         phone = request.data.get('phone')
         password = request.data.get('password')
-        user = authenticate(phone=phone, password=password)
+        user = verify_credentials(phone, password)
 
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = RoleRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -97,19 +192,21 @@ class SomeProtectedView(APIView):
     def get(self, request):
         return Response({"message": "Sizga ruxsat berildi!"})
     
-class UserCreateView(generics.CreateAPIView):
+class UserCreateView(UserDetailResponseMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserAllSerializer
     permission_classes = [AdminUser]
 
-class UserListView(generics.ListAPIView):
-    queryset = User.objects.all()
-    serializer_class = UserAllSerializer
-    pagination_class = PageNumberPagination
+class UserListView(UserFilterMixin, generics.ListAPIView):
+    serializer_class = UserListSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = [AdminUser]
 
+    def get_queryset(self):
+        return self.get_list_queryset()
+
 
-class UserUpdateView(generics.UpdateAPIView):
+class UserUpdateView(UserDetailResponseMixin, generics.UpdateAPIView):
     queryset = User.objects.all()
     serializer_class = UserAllSerializer
     lookup_field = 'id'
@@ -117,7 +214,7 @@ class UserUpdateView(generics.UpdateAPIView):
     
 class UserDetailView(generics.RetrieveAPIView):
     queryset = User.objects.all()
-    serializer_class = UserAllSerializer
+    serializer_class = UserDetailSerializer
     lookup_field = 'id'
     permission_classes = [AdminUser]
 from datetime import datetime
@@ -136,20 +233,31 @@ class StudentFilterView(APIView):
         start_date = serializer.validated_data['start_date']
         end_date = serializer.validated_data['end_date']
 
-        start_date = make_aware(datetime.combine(start_date, datetime.min.time()))
-        end_date = make_aware(datetime.combine(end_date, datetime.max.time()))
+        # Natija kunlik rollup jadvalidan (StudentDailyStat) yig'iladi
+        stats = student_stats_for_range(start_date, end_date)
+
+        return Response({
+            "total_students": Student.objects.count(),
+            **stats,
+        }, status=status.HTTP_200_OK)
 
-        total_students = Student.objects.count()
-        graduated_students = Student.objects.filter(group__is_active=False, created__range=[start_date, end_date]).count()
-        studying_students = Student.objects.filter(group__is_active=True, created__range=[start_date, end_date]).count()
+class StudentStatsBucketView(APIView):
+    """
+    Kun/hafta/oy bo'yicha kurs va guruh kesimidagi talabalar statistikasi
+    """
+    permission_classes = [IsAdminUser]
 
-        registered_students = Student.objects.filter(created__range=[start_date, end_date]).count()
+    @swagger_auto_schema(query_serializer=StudentStatsBucketSerializer)
+    def get(self, request):
+        serializer = StudentStatsBucketSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
         return Response({
-            "total_students": total_students,
-            "registered_students": registered_students,
-            "studying_students": studying_students,
-            "graduated_students": graduated_students,
+            "bucket": data['bucket'],
+            "start_date": data['start_date'],
+            "end_date": data['end_date'],
+            "results": student_stats_buckets(data['start_date'], data['end_date'], data['bucket']),
         }, status=status.HTTP_200_OK)
 
 class CreateSuperUserView(generics.CreateAPIView):
@@ -168,7 +276,7 @@ class CreateSuperUserView(generics.CreateAPIView):
 class TeacherListView(ListAPIView):
     queryset = Teacher.objects.all()
     serializer_class = TeacherSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = OptionalCursorPagination
     permission_classes = [AdminUser]
 
 class TeacherUpdateView(UpdateAPIView):
@@ -289,9 +397,9 @@ def login_view(request):
     if serializer.is_valid():
         phone = serializer.validated_data.get('phone')
         password = serializer.validated_data.get('password')
-        user = authenticate(request, phone=phone, password=password)
+        user = verify_credentials(phone, password)
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = RoleRefreshToken.for_user(user)
             return Response({
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
@@ -305,7 +413,7 @@ def login_view(request):
 def logout_view(request):
     try:
         refresh_token = request.data["refresh"]
-        token = RefreshToken(refresh_token)
+        token = RoleRefreshToken(refresh_token)
         token.blacklist()
         return Response({"message": "Logged out successfully."}, status=status.HTTP_200_OK)
     except Exception as e:
@@ -322,20 +430,74 @@ class AttendanceLevelViewSet(viewsets.ModelViewSet):
     queryset = AttendanceLevel.objects.all()
     serializer_class = AttendanceLevelSerializer
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceFilterMixin:
+    """
+    ?from=YYYY-MM-DD, ?to=YYYY-MM-DD (dars kuni), ?group= va ?status= filtrlari.
+    Natija yangi darslar birinchi tartibida, (student|group, date, id) indekslari bo'yicha.
+    Oraliq arxivlangan davrga tushsa ArchivedAttendance ham qo'shib o'qiladi.
+    """
+    cursor_ordering = ('-date', '-id')
+
+    def filter_attendance(self, **filters):
+        params = self.request.query_params
+        dates = {}
+        for param in ('from', 'to'):
+            value = params.get(param)
+            if value:
+                try:
+                    dates[param] = parse_date(value)
+                except ValueError:
+                    dates[param] = None
+                if dates[param] is None:
+                    raise ValidationError({param: "Sana YYYY-MM-DD formatida bo‘lishi kerak"})
+        if 'to' in dates:
+            filters['date__lte'] = dates['to']
+
+        for param in ('group', 'status'):
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ValidationError({param: "ID raqam bo‘lishi kerak"})
+                filters[f"{param}_id"] = int(value)
+
+        return attendance_queryset(start=dates.get('from'), **filters).order_by(*self.cursor_ordering)
+
+
+class AttendanceViewSet(AttendanceFilterMixin, viewsets.ModelViewSet):
     queryset = Attendance.objects.all()
     serializer_class = AttendanceSerializer
 
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.filter_attendance()
+        return super().get_queryset()
+
+    # AttendanceCounter yozuv bilan bir tranzaksiyada yangilanadi
+    @transaction.atomic
+    def perform_create(self, serializer):
+        attendance = serializer.save()
+        apply_counter_deltas({attendance_key(attendance): 1})
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_key = attendance_key(serializer.instance)
+        new_key = attendance_key(serializer.save())
+        if old_key != new_key:
+            apply_counter_deltas({old_key: -1, new_key: 1})
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        key = attendance_key(instance)
+        instance.delete()
+        apply_counter_deltas({key: -1})
+
 # Courses 
 class CourseViewSet(viewsets.ViewSet):
     permission_classes = [AdminUser]
 
     def list(self, request):
         courses = Course.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(courses, request)
-        serializer = CourseSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, courses, CourseSerializer, view=self)
 
     def retrieve(self, request, pk=None):
         course = get_object_or_404(Course, pk=pk)
@@ -373,59 +535,132 @@ class GroupViewSet(viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
-    @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
-    def students_add(self, request, pk=None):
+    @swagger_auto_schema(request_body=AttendanceBulkSerializer)
+    @action(
+        detail=True, methods=['POST'], url_path='attendance/bulk',
+        permission_classes=[IsAuthenticated, ClaimIsTeacher], authentication_classes=CLAIM_AUTHENTICATION_CLASSES,
+    )
+    def attendance_bulk(self, request, pk=None):
+        group = self.get_object()
+        serializer = AttendanceBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = mark_group_attendance(
+            group, data['items'], date=data.get('date'), level_id=data.get('level'),
+        )
+        return Response(result, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(query_serializer=AttendanceSummaryFilterSerializer)
+    @action(
+        detail=True, methods=['GET'], url_path='attendance/matrix',
+        permission_classes=[IsAuthenticated], authentication_classes=CLAIM_AUTHENTICATION_CLASSES,
+    )
+    def attendance_matrix(self, request, pk=None):
+        group = self.get_object()
+        serializer = AttendanceSummaryFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        month = serializer.validated_data.get('month') or timezone.localdate()
+
+        etag = quote_etag(attendance_matrix_etag(group, month))
+        if etag in request.headers.get('If-None-Match', ''):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(attendance_matrix(group, month), headers={'ETag': etag})
+
+    @swagger_auto_schema(query_serializer=AttendanceSummaryFilterSerializer)
+    @action(
+        detail=True, methods=['GET'], url_path='attendance/summary',
+        permission_classes=[IsAuthenticated], authentication_classes=CLAIM_AUTHENTICATION_CLASSES,
+    )
+    def attendance_summary(self, request, pk=None):
+        group = self.get_object()
+        serializer = AttendanceSummaryFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        counters = AttendanceCounter.objects.filter(group_id=group.id)
+        if serializer.validated_data.get('month'):
+            counters = counters.filter(month=serializer.validated_data['month'].replace(day=1))
+        return Response(attendance_summary(counters, by_student=True))
+
+    def roster_change(self, request, name, change, message):
         group = self.get_object()
-        student_id = request.data.get('student_id')
+        serializer = GroupRosterSerializer(data=request.data, context={'name': name})
+        serializer.is_valid(raise_exception=True)
         try:
-            student = Student.objects.get(id=student_id)
-            group.students.add(student)
-            return Response({'detail': 'Student added successfully.'})
-        except Student.DoesNotExist:
-            return Response({'error': 'Student not found.'}, status=status.HTTP_404_NOT_FOUND)
+            count = change(group, serializer.validated_data['ids'])
+        except RosterError as exc:
+            return Response(
+                {'error': f'{exc.label} not found.', 'missing': exc.missing},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return Response({'detail': message, 'count': count})
+
+    # student_id yoki student_ids: [...] qabul qilinadi
+    @swagger_auto_schema(request_body=GroupRosterSerializer)
+    @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
+    def students_add(self, request, pk=None):
+        return self.roster_change(request, 'student', add_students, 'Students added successfully.')
 
+    @swagger_auto_schema(request_body=GroupRosterSerializer)
     @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
     def teachers_add(self, request, pk=None):
-        group = self.get_object()
-        teacher_id = request.data.get('teacher_id')
-        try:
-            teacher = Worker.objects.get(id=teacher_id)
-            group.teachers.add(teacher)
-            return Response({'detail': 'Teacher added successfully.'})
-        except Worker.DoesNotExist:
-            return Response({'error': 'Teacher not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.roster_change(request, 'teacher', add_teachers, 'Teachers added successfully.')
 
+    @swagger_auto_schema(request_body=GroupRosterSerializer)
     @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
     def students_remove(self, request, pk=None):
-        group = self.get_object()
-        student_id = request.data.get('student_id')
-        try:
-            student = Student.objects.get(id=student_id)
-            group.students.remove(student)
-            return Response({'detail': 'Student removed successfully.'})
-        except Student.DoesNotExist:
-            return Response({'error': 'Student not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.roster_change(request, 'student', remove_students, 'Students removed successfully.')
 
+    @swagger_auto_schema(request_body=GroupRosterSerializer)
     @action(detail=True, methods=['POST'], permission_classes=[IsAuthenticated])
     def teachers_remove(self, request, pk=None):
-        group = self.get_object()
-        teacher_id = request.data.get('teacher_id')
-        try:
-            teacher = Worker.objects.get(id=teacher_id)
-            group.teachers.remove(teacher)
-            return Response({'detail': 'Teacher removed successfully.'})
-        except Worker.DoesNotExist:
-            return Response({'error': 'Teacher not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return self.roster_change(request, 'teacher', remove_teachers, 'Teachers removed successfully.')
 
 # Homework
 class GroupHomeWorkViewSet(viewsets.ModelViewSet):
     queryset = GroupHomeWork.objects.all()
     serializer_class = GroupHomeWorkSerializer
 
+    @swagger_auto_schema(request_body=GroupHomeWorkBulkSerializer)
+    @action(detail=False, methods=['POST'], permission_classes=[IsAuthenticated])
+    def bulk(self, request):
+        """
+        Mavzularni bir nechta guruhga (yoki kursning faol guruhlariga) bitta so'rovda biriktirish
+        """
+        serializer = GroupHomeWorkBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        result = assign_homework(
+            data['topics'],
+            group_ids=data.get('groups'),
+            course_id=data.get('course'),
+            descriptions=data.get('descriptions'),
+        )
+        return Response(result, status=status.HTTP_201_CREATED)
+
 class HomeWorkViewSet(viewsets.ModelViewSet):
     queryset = HomeWork.objects.all()
     serializer_class = HomeWorkSerializer
 
+    @swagger_auto_schema(query_serializer=HomeWorkInboxSerializer)
+    @action(
+        detail=False, methods=['GET'],
+        permission_classes=[IsAuthenticated], authentication_classes=CLAIM_AUTHENTICATION_CLASSES,
+    )
+    def inbox(self, request):
+        """
+        O'qituvchining guruhlaridagi tekshirilmagan uy ishlari (admin barchasini yoki ?teacher= bo'yicha ko'radi)
+        """
+        serializer = HomeWorkInboxSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if request.user.is_admin:
+            queryset = pending_homework(teacher_id=data.get('teacher'), group_id=data.get('group'))
+        elif request.user.is_teacher:
+            queryset = pending_homework(teacher_user_id=request.user.id, group_id=data.get('group'))
+        else:
+            return Response({"error": "Faqat o‘qituvchilar uchun"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(homework_inbox(queryset, cursor=data.get('cursor'), limit=data['limit']))
+
 # Table Types 
 class TableTypeViewSet(viewsets.ModelViewSet):
     queryset = TableType.objects.all()
@@ -435,6 +670,62 @@ class TableViewSet(viewsets.ModelViewSet):
     queryset = Table.objects.all()
     serializer_class = TableSerializer
 
+    # Indeks bo'yicha tekshiruv TableSerializer.validate da; yozishdan oldin
+    # xona qulflanib bazadan qayta tekshiriladi (boshqa jarayon indeksi eskirgan bo'lishi mumkin)
+    def perform_create(self, serializer):
+        self._save_locked(serializer)
+
+    def perform_update(self, serializer):
+        self._save_locked(serializer)
+
+    def _save_locked(self, serializer):
+        instance = serializer.instance
+        row = {
+            field: serializer.validated_data.get(field, getattr(instance, field, None))
+            for field in ('room', 'start_time', 'end_time')
+        }
+        with transaction.atomic():
+            conflicts = locked_conflicts([row], exclude=getattr(instance, 'pk', None))
+            if conflicts:
+                raise ValidationError({"room": f"Xona bu vaqtda band (jadvallar: {conflicts[0]['tables']})"})
+            serializer.save()
+
+    @swagger_auto_schema(request_body=TableBatchSerializer)
+    @action(detail=False, methods=['POST'], permission_classes=[AdminUser])
+    def bulk(self, request):
+        """
+        Ko'plab jadvallarni (semestr importi) tekshirib bitta bulk_create bilan yozish.
+        Bitta kesishish bo'lsa ham hech narsa yozilmaydi; dry_run faqat tekshiradi.
+        """
+        serializer = TableBatchSerializer(data=request.data, context={'batch': True})
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data['items']
+        conflicts = validate_batch(items)
+        if conflicts:
+            return Response({"conflicts": conflicts}, status=status.HTTP_400_BAD_REQUEST)
+        if serializer.validated_data['dry_run']:
+            return Response({"valid": len(items), "conflicts": []})
+        with transaction.atomic():
+            conflicts = locked_conflicts(items)
+            if conflicts:
+                return Response({"conflicts": conflicts}, status=status.HTTP_400_BAD_REQUEST)
+            tables = Table.objects.bulk_create([Table(**item) for item in items])
+            # bulk_create signal yubormaydi
+            schedule_index.invalidate()
+        return Response(TableSerializer(tables, many=True).data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(query_serializer=FreeRoomsSerializer)
+    @action(detail=False, methods=['GET'], url_path='free-rooms')
+    def free_rooms(self, request):
+        """
+        [start, end) oralig'ida bo'sh xonalar (?start=14:00&end=16:00)
+        """
+        serializer = FreeRoomsSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        busy = schedule_index.busy_rooms(serializer.validated_data['start'], serializer.validated_data['end'])
+        rooms = Rooms.objects.exclude(id__in=busy).order_by('id').values('id', 'title')
+        return Response(list(rooms))
+
 # Student va Parent
 
 # class StudentViewSet(viewsets.ModelViewSet):
@@ -502,17 +793,21 @@ class ParentViewSet(viewsets.ViewSet):
     permission_classes = [AdminUser]
 
     def list(self, request):
-        parents = Parent.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(parents, request)
-        serializer = ParentSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, parent_queryset(), ParentSerializer, view=self)
 
     def retrieve(self, request, pk=None):
-        parent = get_object_or_404(Parent, pk=pk)
+        parent = get_object_or_404(parent_queryset(), pk=pk)
         serializer = ParentSerializer(parent)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='portal')
+    def portal(self, request, pk=None):
+        """
+        Farzandlar bo'yicha: guruh, oxirgi oy davomat foizi va qoldiq qarz
+        """
+        parent = get_object_or_404(Parent, pk=pk)
+        return Response(parent_portal(parent))
+
     @action(detail=False, methods=['post'], url_path='create/parent')
     @swagger_auto_schema(request_body=ParentSerializer)
     def create_parent(self, request):
@@ -544,10 +839,7 @@ class MonthViewSet(viewsets.ViewSet):
 
     def list(self, request):
         months = Month.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(months, request)
-        serializer = MonthSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, months, MonthSerializer, view=self)
 
     def retrieve(self, request, pk=None):
         month = get_object_or_404(Month, pk=pk)
@@ -584,10 +876,7 @@ class PaymentTypeViewSet(viewsets.ViewSet):
 
     def list(self, request):
         types = PaymentType.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(types, request)
-        serializer = PaymentTypeSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, types, PaymentTypeSerializer, view=self)
 
     def retrieve(self, request, pk=None):
         type = get_object_or_404(PaymentType, pk=pk)
@@ -626,22 +915,21 @@ class PaymentViewSet(viewsets.ViewSet):
 
     def list(self, request):
         payments = Payment.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(payments, request)
-        serializer = PaymentSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, payments, PaymentSerializer, view=self)
 
     def retrieve(self, request, pk=None):
         payment = get_object_or_404(Payment, pk=pk)
         serializer = PaymentSerializer(payment)
         return Response(serializer.data)
 
+    # RevenueRollup Payment signallari orqali to'lov bilan bir tranzaksiyada yangilanadi
     @action(detail=False, methods=['post'], url_path='create/payment')
     @swagger_auto_schema(request_body=PaymentSerializer)
     def create_payment(self, request):
         serializer = PaymentSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -651,7 +939,8 @@ class PaymentViewSet(viewsets.ViewSet):
         payment = get_object_or_404(Payment, pk=pk)
         serializer = PaymentSerializer(payment, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -661,6 +950,109 @@ class PaymentViewSet(viewsets.ViewSet):
         payment.delete()
         return Response({'status':True,'detail': 'Payment muaffaqiyatli uchirildi'}, status=status.HTTP_204_NO_CONTENT)
 
+    @swagger_auto_schema(query_serializer=RevenueReportSerializer)
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        """
+        Tushum: ?by=month,course,group,payment_type bo'yicha kesim va filtrlar (RevenueRollup dan)
+        """
+        serializer = RevenueReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        rows = revenue_report(
+            data['by'],
+            month_id=data.get('month'),
+            course_id=data.get('course'),
+            group_id=data.get('group'),
+            payment_type_id=data.get('payment_type'),
+        )
+        return Response({"by": data['by'], "results": rows})
+
+    @swagger_auto_schema(request_body=ReconciliationUploadSerializer)
+    @action(detail=False, methods=['post'], url_path='reconcile', parser_classes=[MultiPartParser])
+    def reconcile(self, request):
+        """
+        Bank/terminal ko'chirmasini (CSV/XLSX) talabalar bilan solishtirish.
+        Aniq mosliklar to'lov sifatida yoziladi, qolganlari ko'rib chiqish navbatiga tushadi.
+        """
+        serializer = ReconciliationUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        upload = data['file']
+        try:
+            report = reconcile_statement(
+                iter_rows(upload.file, upload.name),
+                source=upload.name,
+                month=data['month'],
+                payment_type=data['payment_type'],
+                dry_run=data['dry_run'],
+            )
+        except (ImportFormatError, ReconciliationError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='reconcile/queue')
+    def reconcile_queue(self, request):
+        """
+        Ko'rib chiqilishi kerak bo'lgan ko'chirma qatorlari (?status=review|unmatched)
+        """
+        statuses = [request.query_params['status']] if request.query_params.get('status') else OPEN_STATUSES
+        items = ReconciliationItem.objects.filter(status__in=statuses).order_by('created_at', 'id')
+        return paginated_list(request, items, ReconciliationItemSerializer, view=self)
+
+    @swagger_auto_schema(request_body=ReconciliationResolveSerializer)
+    @action(detail=True, methods=['post'], url_path='reconcile/resolve')
+    def reconcile_resolve(self, request, pk=None):
+        get_object_or_404(ReconciliationItem, pk=pk)
+        serializer = ReconciliationResolveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            item = resolve_item(pk, serializer.validated_data['student'], serializer.validated_data.get('group'))
+        except ReconciliationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ReconciliationItemSerializer(item).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'], url_path='reconcile/reject')
+    def reconcile_reject(self, request, pk=None):
+        get_object_or_404(ReconciliationItem, pk=pk)
+        try:
+            item = reject_item(pk)
+        except ReconciliationError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(ReconciliationItemSerializer(item).data)
+
+
+class BillingRunAPIView(APIView):
+    """
+    Oy uchun barcha faol talabalarga hisob yozish (qayta ishga tushirish xavfsiz)
+    """
+    permission_classes = [AdminUser]
+
+    @swagger_auto_schema(request_body=BillingRunSerializer)
+    def post(self, request):
+        serializer = BillingRunSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(run_billing(serializer.validated_data['month']), status=status.HTTP_200_OK)
+
+
+class DebtorListView(generics.ListAPIView):
+    """
+    Qarzdorlar: hisoblar minus to'lovlar, eng katta qarz birinchi (?month=, ?group=)
+    """
+    serializer_class = DebtorSerializer
+    permission_classes = [AdminUser]
+    pagination_class = PageNumberPagination
+
+    @swagger_auto_schema(query_serializer=DebtorFilterSerializer)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        serializer = DebtorFilterSerializer(data=self.request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return debtors(month=data.get('month'), group_id=data.get('group'))
+
 
 # Worker 
 class WorkerViewSet(viewsets.ModelViewSet):
@@ -724,12 +1116,14 @@ class LoginAPIView(APIView):
     """
     Foydalanuvchi login API'si
     """
+    permission_classes = [AllowAny]
+
     @staticmethod
     def get_tokens_for_user(user):
         """
         Foydalanuvchi uchun JWT tokenlarni yaratish
         """
-        refresh = RefreshToken.for_user(user)
+        refresh = RoleRefreshToken.for_user(user)
         return {
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -740,9 +1134,9 @@ class LoginAPIView(APIView):
         phone = request.data.get("phone")
         password = request.data.get("password")
 
-        user = User.objects.filter(phone=phone).first()
+        user = verify_credentials(phone, password)
 
-        if user and user.check_password(password):
+        if user:
             tokens = self.get_tokens_for_user(user)
             return Response(tokens, status=status.HTTP_200_OK)
 
@@ -751,6 +1145,55 @@ class LoginAPIView(APIView):
             status=status.HTTP_401_UNAUTHORIZED
         )
 
+
+@csrf_exempt
+async def async_login_view(request):
+    """
+    LoginAPIView ning async varianti (Config/asgi.py ostida ishlatish uchun).
+    Parol tekshiruvi password_pool da bajariladi, event loop bloklanmaydi.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"detail": "Method not allowed"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({"detail": "JSON noto‘g‘ri"}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        user = await averify_credentials(data.get("phone"), data.get("password"))
+    except PasswordPoolOverloaded as exc:
+        return JsonResponse(
+            {"status": False, "detail": str(exc.detail)},
+            status=exc.status_code,
+            headers={"Retry-After": str(exc.wait)},
+        )
+
+    if user is None:
+        return JsonResponse(
+            {"status": False, "detail": "Telefon raqam yoki parol noto‘g‘ri"},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    tokens = await sync_to_async(LoginAPIView.get_tokens_for_user)(user)
+    return JsonResponse(tokens, status=status.HTTP_200_OK)
+
+class AuthStatsView(APIView):
+    """
+    Autentifikatsiya keshlari statistikasi (hit/miss hisoblagichlari)
+    """
+    permission_classes = [AdminUser]
+
+    def get(self, request):
+        return Response({
+            "user_cache": user_cache.stats(),
+            "password_pool": password_pool.stats(),
+            "token_blacklist": {
+                "filter": blacklist_filter.stats(),
+                "tables": token_table_stats(),
+            },
+        }, status=status.HTTP_200_OK)
+
 class LogoutView(APIView):
     """
     Foydalanuvchini tizimdan chiqarish (logout)
@@ -760,7 +1203,7 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data.get("refresh")
-            token = RefreshToken(refresh_token)
+            token = RoleRefreshToken(refresh_token)
             token.blacklist()  # 🔹 Tokenni qora ro‘yxatga qo‘shish
 
             return Response({"message": "Logout muvaffaqiyatli bajarildi"}, status=status.HTTP_200_OK)
@@ -788,9 +1231,7 @@ class VerifyOTPView(APIView):
         if serializer.is_valid():
             phone = serializer.validated_data["phone"]
             otp = serializer.validated_data["otp"]
-            user = User.objects.filter(phone=phone, otp_code=otp).first()
-
-            if user:
+            if get_otp_store().verify(phone, otp):
                 return Response({"message": "OTP to‘g‘ri"}, status=status.HTTP_200_OK)
 
             return Response({"status": False, "detail": "OTP tasdiqlanmagan"}, status=status.HTTP_400_BAD_REQUEST)
@@ -844,15 +1285,6 @@ class CustomTokenRefreshView(TokenRefreshView):
             "code": "token_not_valid"
         }, status=status.HTTP_401_UNAUTHORIZED)    
     
-class CustomTokenRefreshView(APIView):
-    permission_classes = [AllowAny]
-
-    def post(self, request):
-        serializer = TokenRefreshSerializer(data=request.data)
-        if serializer.is_valid():
-            return Response(serializer.validated_data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-
 class ProtectedAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -864,19 +1296,68 @@ class StudentGroupsView(APIView):
 
     def get(self, request, student_id):
         student = get_object_or_404(Student, id=student_id)
-        groups = student.group.all()  
+        # Student.group - ForeignKey, shuning uchun ro'yxatda ko'pi bilan bitta guruh
+        groups = Group.objects.filter(students=student)
         serializer = GroupSerializer(groups, many=True)
         return Response(serializer.data)
 
 
-class StudentAttendanceListView(generics.ListAPIView):
+class StudentTimelineView(APIView):
+    """
+    Talaba profili: guruh, kurslar, ota-onalar va davomat/to'lov/uy ishlari
+    vaqt bo'yicha bitta ro'yxatda (har bir bo'lim alohida cursor bilan)
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = CLAIM_AUTHENTICATION_CLASSES
+
+    @swagger_auto_schema(query_serializer=StudentTimelineSerializer)
+    def get(self, request, student_id):
+        user = request.user
+        if not (user.is_admin or user.is_teacher or user.is_staff):
+            if not Student.objects.filter(id=student_id, user_id=user.id).exists():
+                return Response({"error": "Ruxsat yo‘q"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = StudentTimelineSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        sections = [name for name in TIMELINE_SECTIONS if name in (data.get('sections') or TIMELINE_SECTIONS)]
+        cursors = {name: data.get(f"{name}_cursor") for name in sections}
+
+        timeline = student_timeline(student_id, cursors=cursors, limit=data['limit'], sections=sections)
+        if timeline is None:
+            return Response({"error": "Talaba topilmadi"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(timeline, status=status.HTTP_200_OK)
+
+
+class StudentAttendanceListView(AttendanceFilterMixin, generics.ListAPIView):
     serializer_class = AttendanceSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = PageNumberPagination
+    authentication_classes = CLAIM_AUTHENTICATION_CLASSES
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
         student_id = self.kwargs['student_id']
-        return Attendance.objects.filter(student__id=student_id)
+        return self.filter_attendance(student_id=student_id)
+
+
+class StudentAttendanceSummaryView(APIView):
+    """
+    Talaba davomati ko'rsatkichlari (AttendanceCounter dan, Attendance skanerlanmaydi)
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = CLAIM_AUTHENTICATION_CLASSES
+
+    @swagger_auto_schema(query_serializer=AttendanceSummaryFilterSerializer)
+    def get(self, request, student_id):
+        serializer = AttendanceSummaryFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        counters = AttendanceCounter.objects.filter(student_id=student_id)
+        if data.get('month'):
+            counters = counters.filter(month=data['month'].replace(day=1))
+        if data.get('group'):
+            counters = counters.filter(group_id=data['group'])
+        return Response({"student_id": student_id, **attendance_summary(counters)})
 
 
 class StudentListCreateAPIView(generics.ListCreateAPIView):
@@ -914,6 +1395,50 @@ class StudentCreateAPIView(APIView):
 
 
 
+class ExportAPIView(APIView):
+    """
+    Talabalar, davomat va to'lovlarni NDJSON/CSV ko'rinishida oqim bilan eksport qilish
+    """
+    permission_classes = [AdminUser]
+
+    @swagger_auto_schema(query_serializer=ExportFilterSerializer)
+    def get(self, request, kind):
+        if kind not in EXPORTS:
+            return Response({"error": f"Noma'lum eksport turi: {kind}"}, status=status.HTTP_404_NOT_FOUND)
+        serializer = ExportFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        return streaming_export(
+            kind,
+            fmt=data['fmt'],
+            start_date=data.get('start_date'),
+            end_date=data.get('end_date'),
+            group_id=data.get('group'),
+        )
+
+class StudentImportAPIView(APIView):
+    """
+    Talabalarni CSV/XLSX fayldan ommaviy import qilish.
+    Xato qatorlar butun importni to'xtatmaydi, hisobotda qaytariladi.
+    """
+    permission_classes = [AdminUser]
+    parser_classes = [MultiPartParser]
+
+    @swagger_auto_schema(request_body=StudentImportSerializer)
+    def post(self, request):
+        serializer = StudentImportSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = serializer.validated_data['file']
+        importer = StudentImporter(chunk_size=serializer.validated_data['chunk_size'])
+        try:
+            report = importer.run(iter_rows(upload.file, upload.name))
+        except ImportFormatError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report, status=status.HTTP_200_OK)
+
+
 class StudentRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
@@ -971,10 +1496,7 @@ class StatusViewSet(viewsets.ViewSet): #Status
     def list(self, request):
 
         statuses = Status.objects.all()
-        paginator = PageNumberPagination()
-        result_page = paginator.paginate_queryset(statuses, request)
-        serializer = StatusSerializer(result_page, many=True)
-        return Response(serializer.data)
+        return paginated_list(request, statuses, StatusSerializer, view=self)
 
     def retrieve(self, request, pk=None):
 